@@ -9,19 +9,67 @@ Assembly is done in Python — no expensive LLM call for stitching.
 
 Usage:
     python -m src.agent "Build a code review agent that reviews PRs"
+    python -m src.agent --resume THREAD_ID   # continue an interrupted run
 
-Output saved to: output/YYYY-MM-DD-idea-slug.md
+Output saved to: output/YYYY-MM-DD-idea-slug.md (indexed in the spec archive;
+query it with `python -m src.archive search "..."`)
 """
 
+import argparse
 import os
 import re
+import sqlite3
 import sys
 import time
+import uuid
 from datetime import datetime
-
-from langchain_core.messages import AIMessageChunk
-
-from src.agents import lead_agent
+from typing import Iterator
+
+from langchain_core.messages import AIMessageChunk, ToolMessage
+
+from src.agents import (
+    checkpoints,
+    citation_fixer,
+    latency_stats,
+    lead_agent,
+    model_ids,
+    prompt_hash,
+)
+from src.archive import SpecArchive, parse_verdict, write_spec_file
+from src.budget import BudgetTracker, activate, deactivate
+from src.config import (
+    ARCHIVE_PATH,
+    MODEL_PRICING,
+    OUTPUT_DIR,
+    PERF_HISTORY_PATH,
+    PREFETCH,
+    PROGRESS_LOG,
+    REPORT_CAPS,
+    RUN_BUDGET,
+    STAGE_BUDGETS,
+    VERIFY_PROFILE,
+)
+from src.perf_history import PerfHistory, RSSSampler
+from src.prefetch import start_prefetch
+from src.preverify import is_blocking, preverify, render_findings, render_review
+from src.progress import (
+    JSONLSink,
+    ProgressBus,
+    StageFinished,
+    StageStarted,
+    ToolCalled,
+    TTYSink,
+    format_duration,
+)
+from src.report_buffer import ReportBuffer
+from src.tools import (
+    EscalationStats,
+    clear_prefetch,
+    count_searches,
+    expect_prefetch,
+    stop_counting,
+)
+from src.url_check import URLValidator, apply_replacements, parse_replacements
 
 # Subagent step metadata: (step_number, display_name, description, section_header)
 AGENT_STEPS = {
@@ -34,6 +82,13 @@ AGENT_STEPS = {
 AGENT_ORDER = ["researcher", "agent_designer", "workflow_designer", "infra_planner", "verifier"]
 TOTAL_STEPS = 5
 
+# Streamed tokens are counted in the loop and published to the bus in batches
+TOKEN_BATCH = 32
+
+url_validator = URLValidator()
+spec_archive = SpecArchive(ARCHIVE_PATH)
+perf_history = PerfHistory(PERF_HISTORY_PATH) if PERF_HISTORY_PATH else None
+
 
 def slugify(text: str, max_length: int = 50) -> str:
     """Convert text to a filename-safe slug."""
@@ -43,15 +98,6 @@ def slugify(text: str, max_length: int = 50) -> str:
     return slug[:max_length].rstrip("-")
 
 
-def format_duration(seconds: float) -> str:
-    """Format seconds into human-readable duration."""
-    if seconds < 60:
-        return f"{seconds:.0f}s"
-    minutes = int(seconds // 60)
-    secs = int(seconds % 60)
-    return f"{minutes}m {secs}s"
-
-
 def clean_report(text: str) -> str:
     """Remove internal agent noise from captured output.
 
@@ -112,151 +158,481 @@ def clean_report(text: str) -> str:
     return text.strip()
 
 
-def assemble_spec(idea: str, subagent_reports: dict[str, str]) -> str:
-    """Assemble the final specification from captured subagent outputs.
+def report_cap(stage: str) -> int:
+    """Hard character cap for a stage's report (0 = unlimited)."""
+    return int(REPORT_CAPS.get(stage, REPORT_CAPS.get("*", 0)))
 
-    Done in Python — no LLM needed for concatenation.
-    Each report is cleaned of internal noise before assembly.
-    """
-    header = f"# Specification: {idea}\n\n"
-    header += "*Generated by Agent Two — Netanel Systems*\n"
-    header += f"*Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}*\n"
-    header += f"*Agents: {len(subagent_reports)}/{TOTAL_STEPS} completed*\n"
 
+def build_sections(subagent_reports: dict[str, str]) -> list[tuple[int, str, str]]:
+    """Clean each captured report into (number, section_title, body), in pipeline order."""
     sections = []
     for i, agent_name in enumerate(AGENT_ORDER, 1):
         if agent_name in subagent_reports:
             _, _, _, section_title = AGENT_STEPS[agent_name]
-            cleaned = clean_report(subagent_reports[agent_name])
-            sections.append(f"---\n\n## {i}. {section_title}\n\n{cleaned}")
+            sections.append((i, section_title, clean_report(subagent_reports[agent_name])))
+    return sections
 
-    return header + "\n\n" + "\n\n".join(sections)
 
+def iter_spec(idea: str, sections: list[tuple[int, str, str]], budget_summary: str = "") -> Iterator[str]:
+    """Yield the final specification piece by piece from cleaned sections.
 
-def main() -> None:
-    """Run agent-two with streaming progress and Python-side assembly."""
-    if len(sys.argv) < 2:
-        print("Usage: python -m src.agent 'your agentic app idea'")
-        print()
-        print("Example:")
-        print("  python -m src.agent 'Build a code review agent that reviews PRs'")
-        print("  python -m src.agent 'Build a customer support agent with memory'")
-        sys.exit(1)
+    Done in Python — no LLM needed for concatenation. Writers consume the
+    pieces directly, so no full concatenated copy of the spec is built; the
+    section bodies themselves are whole cleaned copies of the reports.
+    """
+    header = f"# Specification: {idea}\n\n"
+    header += "*Generated by Agent Two — Netanel Systems*\n"
+    header += f"*Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}*\n"
+    header += f"*Agents: {len(sections)}/{TOTAL_STEPS} completed*\n"
+    if budget_summary:
+        header += f"*Budget limits hit: {budget_summary}*\n"
+    yield header
 
-    idea = " ".join(sys.argv[1:])
+    for i, title, body in sections:
+        yield f"\n\n---\n\n## {i}. {title}\n\n"
+        yield body
 
-    print(f"\n  Generating specification for: {idea}")
-    print("=" * 60)
-    print(f"  Pipeline: Lead + {TOTAL_STEPS} subagents")
-    print(f"  Assembly: Python (no LLM stitching)")
-    print("=" * 60)
 
-    # --- State tracking ---
-    current_agent = None
-    agent_start_time = None
-    overall_start = time.time()
+def assemble_spec(idea: str, subagent_reports: dict[str, str], budget_summary: str = "") -> str:
+    """Assemble the final specification from captured subagent outputs.
 
-    # Capture subagent outputs: accumulate streaming tokens per agent.
-    # If a subagent runs twice (e.g. Verifier re-run), we keep the latest.
-    subagent_reports: dict[str, str] = {}
-    current_chunks: list[str] = []
-    crashed = False
+    Each report is cleaned of internal noise before assembly.
+    """
+    return "".join(iter_spec(idea, build_sections(subagent_reports), budget_summary=budget_summary))
 
-    try:
-        for namespace, stream_mode, data in lead_agent.stream(
-            {"messages": [{"role": "user", "content": idea}]},
-            config={"configurable": {"thread_id": "1"}},
-            stream_mode=["messages"],
-            subgraphs=True,
-        ):
-            token, metadata = data
-            agent_name = metadata.get("lc_agent_name", "")
-
-            # --- Detect agent transition ---
-            if agent_name and agent_name != current_agent:
-                # Save previous subagent's accumulated output
-                if current_agent in AGENT_STEPS and current_chunks:
-                    subagent_reports[current_agent] = "".join(current_chunks)
-
-                # Print completion time for previous agent
-                if current_agent and agent_start_time:
-                    elapsed = time.time() - agent_start_time
-                    if current_agent in AGENT_STEPS:
-                        print(f"  Done ({format_duration(elapsed)})")
-
-                current_agent = agent_name
-                agent_start_time = time.time()
-                current_chunks = []
-
-                # Print new agent status
-                if agent_name in AGENT_STEPS:
-                    step_num, display_name, description, _ = AGENT_STEPS[agent_name]
-                    total_elapsed = time.time() - overall_start
-                    print(
-                        f"\n  [{step_num}/{TOTAL_STEPS}] {display_name}"
-                        f"  ({format_duration(total_elapsed)} elapsed)"
-                    )
-                    print(f"  {description}...")
-                elif agent_name == "lead":
-                    total_elapsed = time.time() - overall_start
-                    print(
-                        f"\n  [Lead] Orchestrating..."
-                        f"  ({format_duration(total_elapsed)} elapsed)"
-                    )
 
-            # --- Accumulate ONLY AI text from subagents ---
-            # Skip ToolMessage tokens (raw JSON from tool results).
-            # Only capture AIMessageChunk text content.
-            if (
-                agent_name in AGENT_STEPS
-                and isinstance(token, AIMessageChunk)
-                and token.text
-            ):
-                current_chunks.append(token.text)
+def estimate_cost(usage: dict[str, dict[str, int]], models: dict[str, str]) -> float:
+    """Dollar cost of a run from per-agent token usage and MODEL_PRICING."""
+    cost = 0.0
+    for agent_name, tokens in usage.items():
+        input_price, output_price = MODEL_PRICING.get(models.get(agent_name, ""), (0.0, 0.0))
+        cost += tokens["input"] / 1_000_000 * input_price
+        cost += tokens["output"] / 1_000_000 * output_price
+    return cost
+
+
+def check_citations(report: str) -> str:
+    """Link-check the research report and fix only the flagged citations.
 
+    URL policing runs here in Python (concurrent, cached) instead of inside
+    the Researcher's model loop. The Citation Fixer sees just the flagged
+    lines, so a clean report costs zero LLM calls.
+    """
+    verdicts = url_validator.validate(report)
+    flagged = [v for v in verdicts if not v["ok"]]
+    print(f"  Citations: {len(verdicts)} checked, {len(flagged)} flagged")
+    if not flagged:
+        return report
+
+    lines = report.splitlines()
+    items = []
+    for verdict in flagged:
+        context = next((line.strip() for line in lines if verdict["url"] in line), "")
+        items.append(f"- {verdict['url']} ({verdict['reason']})\n  Cited in: {context}")
+    message = "Find official URLs for these flagged citations:\n\n" + "\n".join(items)
+
+    try:
+        result = citation_fixer.invoke({"messages": [{"role": "user", "content": message}]})
     except Exception as e:
-        # Save whatever the current subagent produced before crashing
-        if current_agent in AGENT_STEPS and current_chunks:
-            subagent_reports[current_agent] = "".join(current_chunks)
-        crashed = True
-        print(f"\n  Pipeline interrupted: {type(e).__name__}: {e}")
-        print(f"  Recovering {len(subagent_reports)}/{TOTAL_STEPS} completed reports...")
+        print(f"  Citation fixer failed: {type(e).__name__}: {e}")
+        return report
+    replacements = parse_replacements(result["messages"][-1].text)
+    # Anything the fixer skipped is still flagged — mark it rather than keep it silently
+    for verdict in flagged:
+        replacements.setdefault(verdict["url"], None)
+    print(f"  Citations fixed: {sum(1 for new in replacements.values() if new)}/{len(flagged)}")
+    return apply_replacements(report, replacements)
+
+
+def run_preverifier(subagent_reports: dict[str, str]) -> list[dict]:
+    """Run the deterministic checks and fold them into the Verification Review.
+
+    Under the "fast" profile the findings are the whole review (no LLM
+    Verifier ran). Under "full" they are prepended to the Verifier's
+    semantic review. Updates subagent_reports in place.
+    """
+    start = time.perf_counter()
+    findings = preverify(subagent_reports)
+    print(f"  Pre-verifier: {len(findings)} findings in {(time.perf_counter() - start) * 1000:.0f} ms")
+    if VERIFY_PROFILE == "fast":
+        subagent_reports["verifier"] = render_review(findings)
+    elif "verifier" in subagent_reports:
+        subagent_reports["verifier"] = (
+            f"### Structural Checks\n{render_findings(findings)}\n\n{subagent_reports['verifier']}"
+        )
+    return findings
+
+
+def recover_reports(thread_id: str) -> dict[str, str]:
+    """Read completed subagent reports back from a thread's checkpoint.
+
+    Every finished task() call is a ToolMessage in the lead's state, so a run
+    resumed after a restart keeps the reports it already paid for.
+    """
+    state = lead_agent.get_state({"configurable": {"thread_id": thread_id}})
+    subagent_types: dict[str, str] = {}
+    reports: dict[str, str] = {}
+    for message in state.values.get("messages", []):
+        for call in getattr(message, "tool_calls", None) or []:
+            if call["name"] == "task":
+                subagent_types[call["id"]] = call["args"].get("subagent_type", "")
+        if isinstance(message, ToolMessage) and subagent_types.get(message.tool_call_id) in AGENT_STEPS:
+            reports[subagent_types[message.tool_call_id]] = message.text
+    return reports
+
+
+def run_pipeline(
+    idea: str,
+    bus: ProgressBus,
+    thread_id: str,
+    resume: bool = False,
+    budget: BudgetTracker | None = None,
+    agent=None,
+) -> dict:
+    """Stream the lead graph for one idea and capture each subagent's report.
+
+    Per token: a type check, a capped list append and a counter; usage and
+    tool-call handling only run for the chunks that carry them.
+    Progress goes to the bus as typed events; token counts in batches.
+    With resume=True the graph continues from the thread's last checkpoint.
+    With a budget, tools and middleware degrade as limits near, and the stream
+    is stopped (keeping completed reports) once a limit is blown past.
+    agent overrides the lead graph (see build_lead_agent); defaults to lead_agent.
+
+    Returns:
+        {"reports": {agent: text}, "usage": {agent: {"input", "output"}},
+         "stage_seconds": {agent: seconds}, "duration": seconds,
+         "error": "Type: message" if the stream crashed, else None,
+         "budget_stop": summary of the budget that stopped the run, else None,
+         "truncated": {agent: characters dropped past the stage's cap},
+         "search_escalation": this run's EscalationStats snapshot,
+         "peak_rss_mb": peak RSS sampled during the stream, None if unavailable}
+    """
+    overall_start = time.time()
+    current_agent = None
+    agent_start_time = overall_start
+
+    # Capture subagent outputs: accumulate streaming tokens per agent into a
+    # capped buffer (a list of chunks with a per-stage hard cap).
+    # If a subagent runs twice (e.g. Verifier re-run), we keep the latest.
+    reports: dict[str, str] = {}
+    truncated: dict[str, int] = {}
+    current_buffer: ReportBuffer | None = None
+    pending_tokens = 0
+
+    # Token usage per agent (lead included), from usage_metadata on the stream
+    usage: dict[str, dict[str, int]] = {}
+    stage_seconds: dict[str, float] = {}
+    error = None
+    budget_stop = None
+    agent = agent or lead_agent
+    budget_token = activate(budget)
+    searches = EscalationStats()
+    searches_token = count_searches(searches)
+
+    def finish_stage() -> None:
+        if current_agent is None:
+            return
+        if current_buffer is not None:
+            if current_buffer:
+                reports[current_agent] = current_buffer.getvalue()
+            if current_buffer.truncated:
+                truncated[current_agent] = current_buffer.dropped
+        bus.tokens(current_agent, pending_tokens)
+        if budget:
+            budget.end_stage(current_agent)
+        duration = time.time() - agent_start_time
+        stage_seconds[current_agent] = stage_seconds.get(current_agent, 0.0) + duration
+        bus.emit(StageFinished(current_agent, duration, bus.stage_tokens.get(current_agent, 0)))
+
+    with RSSSampler() as rss:
+        try:
+            for _, _, (token, metadata) in agent.stream(
+                None if resume else {"messages": [{"role": "user", "content": idea}]},
+                config={"configurable": {"thread_id": thread_id}},
+                stream_mode=["messages"],
+                subgraphs=True,
+            ):
+                agent_name = metadata.get("lc_agent_name", "")
+
+                # --- Detect agent transition ---
+                if agent_name and agent_name != current_agent:
+                    finish_stage()
+                    current_agent = agent_name
+                    agent_start_time = time.time()
+                    current_buffer = (
+                        ReportBuffer(agent_name, report_cap(agent_name))
+                        if agent_name in AGENT_STEPS
+                        else None
+                    )
+                    pending_tokens = 0
+                    if budget:
+                        budget.start_stage(agent_name)
+                    bus.emit(StageStarted(agent_name, agent_start_time - overall_start))
+
+                # --- Accumulate ONLY AI text from subagents ---
+                # Skip ToolMessage tokens (raw JSON from tool results).
+                if not isinstance(token, AIMessageChunk):
+                    continue
+                if current_buffer is not None and agent_name:
+                    text = token.text
+                    if text:
+                        current_buffer.append(text)
+                pending_tokens += 1
+                if pending_tokens >= TOKEN_BATCH and current_agent:
+                    bus.tokens(current_agent, pending_tokens)
+                    pending_tokens = 0
+                    if budget and budget.hard_stop(current_agent):
+                        budget_stop = budget.summary()
+                        break
+
+                if token.tool_call_chunks:
+                    for chunk in token.tool_call_chunks:
+                        if chunk.get("name"):
+                            bus.emit(ToolCalled(current_agent, chunk["name"]))
+                if token.usage_metadata:
+                    tokens = usage.setdefault(agent_name or "lead", {"input": 0, "output": 0})
+                    tokens["input"] += token.usage_metadata.get("input_tokens", 0)
+                    tokens["output"] += token.usage_metadata.get("output_tokens", 0)
+                    if budget:
+                        budget.add_usage(
+                            agent_name or "lead",
+                            token.usage_metadata.get("input_tokens", 0),
+                            token.usage_metadata.get("output_tokens", 0),
+                        )
+                        if budget.hard_stop(current_agent):
+                            budget_stop = budget.summary()
+                            break
+
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            deactivate(budget_token)
+            stop_counting(searches_token)
+
+    # Save whatever the last subagent produced (also after a crash)
+    finish_stage()
+
+    return {
+        "reports": reports,
+        "usage": usage,
+        "stage_seconds": stage_seconds,
+        "duration": time.time() - overall_start,
+        "error": error,
+        "budget_stop": budget_stop,
+        "truncated": truncated,
+        "search_escalation": searches.snapshot(),
+        "peak_rss_mb": rss.peak,
+    }
+
+
+def start_thread(idea: str) -> str:
+    """A new run's thread id, registered with the checkpoint store when there is one."""
+    return checkpoints.start_run(idea) if checkpoints else uuid.uuid4().hex
+
+
+def new_budget(models: dict[str, str]) -> BudgetTracker:
+    """A fresh budget tracker for one run, priced per agent from MODEL_PRICING."""
+    return BudgetTracker(
+        RUN_BUDGET,
+        STAGE_BUDGETS,
+        prices={agent: MODEL_PRICING.get(model, (0.0, 0.0)) for agent, model in models.items()},
+    )
 
-    # Save last subagent if stream ended cleanly
-    if not crashed and current_agent in AGENT_STEPS and current_chunks:
-        subagent_reports[current_agent] = "".join(current_chunks)
 
-    # Print completion for last agent
-    if current_agent and agent_start_time:
-        elapsed = time.time() - agent_start_time
-        if current_agent in AGENT_STEPS:
-            print(f"  Done ({format_duration(elapsed)})")
+def finish_spec(
+    idea: str,
+    thread_id: str,
+    subagent_reports: dict[str, str],
+    result: dict,
+    budget: BudgetTracker,
+    models: dict[str, str],
+    extra_report: dict | None = None,
+    citations_checked: bool = False,
+) -> dict | None:
+    """Everything after the stream: citations, pre-verifier, assembly, archive.
+
+    Args:
+        subagent_reports: Captured reports (recovered ones included).
+        result: run_pipeline()'s return value.
+        extra_report: Extra keys for the archived run report.
+        citations_checked: The research report was already link-checked (shared batch research).
+
+    Returns:
+        The archive record {"id", "path"} (id None if only the index write failed),
+        or None if there was nothing to assemble.
+    """
+    usage = result["usage"]
+    total_time = result["duration"]
+    crashed = result["error"] is not None
+    if checkpoints:
+        checkpoints.finish_run(thread_id, "failed" if crashed else "done")
+    if crashed:
+        print(f"\n  Pipeline interrupted: {result['error']}")
+        print(f"  Recovering {len(subagent_reports)}/{TOTAL_STEPS} completed reports...")
+        if checkpoints:
+            print(f"  Resume with: python -m src.agent --resume {thread_id}")
+    for agent_name, dropped in result.get("truncated", {}).items():
+        print(f"  {agent_name} report truncated at {report_cap(agent_name):,} characters ({dropped:,} dropped)")
+    if result["budget_stop"]:
+        print(f"\n  Stopped by budget: {result['budget_stop']}")
+    budget_summary = budget.summary()
 
-    total_time = time.time() - overall_start
     print(f"\n{'=' * 60}")
     print(f"  Completed in {format_duration(total_time)}")
     print(f"  Reports captured: {len(subagent_reports)}/{TOTAL_STEPS}")
+    if budget_summary:
+        print(f"  Budget limits hit: {budget_summary}")
+    search_escalation = result.get("search_escalation", {})
+    for tool, counts in search_escalation.items():
+        print(f"  {tool}: {counts['escalated']}/{counts['searches']} searches escalated ({counts['rate']:.0%})")
     print("=" * 60)
 
     if not subagent_reports:
         print("\n  Error: No subagent reports captured.")
-        sys.exit(1)
+        return None
+
+    # --- Police citations in Python, not in the Researcher's loop ---
+    if "researcher" in subagent_reports and not citations_checked:
+        try:
+            subagent_reports["researcher"] = check_citations(subagent_reports["researcher"])
+        except Exception as e:
+            # The run is paid for; keep the unchecked report rather than lose the spec
+            print(f"  Citation check failed ({type(e).__name__}: {e}); keeping the report unchecked")
+
+    # --- Mechanical review in Python; the LLM Verifier only judges semantics ---
+    findings = run_preverifier(subagent_reports)
+    verdict = parse_verdict(subagent_reports.get("verifier", ""))
+    if verdict == "APPROVED" and is_blocking(findings):
+        verdict = "NEEDS REVISION"
 
     # --- Assemble in Python, not LLM ---
-    output = assemble_spec(idea, subagent_reports)
-
-    # Save to file
-    os.makedirs("output", exist_ok=True)
-    date_str = datetime.now().strftime("%Y-%m-%d")
-    slug = slugify(idea)
-    filename = f"output/{date_str}-{slug}.md"
+    sections = build_sections(subagent_reports)
 
-    with open(filename, "w") as f:
-        f.write(output)
+    input_tokens = sum(tokens["input"] for tokens in usage.values())
+    output_tokens = sum(tokens["output"] for tokens in usage.values())
+    cost = estimate_cost(usage, models)
 
-    print(f"\n  Saved to: {filename}")
-    print(f"  Length: {len(output):,} characters")
+    # Save to file (atomic, never overwrites), then index it in the archive
+    stem = f"{datetime.now().strftime('%Y-%m-%d')}-{slugify(idea)}"
+    filename = write_spec_file(OUTPUT_DIR, stem, iter_spec(idea, sections, budget_summary=budget_summary))
+    try:
+        spec_id = spec_archive.add(
+            filename,
+            stem,
+            idea,
+            [(title, body) for _, title, body in sections],
+            metadata={
+                "models": models,
+                "prompt_hash": prompt_hash(),
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "cost_usd": cost,
+                "duration_s": total_time,
+                "verdict": verdict,
+                "report": {
+                    "usage": usage,
+                    "crashed": crashed,
+                    "thread_id": thread_id,
+                    "budget_events": budget.events,
+                    "budget_stop": result["budget_stop"],
+                    "model_latency": latency_stats.snapshot(),
+                    "search_escalation": search_escalation,
+                    "preverify": findings,
+                    "truncated": result.get("truncated", {}),
+                    **(extra_report or {}),
+                },
+            },
+        )
+    except sqlite3.Error as e:
+        # The run is paid for and the file is written; only the index entry is lost
+        print(f"\n  Archive index failed ({e}); reindex later with: python -m src.archive reindex {OUTPUT_DIR}")
+        spec_id = None
+    record = {"id": spec_id, "path": filename}
+    if perf_history:
+        try:
+            perf_history.record(
+                "live",
+                prompt_hash(),
+                models,
+                input_tokens,
+                output_tokens,
+                cost,
+                total_time,
+                peak_rss_mb=result.get("peak_rss_mb"),
+                ok=not crashed,
+            )
+        except sqlite3.Error:
+            pass
+
+    print(f"\n  Saved to: {filename}" + (f"  (archive #{spec_id})" if spec_id is not None else ""))
+    print(f"  Length: {os.path.getsize(filename):,} bytes")
     print(f"\n  View result:  cat {filename}")
+    return record
+
+
+def main() -> None:
+    """Run agent-two with streaming progress and Python-side assembly."""
+    parser = argparse.ArgumentParser(prog="python -m src.agent", add_help=True)
+    parser.add_argument("idea", nargs="*")
+    parser.add_argument("--resume", metavar="THREAD_ID", help="continue an interrupted run")
+    args = parser.parse_args()
+
+    if not args.idea and not args.resume:
+        print("Usage: python -m src.agent 'your agentic app idea'")
+        print()
+        print("Example:")
+        print("  python -m src.agent 'Build a code review agent that reviews PRs'")
+        print("  python -m src.agent 'Build a customer support agent with memory'")
+        sys.exit(1)
+
+    recovered: dict[str, str] = {}
+    if args.resume:
+        run = checkpoints.get_run(args.resume) if checkpoints else None
+        if run is None:
+            print(f"  No checkpointed run with thread id {args.resume}")
+            sys.exit(1)
+        idea, thread_id = run["idea"], args.resume
+        recovered = recover_reports(thread_id)
+    else:
+        idea = " ".join(args.idea)
+        thread_id = start_thread(idea)
+
+    # Discovery searches go out now, overlapping the Lead's startup
+    prefetch = start_prefetch(idea) if PREFETCH and not args.resume else None
+
+    print(f"\n  Generating specification for: {idea}")
+    print("=" * 60)
+    print(f"  Pipeline: Lead + {TOTAL_STEPS} subagents")
+    print(f"  Assembly: Python (no LLM stitching)")
+    if recovered:
+        print(f"  Resuming: {len(recovered)}/{TOTAL_STEPS} reports restored from checkpoint")
+    print("=" * 60)
+
+    models = model_ids()
+    budget = new_budget(models)
+
+    bus = ProgressBus([TTYSink(AGENT_STEPS, TOTAL_STEPS)])
+    if PROGRESS_LOG:
+        bus.subscribe(JSONLSink(PROGRESS_LOG, run_id=thread_id))
+    prefetch_token = expect_prefetch(prefetch)
+    try:
+        result = run_pipeline(idea, bus, thread_id, resume=bool(args.resume), budget=budget)
+    finally:
+        bus.close()
+        clear_prefetch(prefetch_token)
+
+    extra = None
+    if prefetch is not None and prefetch.done():
+        extra = {"prefetch": prefetch.result()}
+        print(
+            f"\n  Prefetch: {extra['prefetch']['queries']} queries, "
+            f"{extra['prefetch']['results']} results in {extra['prefetch']['seconds']}s"
+        )
+
+    subagent_reports = {**recovered, **result["reports"]}
+    if finish_spec(idea, thread_id, subagent_reports, result, budget, models, extra_report=extra) is None:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -7,73 +7,180 @@ Verified from docs: https://docs.langchain.com/oss/python/deepagents/subagents
 Pattern: subagents inherit the main agent's model unless overridden.
 """
 
+import hashlib
+
 from deepagents import create_deep_agent
+from langchain.chat_models import init_chat_model
+from langchain_openai import ChatOpenAI
 
-from src.config import MODEL
+from src.budget import BudgetMiddleware
+from src.checkpoint import CheckpointStore
+from src.config import (
+    CHECKPOINT_PATH,
+    CHECKPOINT_STALE_HOURS,
+    CHECKPOINT_TTL_HOURS,
+    CHECKPOINTER,
+    MODEL,
+    MODEL_FALLBACKS,
+    MODEL_HEDGE_QUANTILE,
+    MODEL_TTFT_DEADLINE,
+    PROMPT_VARIANT,
+    VERIFY_PROFILE,
+)
 from src.prompts import (
     AGENT_DESIGNER_PROMPT,
+    CITATION_FIXER_PROMPT,
     INFRA_PLANNER_PROMPT,
     LEAD_PROMPT,
+    LEAD_PROMPT_FAST,
     RESEARCHER_PROMPT,
     VERIFIER_PROMPT,
     WORKFLOW_DESIGNER_PROMPT,
+    prompt_variant,
 )
-from src.tools import internet_search, search_official_site
+from src.router import LatencyStats, RoutedChatModel
+from src.tools import internet_search, local_search, search_official_site
 
 # Define the 5 subagents as dictionaries.
 # Each gets spawned as an ephemeral agent when Lead calls task().
 # All agents use GPT-4o-mini — $0.15/$0.60 per MTok, better structured output.
-SUBAGENT_MODEL = "openai:gpt-4o-mini"
+# stream_usage=True so token counts arrive on the stream (for cost tracking).
+SUBAGENT_MODEL = ChatOpenAI(model="gpt-4o-mini", stream_usage=True)
+
+# Live TTFT stats shared by every agent's router, so all runs in this process learn together
+latency_stats = LatencyStats()
+
+
+def routed(agent: str, primary) -> RoutedChatModel:
+    """Wrap an agent's primary model with its fallback list, TTFT deadline and hedging."""
+    fallbacks = MODEL_FALLBACKS.get(agent, MODEL_FALLBACKS.get("*", []))
+    return RoutedChatModel(
+        candidates=[primary, *(init_chat_model(model, stream_usage=True) for model in fallbacks)],
+        stats=latency_stats,
+        ttft_deadline=MODEL_TTFT_DEADLINE,
+        hedge_quantile=MODEL_HEDGE_QUANTILE,
+    )
+
+
+def system_prompt(agent: str, prompt: str) -> str:
+    """An agent's prompt in its configured variant (full, slim, minimal)."""
+    return prompt_variant(prompt, PROMPT_VARIANT.get(agent, PROMPT_VARIANT.get("*", "full")))
+
 
 researcher = {
     "name": "researcher",
     "description": "Researches existing solutions, frameworks, and patterns for agentic AI applications. Use this first to understand the landscape before designing.",
-    "system_prompt": RESEARCHER_PROMPT,
-    "tools": [internet_search, search_official_site],
-    "model": SUBAGENT_MODEL,
+    "system_prompt": system_prompt("researcher", RESEARCHER_PROMPT),
+    "tools": [local_search, internet_search, search_official_site],
+    "model": routed("researcher", SUBAGENT_MODEL),
+    "middleware": [BudgetMiddleware("researcher")],
 }
 
 agent_designer = {
     "name": "agent_designer",
     "description": "Designs agents with roles, tools, system prompts, and model recommendations based on research findings.",
-    "system_prompt": AGENT_DESIGNER_PROMPT,
+    "system_prompt": system_prompt("agent_designer", AGENT_DESIGNER_PROMPT),
     "tools": [],
-    "model": SUBAGENT_MODEL,
+    "model": routed("agent_designer", SUBAGENT_MODEL),
+    "middleware": [BudgetMiddleware("agent_designer")],
 }
 
 workflow_designer = {
     "name": "workflow_designer",
     "description": "Plans agent communication, data flow, execution order, retry logic, and termination conditions.",
-    "system_prompt": WORKFLOW_DESIGNER_PROMPT,
+    "system_prompt": system_prompt("workflow_designer", WORKFLOW_DESIGNER_PROMPT),
     "tools": [],
-    "model": SUBAGENT_MODEL,
+    "model": routed("workflow_designer", SUBAGENT_MODEL),
+    "middleware": [BudgetMiddleware("workflow_designer")],
 }
 
 infra_planner = {
     "name": "infra_planner",
     "description": "Plans memory, evaluation criteria, tracing, deployment, and cost estimation for the system.",
-    "system_prompt": INFRA_PLANNER_PROMPT,
+    "system_prompt": system_prompt("infra_planner", INFRA_PLANNER_PROMPT),
     "tools": [],
-    "model": SUBAGENT_MODEL,
+    "model": routed("infra_planner", SUBAGENT_MODEL),
+    "middleware": [BudgetMiddleware("infra_planner")],
 }
 
 verifier = {
     "name": "verifier",
     "description": "Reviews the complete design for gaps, risks, and improvement suggestions. Returns APPROVED or NEEDS REVISION.",
-    "system_prompt": VERIFIER_PROMPT,
+    "system_prompt": system_prompt("verifier", VERIFIER_PROMPT),
     "tools": [],
-    "model": SUBAGENT_MODEL,
+    "model": routed("verifier", SUBAGENT_MODEL),
+    "middleware": [BudgetMiddleware("verifier")],
 }
 
-# All subagents in delegation order
-subagents = [researcher, agent_designer, workflow_designer, infra_planner, verifier]
+# All subagents in delegation order.
+# The "fast" verify profile drops the Verifier; the Python pre-verifier stands in for it.
+if VERIFY_PROFILE == "fast":
+    lead_prompt = system_prompt("lead", LEAD_PROMPT_FAST)
+    subagents = [researcher, agent_designer, workflow_designer, infra_planner]
+else:
+    lead_prompt = system_prompt("lead", LEAD_PROMPT)
+    subagents = [researcher, agent_designer, workflow_designer, infra_planner, verifier]
+
+
+def model_ids() -> dict[str, str]:
+    """Model id per agent, for run metadata."""
+    ids = {"lead": MODEL.model_name}
+    for subagent in subagents:
+        ids[subagent["name"]] = subagent["model"].model_name
+    return ids
+
+
+def prompt_hash() -> str:
+    """Short hash over every system prompt in the graph.
+
+    Ties archived specs and metrics to the exact prompt version that produced them.
+    """
+    digest = hashlib.sha256(lead_prompt.encode())
+    for subagent in subagents:
+        digest.update(subagent["system_prompt"].encode())
+    return digest.hexdigest()[:12]
+
+
+# Persistent checkpoints: one thread per run, compacted when done, pruned after the TTL.
+checkpoints = (
+    CheckpointStore(
+        CHECKPOINT_PATH,
+        ttl_seconds=CHECKPOINT_TTL_HOURS * 3600,
+        stale_seconds=CHECKPOINT_STALE_HOURS * 3600,
+    )
+    if CHECKPOINTER == "sqlite"
+    else None
+)
+
+
+def build_lead_agent(overrides: list[dict] | None = None):
+    """Build the lead graph, optionally replacing subagents by name.
+
+    Overrides are deepagents CompiledSubAgent dicts ({"name", "description",
+    "runnable"}) — e.g. batch runs swap the researcher for one that returns
+    research already done for the whole cluster.
+    """
+    replacements = {override["name"]: override for override in overrides or []}
+    return create_deep_agent(
+        model=routed("lead", MODEL),
+        name="lead",
+        system_prompt=lead_prompt,
+        subagents=[replacements.get(subagent["name"], subagent) for subagent in subagents],
+        middleware=[BudgetMiddleware("lead")],
+        checkpointer=checkpoints.saver if checkpoints else None,
+    )
+
 
 # Lead Agent — the orchestrator.
 # Has no tools of its own. Delegates via the built-in task() tool.
 # Subagents are ephemeral: born, do work, return report, die.
-lead_agent = create_deep_agent(
-    model=MODEL,
-    name="lead",
-    system_prompt=LEAD_PROMPT,
-    subagents=subagents,
+lead_agent = build_lead_agent()
+
+# Citation Fixer — runs outside the lead graph, only when the Python link
+# checker flags URLs in the research report. Sees only the flagged lines.
+citation_fixer = create_deep_agent(
+    model=routed("citation_fixer", SUBAGENT_MODEL),
+    name="citation_fixer",
+    system_prompt=system_prompt("citation_fixer", CITATION_FIXER_PROMPT),
+    tools=[search_official_site],
 )
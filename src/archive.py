@@ -0,0 +1,368 @@
+"""Spec archive for Agent Two - Netanel Systems.
+
+Every generated spec is written to output/ atomically under a collision-free
+name, and indexed into SQLite: run metadata (idea, models, prompt hash,
+tokens, cost, duration, verdict) plus an FTS5 index over its sections.
+Lookups hit the index instead of scanning thousands of markdown files.
+
+Usage:
+    python -m src.archive search "long-term memory"
+    python -m src.archive list [--limit 20]
+    python -m src.archive show 42
+    python -m src.archive reindex output/
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import closing
+from datetime import datetime
+from typing import Iterable
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS specs (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    idea TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    path TEXT NOT NULL UNIQUE,
+    models TEXT NOT NULL DEFAULT '{}',
+    prompt_hash TEXT NOT NULL DEFAULT '',
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    cost_usd REAL NOT NULL DEFAULT 0,
+    duration_s REAL NOT NULL DEFAULT 0,
+    verdict TEXT,
+    report TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS specs_created_at ON specs(created_at);
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    spec_id INTEGER NOT NULL REFERENCES specs(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sections_spec_id ON sections(spec_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS sections_fts USING fts5(
+    title, body, content='sections', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS sections_ai AFTER INSERT ON sections BEGIN
+    INSERT INTO sections_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS sections_ad AFTER DELETE ON sections BEGIN
+    INSERT INTO sections_fts(sections_fts, rowid, title, body)
+    VALUES ('delete', old.id, old.title, old.body);
+END;
+"""
+
+# "## 3. Workflow Design" — section headings written by assemble_spec
+SECTION_HEADING = re.compile(r"^## \d+\. (.+)$", re.MULTILINE)
+VERIFIER_SECTION = "Verification Review"
+
+
+def write_spec_file(output_dir: str, stem: str, text: str | Iterable[str]) -> str:
+    """Atomically write a spec to {output_dir}/{stem}.md without overwriting anything.
+
+    The name is reserved with O_EXCL (so concurrent runs of the same idea get
+    -2, -3, ... suffixes), then the content lands via rename — readers never
+    see a half-written file. ``text`` may be a string or an iterable of
+    pieces, written as they come.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    n = 1
+    while True:
+        path = os.path.join(output_dir, f"{stem}.md" if n == 1 else f"{stem}-{n}.md")
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+            break
+        except FileExistsError:
+            n += 1
+
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix=".tmp-", suffix=".md")
+    try:
+        with os.fdopen(fd, "w") as f:
+            if isinstance(text, str):
+                f.write(text)
+            else:
+                f.writelines(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        os.unlink(path)
+        raise
+    return path
+
+
+def parse_verdict(verifier_report: str) -> str | None:
+    """Extract APPROVED / NEEDS REVISION from the Verifier's output."""
+    verdict = verifier_report.rsplit("### Verdict", 1)[-1]
+    if "NEEDS REVISION" in verdict:
+        return "NEEDS REVISION"
+    if "APPROVED" in verdict:
+        return "APPROVED"
+    return None
+
+
+def fts_query(query: str) -> str:
+    """A user query as an FTS5 expression: every word must match.
+
+    Each whitespace-separated word is quoted, so punctuation in it
+    ("long-term", "agent's", "c++") is searched as text, never read as FTS5
+    syntax. A hyphenated word becomes a phrase ("long term").
+    """
+    words = [word.replace('"', '""') for word in query.split() if re.search(r"\w", word)]
+    return " ".join(f'"{word}"' for word in words)
+
+
+def split_sections(spec_text: str) -> list[tuple[str, str]]:
+    """Split an assembled spec back into (title, body) sections."""
+    matches = list(SECTION_HEADING.finditer(spec_text))
+    sections = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(spec_text)
+        body = spec_text[match.end():end].strip().removesuffix("---").strip()
+        sections.append((match.group(1).strip(), body))
+    return sections
+
+
+class SpecArchive:
+    """SQLite metadata + FTS5 section index over every generated spec."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys=ON")
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._initialized = True
+        return conn
+
+    def save(
+        self,
+        output_dir: str,
+        stem: str,
+        idea: str,
+        spec_text: str | Iterable[str],
+        metadata: dict | None = None,
+        sections: list[tuple[str, str]] | None = None,
+    ) -> dict:
+        """Write the spec file and index it. Returns the archived record.
+
+        Args:
+            output_dir: Directory for the markdown file.
+            stem: File name without extension, e.g. "2025-01-31-code-review-agent".
+            idea: The user's original idea.
+            spec_text: Full assembled markdown, or an iterable of its pieces
+                (then pass sections, since there is no text to parse).
+            metadata: Optional keys: models (dict), prompt_hash, input_tokens,
+                output_tokens, cost_usd, duration_s, verdict, report (dict).
+            sections: (title, body) pairs to index. Parsed from spec_text if omitted.
+        """
+        if sections is None:
+            if not isinstance(spec_text, str):
+                raise ValueError("sections are required when spec_text is an iterable")
+            sections = split_sections(spec_text)
+        path = write_spec_file(output_dir, stem, spec_text)
+        return {"id": self.add(path, stem, idea, sections, metadata), "path": path}
+
+    def add(
+        self,
+        path: str,
+        stem: str,
+        idea: str,
+        sections: list[tuple[str, str]],
+        metadata: dict | None = None,
+    ) -> int:
+        """Index a spec file that is already written (see save). Returns its id."""
+        metadata = metadata or {}
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO specs (
+                    created_at, idea, slug, path, models, prompt_hash, input_tokens,
+                    output_tokens, cost_usd, duration_s, verdict, report
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    time.time(),
+                    idea,
+                    stem,
+                    path,
+                    json.dumps(metadata.get("models", {})),
+                    metadata.get("prompt_hash", ""),
+                    metadata.get("input_tokens", 0),
+                    metadata.get("output_tokens", 0),
+                    metadata.get("cost_usd", 0.0),
+                    metadata.get("duration_s", 0.0),
+                    metadata.get("verdict"),
+                    json.dumps(metadata.get("report", {})),
+                ),
+            )
+            spec_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO sections (spec_id, position, title, body) VALUES (?, ?, ?, ?)",
+                [(spec_id, i, title, body) for i, (title, body) in enumerate(sections, 1)],
+            )
+        return spec_id
+
+    def search(self, query: str, limit: int = 10) -> list[dict]:
+        """Full-text search over spec sections, best matches first. Every word of the query must match."""
+        match = fts_query(query)
+        if not match:
+            return []
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                """
+                SELECT s.id, s.created_at, s.idea, s.path, s.verdict, x.title AS section,
+                       snippet(sections_fts, 1, '[', ']', ' … ', 16) AS snippet
+                FROM sections_fts
+                JOIN sections x ON x.id = sections_fts.rowid
+                JOIN specs s ON s.id = x.spec_id
+                WHERE sections_fts MATCH ?
+                ORDER BY bm25(sections_fts)
+                LIMIT ?
+                """,
+                (match, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def recent(self, limit: int = 20) -> list[dict]:
+        """Most recent specs, newest first."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                """
+                SELECT id, created_at, idea, path, verdict, cost_usd, duration_s
+                FROM specs ORDER BY created_at DESC LIMIT ?
+                """,
+                (limit,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get(self, spec_id: int) -> dict | None:
+        """One spec's metadata and sections."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM specs WHERE id = ?", (spec_id,)).fetchone()
+            if row is None:
+                return None
+            sections = conn.execute(
+                "SELECT title, body FROM sections WHERE spec_id = ? ORDER BY position",
+                (spec_id,),
+            ).fetchall()
+        record = dict(row)
+        record["models"] = json.loads(record["models"])
+        record["report"] = json.loads(record["report"])
+        record["sections"] = [dict(section) for section in sections]
+        return record
+
+    def has_path(self, path: str) -> bool:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT 1 FROM specs WHERE path = ?", (path,)).fetchone() is not None
+
+    def index_file(self, path: str) -> int | None:
+        """Index an existing spec file in place (no copy). Returns the new id, or None if known."""
+        if self.has_path(path):
+            return None
+        with open(path) as f:
+            text = f.read()
+        first_line = text.split("\n", 1)[0]
+        idea = first_line.removeprefix("# Specification: ").strip()
+        sections = split_sections(text)
+        verdict = parse_verdict(dict(sections).get(VERIFIER_SECTION, ""))
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT INTO specs (created_at, idea, slug, path, verdict) VALUES (?, ?, ?, ?, ?)",
+                (os.path.getmtime(path), idea, os.path.basename(path)[:-3], path, verdict),
+            )
+            spec_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO sections (spec_id, position, title, body) VALUES (?, ?, ?, ?)",
+                [(spec_id, i, title, body) for i, (title, body) in enumerate(sections, 1)],
+            )
+        return spec_id
+
+
+def _format_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M")
+
+
+def main() -> None:
+    """Query CLI for the spec archive."""
+    from src.config import ARCHIVE_PATH
+
+    parser = argparse.ArgumentParser(prog="python -m src.archive", description="Query archived specs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    search = commands.add_parser("search", help="Full-text search over spec sections")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=10)
+    recent = commands.add_parser("list", help="Most recent specs")
+    recent.add_argument("--limit", type=int, default=20)
+    show = commands.add_parser("show", help="Print one spec's metadata and sections")
+    show.add_argument("id", type=int)
+    reindex = commands.add_parser("reindex", help="Index existing spec files from a directory")
+    reindex.add_argument("directory", nargs="?", default="output")
+    args = parser.parse_args()
+
+    archive = SpecArchive(ARCHIVE_PATH)
+
+    if args.command == "search":
+        try:
+            hits = archive.search(args.query, limit=args.limit)
+        except sqlite3.OperationalError as e:
+            print(f"  Invalid search query: {e}")
+            sys.exit(1)
+        for hit in hits:
+            print(f"  #{hit['id']}  {_format_time(hit['created_at'])}  {hit['idea']}")
+            print(f"      {hit['section']}: {hit['snippet']}")
+            print(f"      {hit['path']}")
+        if not hits:
+            print("  No matches.")
+
+    elif args.command == "list":
+        for spec in archive.recent(limit=args.limit):
+            verdict = spec["verdict"] or "-"
+            print(
+                f"  #{spec['id']}  {_format_time(spec['created_at'])}  {verdict:<14}"
+                f"  ${spec['cost_usd']:.4f}  {spec['idea']}"
+            )
+
+    elif args.command == "show":
+        spec = archive.get(args.id)
+        if spec is None:
+            print(f"  No spec with id {args.id}")
+            sys.exit(1)
+        print(f"  Idea:        {spec['idea']}")
+        print(f"  Path:        {spec['path']}")
+        print(f"  Created:     {_format_time(spec['created_at'])}")
+        print(f"  Models:      {', '.join(f'{k}={v}' for k, v in spec['models'].items()) or '-'}")
+        print(f"  Prompt hash: {spec['prompt_hash'] or '-'}")
+        print(f"  Tokens:      {spec['input_tokens']:,} in / {spec['output_tokens']:,} out")
+        print(f"  Cost:        ${spec['cost_usd']:.4f}")
+        print(f"  Duration:    {spec['duration_s']:.0f}s")
+        print(f"  Verdict:     {spec['verdict'] or '-'}")
+        print(f"  Sections:    {', '.join(s['title'] for s in spec['sections'])}")
+
+    elif args.command == "reindex":
+        added = 0
+        for name in sorted(os.listdir(args.directory)):
+            if name.endswith(".md") and not name.startswith("."):
+                if archive.index_file(os.path.join(args.directory, name)) is not None:
+                    added += 1
+        print(f"  Indexed {added} new spec(s) from {args.directory}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""Batch spec generation for Agent Two - Netanel Systems.
+
+Incoming ideas are heavily clustered ("code review agent" in a dozen
+flavours). Research is the slowest, most tool-heavy stage, so a batch:
+
+1. Clusters ideas by local text similarity (TF-IDF cosine, no API calls).
+2. Runs the Researcher once per cluster, on a merged brief of its ideas.
+3. Runs each idea's pipeline with the researcher swapped for a compiled
+   subagent that returns the shared research instantly.
+
+The shared pass's tokens are split evenly across the cluster and charged to
+each idea's researcher usage, so per-spec cost and perf history include it.
+
+Singleton clusters run the normal pipeline.
+
+Usage:
+    python -m src.batch ideas.txt            # one idea per line, # for comments
+    python -m src.batch ideas.txt --dry-run  # show the clusters only
+"""
+
+import argparse
+import math
+import sys
+import time
+from collections import Counter
+from typing import Callable
+
+from deepagents import create_deep_agent
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from src.agent import (
+    AGENT_STEPS,
+    TOTAL_STEPS,
+    check_citations,
+    finish_spec,
+    new_budget,
+    recover_reports,
+    run_pipeline,
+    start_thread,
+)
+from src.agents import build_lead_agent, checkpoints, model_ids, researcher
+from src.budget import activate, deactivate
+from src.config import BATCH_MAX_CLUSTER, BATCH_SIMILARITY, PROGRESS_LOG
+from src.knowledge_base import query_terms, stem
+from src.progress import JSONLSink, ProgressBus, TTYSink, format_duration
+from src.tools import EscalationStats, count_searches, stop_counting
+
+
+def read_ideas(path: str) -> list[str]:
+    """Non-empty, non-comment lines of an ideas file, duplicates dropped."""
+    ideas = []
+    with open(path) as f:
+        for line in f:
+            idea = line.strip()
+            if idea and not idea.startswith("#") and idea not in ideas:
+                ideas.append(idea)
+    return ideas
+
+
+# Words every idea shares; they say nothing about what to research
+GENERIC_TERMS = {"agent", "agents", "agentic", "ai", "app", "build", "builds", "create", "make", "system", "that", "which"}
+
+
+def idea_terms(idea: str) -> list[str]:
+    return [stem(term) for term in query_terms(idea) if term not in GENERIC_TERMS]
+
+
+def vectorize(ideas: list[str]) -> list[dict[str, float]]:
+    """Unit-length TF-IDF vectors over each idea's stemmed terms."""
+    terms = [Counter(idea_terms(idea)) for idea in ideas]
+    document_frequency = Counter(term for counts in terms for term in counts)
+    vectors = []
+    for counts in terms:
+        vector = {
+            term: count * (math.log((1 + len(ideas)) / (1 + document_frequency[term])) + 1)
+            for term, count in counts.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        vectors.append({term: weight / norm for term, weight in vector.items()})
+    return vectors
+
+
+def cosine(a: dict[str, float], b: dict[str, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(term, 0.0) for term, weight in a.items())
+
+
+def cluster(ideas: list[str], threshold: float = BATCH_SIMILARITY, max_size: int = BATCH_MAX_CLUSTER) -> list[list[int]]:
+    """Greedy centroid clustering. Returns lists of idea indices, in input order."""
+    vectors = vectorize(ideas)
+    clusters: list[list[int]] = []
+    centroids: list[dict[str, float]] = []
+    for i, vector in enumerate(vectors):
+        best, best_score = None, threshold
+        for c, centroid in enumerate(centroids):
+            if len(clusters[c]) >= max_size:
+                continue
+            score = cosine(vector, centroid)
+            if score >= best_score:
+                best, best_score = c, score
+        if best is None:
+            clusters.append([i])
+            centroids.append(dict(vector))
+            continue
+        clusters[best].append(i)
+        # Centroid = normalized sum of member vectors
+        summed = Counter()
+        for member in clusters[best]:
+            summed.update(vectors[member])
+        norm = math.sqrt(sum(weight * weight for weight in summed.values())) or 1.0
+        centroids[best] = {term: weight / norm for term, weight in summed.items()}
+    return clusters
+
+
+def split_usage(usage: dict[str, int], parts: int) -> list[dict[str, int]]:
+    """Split token counts into `parts` near-equal shares that add back up exactly."""
+    shares = [{} for _ in range(parts)]
+    for key, total in usage.items():
+        each, extra = divmod(total, parts)
+        for i, share in enumerate(shares):
+            share[key] = each + (1 if i < extra else 0)
+    return shares
+
+
+def merged_brief(ideas: list[str]) -> str:
+    """One research task covering every idea in a cluster."""
+    listed = "\n".join(f"- {idea}" for idea in ideas)
+    return (
+        "Research existing solutions for this family of closely related ideas. "
+        "One report will inform the design of each of them, so cover what they share "
+        "and note anything only one of them needs:\n"
+        f"{listed}"
+    )
+
+
+def research_cluster(ideas: list[str]) -> dict:
+    """Run the Researcher once for a cluster, under the same budget as a pipeline stage.
+
+    Usage is fed to the budget step by step, so the tool cut-off and the hard
+    stop apply to the shared pass like they do inside run_pipeline.
+
+    Returns:
+        {"report": text, "usage": {"input", "output"}, "duration": seconds,
+         "error": str | None, "budget_stop": summary | None,
+         "search_escalation": the pass's EscalationStats snapshot}
+    """
+    agent = create_deep_agent(
+        model=researcher["model"],
+        name="researcher",
+        system_prompt=researcher["system_prompt"],
+        tools=researcher["tools"],
+        middleware=researcher["middleware"],
+    )
+    budget = new_budget(model_ids())
+    budget.start_stage("researcher")
+    budget_token = activate(budget)
+    searches = EscalationStats()
+    searches_token = count_searches(searches)
+    start = time.time()
+    usage = {"input": 0, "output": 0}
+    messages: list = []
+    seen = 0
+    budget_stop = None
+    try:
+        for state in agent.stream(
+            {"messages": [{"role": "user", "content": merged_brief(ideas)}]},
+            stream_mode="values",
+        ):
+            messages = state["messages"]
+            for message in messages[seen:]:
+                if isinstance(message, AIMessage) and message.usage_metadata:
+                    input_tokens = message.usage_metadata.get("input_tokens", 0)
+                    output_tokens = message.usage_metadata.get("output_tokens", 0)
+                    usage["input"] += input_tokens
+                    usage["output"] += output_tokens
+                    budget.add_usage("researcher", input_tokens, output_tokens)
+            seen = len(messages)
+            if budget.hard_stop("researcher"):
+                budget_stop = budget.summary()
+                break
+    except Exception as e:
+        return {
+            "report": "",
+            "usage": usage,
+            "duration": time.time() - start,
+            "error": f"{type(e).__name__}: {e}",
+            "budget_stop": budget_stop,
+            "search_escalation": searches.snapshot(),
+        }
+    finally:
+        deactivate(budget_token)
+        stop_counting(searches_token)
+
+    outcome = {"usage": usage, "budget_stop": budget_stop, "search_escalation": searches.snapshot()}
+    last = messages[-1] if messages else None
+    if not isinstance(last, AIMessage) or not last.text:
+        error = f"stopped by budget: {budget_stop}" if budget_stop else "no report"
+        return {**outcome, "report": "", "duration": time.time() - start, "error": error}
+    report = check_citations(last.text)
+    return {**outcome, "report": report, "duration": time.time() - start, "error": None}
+
+
+def shared_researcher(report: str) -> dict:
+    """Compiled subagent standing in for the Researcher: returns the cluster's report."""
+    return {
+        "name": "researcher",
+        "description": researcher["description"],
+        "runnable": RunnableLambda(lambda state: {"messages": [AIMessage(content=report)]}),
+    }
+
+
+def run_idea(
+    idea: str,
+    shared: dict | None = None,
+    cluster_id: int | None = None,
+    thread_id: str | None = None,
+    on_thread: Callable[[str], None] | None = None,
+    keep_partial: bool = True,
+    research_share: dict[str, int] | None = None,
+) -> dict:
+    """One idea through the pipeline, with the cluster's shared research if given.
+
+    Args:
+        research_share: This idea's {"input", "output"} share of the shared research
+            tokens, charged to its researcher usage. Defaults to the whole pass.
+        thread_id: Thread of an earlier attempt (job retries). Resumed from its last
+            checkpoint when the store still has it; otherwise a new run starts.
+        on_thread: Called with the thread id before the stream starts.
+        keep_partial: Assemble and archive what a crashed stream produced. Off for
+            attempts that will be retried, so the archive only gets the final spec.
+
+    Returns:
+        {"record": archive record or None, "error": the pipeline error or None, "thread_id"}
+    """
+    resume = False
+    if thread_id and checkpoints and checkpoints.get_run(thread_id):
+        resume = checkpoints.has_checkpoint(thread_id)
+    else:
+        thread_id = start_thread(idea)
+    if on_thread:
+        on_thread(thread_id)
+    recovered = recover_reports(thread_id) if resume else {}
+    models = model_ids()
+    budget = new_budget(models)
+    agent = build_lead_agent([shared_researcher(shared["report"])]) if shared else None
+
+    print(f"\n  Generating specification for: {idea}")
+    if shared:
+        print(f"  Research: shared with cluster {cluster_id}")
+    if resume:
+        print(f"  Resuming thread {thread_id}: {len(recovered)}/{TOTAL_STEPS} reports restored from checkpoint")
+    bus = ProgressBus([TTYSink(AGENT_STEPS, TOTAL_STEPS)])
+    if PROGRESS_LOG:
+        bus.subscribe(JSONLSink(PROGRESS_LOG, run_id=thread_id))
+    try:
+        result = run_pipeline(idea, bus, thread_id, resume=resume, budget=budget, agent=agent)
+    finally:
+        bus.close()
+
+    if result["error"] and not keep_partial:
+        if checkpoints:
+            checkpoints.finish_run(thread_id, "failed")
+        print(f"\n  Pipeline interrupted: {result['error']} (will resume from the checkpoint)")
+        return {"record": None, "error": result["error"], "thread_id": thread_id}
+
+    reports = {**recovered, **result["reports"]}
+    extra = None
+    if shared:
+        # The compiled researcher streams no tokens, so its report is not captured
+        reports["researcher"] = shared["report"]
+        share = research_share or shared["usage"]
+        tokens = result["usage"].setdefault("researcher", {"input": 0, "output": 0})
+        tokens["input"] += share["input"]
+        tokens["output"] += share["output"]
+        extra = {
+            "shared_research": {
+                "cluster": cluster_id,
+                "usage": shared["usage"],
+                "charged": share,
+                "search_escalation": shared["search_escalation"],
+            }
+        }
+    # Shared research was link-checked once in research_cluster
+    record = finish_spec(
+        idea, thread_id, reports, result, budget, models, extra_report=extra, citations_checked=bool(shared)
+    )
+    return {"record": record, "error": result["error"], "thread_id": thread_id}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.batch", description="Generate specs for a file of ideas.")
+    parser.add_argument("ideas_file")
+    parser.add_argument("--threshold", type=float, default=BATCH_SIMILARITY, help="cosine similarity to share research")
+    parser.add_argument("--max-cluster", type=int, default=BATCH_MAX_CLUSTER)
+    parser.add_argument("--dry-run", action="store_true", help="print the clusters and exit")
+    args = parser.parse_args()
+
+    ideas = read_ideas(args.ideas_file)
+    if not ideas:
+        print(f"  No ideas in {args.ideas_file}")
+        sys.exit(1)
+    clusters = cluster(ideas, threshold=args.threshold, max_size=args.max_cluster)
+    shared_count = sum(len(members) for members in clusters if len(members) > 1)
+    print(f"\n  {len(ideas)} ideas → {len(clusters)} research passes ({shared_count} ideas share research)")
+    for c, members in enumerate(clusters, 1):
+        print(f"  [{c}] " + "\n      ".join(ideas[i] for i in members))
+    if args.dry_run:
+        return
+
+    start = time.time()
+    saved = failed = 0
+    for c, members in enumerate(clusters, 1):
+        shared = None
+        if len(members) > 1:
+            print(f"\n  Researching cluster {c} ({len(members)} ideas)...")
+            shared = research_cluster([ideas[i] for i in members])
+            if shared["error"]:
+                print(f"  Shared research failed ({shared['error']}); researching each idea separately")
+                shared = None
+            else:
+                print(f"  Shared research done in {format_duration(shared['duration'])}")
+        shares = split_usage(shared["usage"], len(members)) if shared else [None] * len(members)
+        for i, share in zip(members, shares):
+            if run_idea(ideas[i], shared, cluster_id=c, research_share=share)["record"] is None:
+                failed += 1
+            else:
+                saved += 1
+
+    print(f"\n{'=' * 60}")
+    print(f"  Batch done in {format_duration(time.time() - start)}: {saved} saved, {failed} failed")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Per-run and per-stage budgets for Agent Two - Netanel Systems.
+
+Limits on tokens, dollars, and wall-clock seconds are enforced live from the
+stream (usage_metadata + elapsed time). As a stage or the run approaches a
+limit, the pipeline degrades in steps instead of running away:
+
+  level 1 (DEGRADE_AT[0] of a limit): searches drop to search_depth="basic"
+  level 2 (DEGRADE_AT[1]):            searches return at most 2 results
+  level 3 (limit reached):            tools are cut off and the model is told to finalize
+  hard stop (HARD_STOP × limit):      the stream is stopped; completed reports are kept
+
+Every threshold crossed is recorded once, for the run report. A stage's
+seconds count only the time spent inside it: a stage the lead delegates to
+twice is charged for both visits, not for the stages in between.
+"""
+
+import threading
+import time
+from contextvars import ContextVar
+
+from langchain.agents.middleware import AgentMiddleware
+
+METRICS = ("tokens", "dollars", "seconds")
+DEGRADE_AT = (0.6, 0.8, 1.0)
+HARD_STOP = 1.25
+DEGRADED_MAX_RESULTS = 2
+
+FINALIZE_NOTE = (
+    "\n\nBUDGET EXHAUSTED: You have no more tool calls. Write your final answer now, "
+    "using only what you already have, in the required output format."
+)
+TOOL_CUTOFF = "Budget exhausted: do not search again. Finalize your report with the results you already have."
+
+_active: ContextVar["BudgetTracker | None"] = ContextVar("budget_tracker", default=None)
+
+
+class BudgetTracker:
+    """Live usage against run and stage limits. A limit of 0 means unlimited.
+
+    Thread-safe: the stream thread feeds usage while tool threads read levels.
+    """
+
+    def __init__(
+        self,
+        run_limits: dict[str, float],
+        stage_limits: dict[str, dict[str, float]],
+        prices: dict[str, tuple[float, float]],
+    ):
+        """
+        Args:
+            run_limits: {"tokens": int, "dollars": float, "seconds": float} for the whole run.
+            stage_limits: Same shape, per stage name.
+            prices: USD per million tokens (input, output) per stage name.
+        """
+        self.run_limits = run_limits
+        self.stage_limits = stage_limits
+        self.prices = prices
+        self.started_at = time.time()
+        self.stage_seconds: dict[str, float] = {}
+        self._entered_at: dict[str, float] = {}
+        self.used: dict[str, dict[str, float]] = {}
+        self.events: list[dict] = []
+        self._fired: set[tuple] = set()
+        self._lock = threading.Lock()
+
+    # --- Feeding usage ---
+
+    def start_stage(self, stage: str) -> None:
+        """Start (or resume) the stage's clock. A no-op while it is already running."""
+        with self._lock:
+            self._entered_at.setdefault(stage, time.time())
+
+    def end_stage(self, stage: str) -> None:
+        """Stop the stage's clock, banking the time since start_stage."""
+        with self._lock:
+            entered = self._entered_at.pop(stage, None)
+            if entered is not None:
+                self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + time.time() - entered
+
+    def add_usage(self, stage: str, input_tokens: int, output_tokens: int) -> None:
+        input_price, output_price = self.prices.get(stage, (0.0, 0.0))
+        with self._lock:
+            used = self.used.setdefault(stage, {"tokens": 0, "dollars": 0.0})
+            used["tokens"] += input_tokens + output_tokens
+            used["dollars"] += input_tokens / 1_000_000 * input_price + output_tokens / 1_000_000 * output_price
+
+    # --- Reading levels ---
+
+    def _usage(self, stage: str | None) -> dict[str, float]:
+        now = time.time()
+        with self._lock:
+            if stage is None:
+                return {
+                    "tokens": sum(u["tokens"] for u in self.used.values()),
+                    "dollars": sum(u["dollars"] for u in self.used.values()),
+                    "seconds": now - self.started_at,
+                }
+            used = dict(self.used.get(stage, {"tokens": 0, "dollars": 0.0}))
+            seconds = self.stage_seconds.get(stage, 0.0)
+            entered = self._entered_at.get(stage)
+        return {**used, "seconds": seconds + (now - entered if entered is not None else 0.0)}
+
+    def _ratio(self, scope: str, limits: dict[str, float], usage: dict[str, float]) -> float:
+        worst = 0.0
+        for metric in METRICS:
+            limit = limits.get(metric, 0)
+            if not limit:
+                continue
+            ratio = usage[metric] / limit
+            worst = max(worst, ratio)
+            with self._lock:
+                for level, threshold in enumerate(DEGRADE_AT, 1):
+                    if ratio >= threshold and (scope, metric, level) not in self._fired:
+                        self._fired.add((scope, metric, level))
+                        self.events.append({
+                            "scope": scope,
+                            "metric": metric,
+                            "level": level,
+                            "used": round(usage[metric], 4),
+                            "limit": limit,
+                            "at_seconds": round(time.time() - self.started_at, 1),
+                        })
+        return worst
+
+    def ratio(self, stage: str | None = None) -> float:
+        """Highest usage/limit ratio across the run and (if given) the stage."""
+        worst = self._ratio("run", self.run_limits, self._usage(None))
+        if stage is not None and stage in self.stage_limits:
+            worst = max(worst, self._ratio(stage, self.stage_limits[stage], self._usage(stage)))
+        return worst
+
+    def level(self, stage: str | None = None) -> int:
+        """Degradation level 0-3 for a stage (run limits always apply)."""
+        ratio = self.ratio(stage)
+        return sum(1 for threshold in DEGRADE_AT if ratio >= threshold)
+
+    def hard_stop(self, stage: str | None = None) -> bool:
+        """True once usage has blown past the limit even after tools were cut off."""
+        return self.ratio(stage) >= HARD_STOP
+
+    def summary(self) -> str:
+        """One line naming the budgets that fired, for the spec header and terminal."""
+        worst: dict[tuple, int] = {}
+        with self._lock:
+            events = list(self.events)
+        for event in events:
+            key = (event["scope"], event["metric"])
+            worst[key] = max(worst.get(key, 0), event["level"])
+        return ", ".join(f"{scope} {metric} (level {level})" for (scope, metric), level in worst.items())
+
+
+def activate(tracker: BudgetTracker | None):
+    """Make a tracker visible to tools and middleware in this run's context. Returns a reset token."""
+    return _active.set(tracker)
+
+
+def deactivate(token) -> None:
+    _active.reset(token)
+
+
+def search_limits(stage: str, search_depth: str, max_results: int) -> tuple[str, int] | None:
+    """Degrade a search to fit the active budget. Returns None when tools are cut off."""
+    tracker = _active.get()
+    if tracker is None:
+        return search_depth, max_results
+    level = tracker.level(stage)
+    if level >= 3:
+        return None
+    if level >= 1:
+        search_depth = "basic"
+    if level >= 2:
+        max_results = min(max_results, DEGRADED_MAX_RESULTS)
+    return search_depth, max_results
+
+
+class BudgetMiddleware(AgentMiddleware):
+    """Once a stage hits its limit, strip its tools and tell the model to finalize."""
+
+    def __init__(self, stage: str):
+        super().__init__()
+        self.stage = stage
+
+    def _constrain(self, request):
+        tracker = _active.get()
+        if tracker is None or tracker.level(self.stage) < 3:
+            return request
+        return request.override(tools=[], system_prompt=(request.system_prompt or "") + FINALIZE_NOTE)
+
+    def wrap_model_call(self, request, handler):
+        return handler(self._constrain(request))
+
+    async def awrap_model_call(self, request, handler):
+        return await handler(self._constrain(request))
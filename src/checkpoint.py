@@ -0,0 +1,137 @@
+"""Persistent graph checkpoints for Agent Two - Netanel Systems.
+
+The lead graph checkpoints into SQLite (langgraph-checkpoint-sqlite) instead
+of process memory, one thread id per run. Finished runs are compacted down to
+their final root checkpoint; threads older than the TTL are pruned, and so
+are runs left "running" by a crashed process once they pass the stale age. Memory per
+process stays flat over thousands of runs, and an interrupted run can be
+resumed after a restart from its thread id.
+"""
+
+import os
+import sqlite3
+import time
+import uuid
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+RUNS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    thread_id TEXT PRIMARY KEY,
+    idea TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS runs_finished_at ON runs(finished_at);
+"""
+
+
+class CheckpointStore:
+    """SqliteSaver plus run bookkeeping, compaction, and TTL pruning."""
+
+    def __init__(self, path: str, ttl_seconds: float, stale_seconds: float):
+        """
+        Args:
+            path: SQLite file shared by the saver and the runs table.
+            ttl_seconds: Finished threads are deleted this long after they finish.
+            stale_seconds: A run still "running" this long after it started is
+                treated as abandoned (its process died) and deleted.
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # The saver serializes access with its own lock; graph nodes run on worker threads
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.saver = SqliteSaver(self.conn)
+        self.saver.setup()
+        with self.saver.lock, self.conn:
+            self.conn.executescript(RUNS_SCHEMA)
+
+    def start_run(self, idea: str) -> str:
+        """Register a new run and return its thread id."""
+        thread_id = uuid.uuid4().hex
+        with self.saver.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO runs (thread_id, idea, status, started_at) VALUES (?, ?, 'running', ?)",
+                (thread_id, idea, time.time()),
+            )
+        return thread_id
+
+    def has_checkpoint(self, thread_id: str) -> bool:
+        """True once the graph has saved at least one step of the thread (so it can be resumed)."""
+        with self.saver.lock:
+            row = self.conn.execute("SELECT 1 FROM checkpoints WHERE thread_id = ? LIMIT 1", (thread_id,)).fetchone()
+        return row is not None
+
+    def get_run(self, thread_id: str) -> dict | None:
+        with self.saver.lock:
+            row = self.conn.execute(
+                "SELECT thread_id, idea, status, started_at, finished_at FROM runs WHERE thread_id = ?",
+                (thread_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("thread_id", "idea", "status", "started_at", "finished_at"), row))
+
+    def finish_run(self, thread_id: str, status: str) -> None:
+        """Mark a run finished. Completed runs are compacted; failed ones keep full history for resume."""
+        with self.saver.lock, self.conn:
+            self.conn.execute(
+                "UPDATE runs SET status = ?, finished_at = ? WHERE thread_id = ?",
+                (status, time.time(), thread_id),
+            )
+        if status == "done":
+            self.compact(thread_id)
+        self.prune()
+
+    def compact(self, thread_id: str) -> None:
+        """Drop intermediate history: keep only the latest root checkpoint of a thread.
+
+        Subagent (subgraph) namespaces and every earlier step are deleted —
+        the final root checkpoint alone is enough to read the run's state.
+        """
+        with self.saver.lock, self.conn:
+            latest = self.conn.execute(
+                """
+                SELECT checkpoint_id FROM checkpoints
+                WHERE thread_id = ? AND checkpoint_ns = ''
+                ORDER BY checkpoint_id DESC LIMIT 1
+                """,
+                (thread_id,),
+            ).fetchone()
+            keep = latest[0] if latest else ""
+            for table in ("checkpoints", "writes"):
+                self.conn.execute(
+                    f"DELETE FROM {table} WHERE thread_id = ? AND NOT (checkpoint_ns = '' AND checkpoint_id = ?)",
+                    (thread_id, keep),
+                )
+
+    def prune(self) -> int:
+        """Delete threads that finished more than ttl_seconds ago or went stale unfinished.
+
+        Returns threads removed.
+        """
+        now = time.time()
+        with self.saver.lock, self.conn:
+            expired = [
+                row[0]
+                for row in self.conn.execute(
+                    """
+                    SELECT thread_id FROM runs
+                    WHERE (finished_at IS NOT NULL AND finished_at < ?)
+                       OR (finished_at IS NULL AND started_at < ?)
+                    """,
+                    (now - self.ttl_seconds, now - self.stale_seconds),
+                )
+            ]
+            for thread_id in expired:
+                self.conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+                self.conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+                self.conn.execute("DELETE FROM runs WHERE thread_id = ?", (thread_id,))
+        return len(expired)
+
+    def close(self) -> None:
+        self.conn.close()
@@ -1,3 +1,4 @@
+import json
 import os
 
 from dotenv import load_dotenv
@@ -13,6 +14,113 @@ if not OPENAI_API_KEY:
 if not TAVILY_API_KEY:
     raise ValueError("TAVILY_API_KEY not set in .env file")
 
+# Alternate Tavily endpoint (e.g. the local stand-in in src/loadtest.py); empty = the real API.
+# The OpenAI client reads OPENAI_BASE_URL the same way.
+TAVILY_BASE_URL = os.getenv("TAVILY_BASE_URL", "")
+
 # GPT-4o-mini for all agents — cheaper and better at structured output than Claude 3 Haiku
 # Input: $0.15/MTok, Output: $0.60/MTok
-MODEL = ChatOpenAI(model="gpt-4o-mini")
+# stream_usage=True so token counts arrive on the stream (for cost tracking)
+MODEL = ChatOpenAI(model="gpt-4o-mini", stream_usage=True)
+
+# USD per million tokens: (input, output)
+MODEL_PRICING = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "claude-sonnet-4-5-20250929": (3.00, 15.00),
+    "claude-haiku-4-5-20251001": (1.00, 5.00),
+    "claude-3-haiku-20240307": (0.25, 1.25),
+}
+
+# Local research knowledge base (SQLite FTS5) fed by every search the tools run
+KNOWLEDGE_BASE_PATH = os.getenv("KNOWLEDGE_BASE_PATH", "data/knowledge.db")
+# Indexed results older than this are not served by local_search (0 = never expire)
+KNOWLEDGE_BASE_TTL_HOURS = float(os.getenv("KNOWLEDGE_BASE_TTL_HOURS", "168"))
+# local_search falls back to the web unless this many local hits cover the query
+LOCAL_SEARCH_MIN_RESULTS = int(os.getenv("LOCAL_SEARCH_MIN_RESULTS", "3"))
+LOCAL_SEARCH_MIN_COVERAGE = float(os.getenv("LOCAL_SEARCH_MIN_COVERAGE", "0.6"))
+
+# Spec output directory and archive (SQLite metadata + FTS5 over sections)
+OUTPUT_DIR = os.getenv("OUTPUT_DIR", "output")
+ARCHIVE_PATH = os.getenv("SPEC_ARCHIVE_PATH", "data/specs.db")
+
+# Append every progress event as JSON lines to this file (empty = off)
+PROGRESS_LOG = os.getenv("PROGRESS_LOG", "")
+
+# Graph checkpointer: "sqlite" (persistent, per-run threads, pruned) or "none"
+CHECKPOINTER = os.getenv("CHECKPOINTER", "sqlite")
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "data/checkpoints.db")
+# Finished threads are deleted after this many hours
+CHECKPOINT_TTL_HOURS = float(os.getenv("CHECKPOINT_TTL_HOURS", "72"))
+# Runs still "running" this many hours after they started were orphaned by a crash; deleted too
+CHECKPOINT_STALE_HOURS = float(os.getenv("CHECKPOINT_STALE_HOURS", "24"))
+
+# Budgets (0 = unlimited). Run limits cover the whole pipeline; stage limits one subagent.
+# Nearing a limit degrades searches, reaching it cuts tools and forces the stage to finalize.
+RUN_BUDGET = {
+    "tokens": int(os.getenv("RUN_MAX_TOKENS", "600000")),
+    "dollars": float(os.getenv("RUN_MAX_DOLLARS", "0.25")),
+    "seconds": float(os.getenv("RUN_MAX_SECONDS", "900")),
+}
+# JSON, e.g. {"researcher": {"tokens": 250000, "seconds": 300}}
+STAGE_BUDGETS = json.loads(os.getenv("STAGE_BUDGETS", "{}")) or {
+    "researcher": {"tokens": 250000, "dollars": 0.08, "seconds": 300},
+    "agent_designer": {"tokens": 100000, "dollars": 0.04, "seconds": 180},
+    "workflow_designer": {"tokens": 100000, "dollars": 0.04, "seconds": 180},
+    "infra_planner": {"tokens": 100000, "dollars": 0.04, "seconds": 180},
+    "verifier": {"tokens": 120000, "dollars": 0.05, "seconds": 180},
+}
+
+# Model routing. Fallbacks are tried after each agent's primary model ("*" = default).
+# The default falls back onto a second gpt-4o-mini request.
+# JSON, e.g. {"*": ["openai:gpt-4o-mini"], "researcher": ["anthropic:claude-haiku-4-5-20251001"]}
+MODEL_FALLBACKS = json.loads(os.getenv("MODEL_FALLBACKS", "{}")) or {"*": ["openai:gpt-4o-mini"]}
+# Abandon an attempt that has not streamed its first token within this many seconds
+MODEL_TTFT_DEADLINE = float(os.getenv("MODEL_TTFT_DEADLINE", "20"))
+# Hedge with the next model once TTFT exceeds this percentile of recent calls (0 = off).
+# A hedge is a second paid request whose tokens the run budget and cost estimate do not see.
+MODEL_HEDGE_QUANTILE = float(os.getenv("MODEL_HEDGE_QUANTILE", "0"))
+
+# Verification profile: "full" runs the LLM Verifier on the semantic review after the
+# deterministic pre-verifier; "fast" skips the Verifier and uses the pre-verifier alone.
+VERIFY_PROFILE = os.getenv("VERIFY_PROFILE", "full")
+
+# Prompt variant per agent ("*" = default): "full", "slim" or "minimal" (see src/prompts.py)
+# JSON, e.g. {"*": "full", "researcher": "slim"}
+PROMPT_VARIANT = json.loads(os.getenv("PROMPT_VARIANT", "{}")) or {"*": "full"}
+
+# Batch runs: ideas at least this similar (TF-IDF cosine, 0-1) share one research pass
+BATCH_SIMILARITY = float(os.getenv("BATCH_SIMILARITY", "0.35"))
+BATCH_MAX_CLUSTER = int(os.getenv("BATCH_MAX_CLUSTER", "8"))
+
+# Search prefetch: broad discovery queries fired when the idea is known, before the
+# Researcher's first turn. local_search waits up to PREFETCH_WAIT seconds for them.
+PREFETCH = os.getenv("PREFETCH", "1") == "1"
+PREFETCH_WAIT = float(os.getenv("PREFETCH_WAIT", "5"))
+
+# Report accumulation: hard caps per stage ("*" = default, 0 = unlimited) past which
+# streamed report text is dropped and a truncation marker added.
+# JSON, e.g. {"*": 200000, "researcher": 400000}
+REPORT_CAPS = json.loads(os.getenv("REPORT_CAPS", "{}")) or {"*": 200_000, "researcher": 400_000}
+
+# Distributed workers (src/jobs.py): the shared job table, how long a claim is leased
+# before an unresponsive worker's job is retried elsewhere, and attempts per job.
+JOBS_PATH = os.getenv("JOBS_PATH", "data/jobs.db")
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+# JOBS_PATH is opened from several hosts: rollback journal instead of WAL (which is single-host only)
+JOBS_SHARED = os.getenv("JOBS_SHARED", "0") == "1"
+
+# Official-page fact cards: search_official_site fetches up to this many result pages and
+# condenses each into a small card for the Researcher (0 = off). Fetch timeout in seconds.
+EXTRACT_PAGES = int(os.getenv("EXTRACT_PAGES", "3"))
+EXTRACT_TIMEOUT = float(os.getenv("EXTRACT_TIMEOUT", "5"))
+
+# Benchmark history (src/perf_history.py): per-run metrics keyed by git commit, prompt
+# hash and model ids, for regression checks before a rollout (empty = off)
+PERF_HISTORY_PATH = os.getenv("PERF_HISTORY_PATH", "data/perf_history.db")
+
+# Adaptive search: every search starts basic and small; it is repeated at advanced depth
+# (internet_search: with more results) only if the results' confidence (0-1) is below this.
+SEARCH_MIN_CONFIDENCE = float(os.getenv("SEARCH_MIN_CONFIDENCE", "0.5"))
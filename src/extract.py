@@ -0,0 +1,254 @@
+"""Official-page fact cards for Agent Two - Netanel Systems.
+
+search_official_site finds a tool's homepage, but a search snippet rarely
+says what the tool does, so the Researcher spends more turns and tokens
+finding out. After the search, the official pages are fetched
+concurrently over one pooled client and turned into text with the stdlib
+HTML parser. Each page is then condensed in Python into a small fact card
+before anything enters the model's context:
+
+    {"name", "url", "purpose", "features": [...], "pricing"}
+
+Cards are cached per URL, so a tool cited across many runs is fetched once
+per TTL. Failures are cached only briefly, so a page that timed out once
+is retried soon.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from html.parser import HTMLParser
+
+import httpx
+
+USER_AGENT = "Mozilla/5.0 (compatible; agent-two-extract/0.1)"
+
+# Elements whose text is never content
+SKIP_TAGS = {"script", "style", "noscript", "svg", "template", "iframe", "nav", "footer", "form", "button", "select"}
+BLOCK_TAGS = {"p", "div", "section", "article", "main", "header", "li", "h1", "h2", "h3", "h4", "td", "br", "dd", "dt"}
+FEATURE_TAGS = {"h2", "h3", "li"}
+
+# Separators between a product name and its tagline in <title>
+TITLE_SEPARATORS = re.compile(r"\s+[|\-–—:·]\s+")
+PRICING_PATTERN = re.compile(
+    r"(\$\s?\d[\d,.]*|€\s?\d|£\s?\d|\bfree\b|\bpricing\b|\bper (?:user|seat|month)\b|/mo\b|"
+    r"\bopen[- ]source\b|\bfree trial\b|\benterprise plan\b)",
+    re.IGNORECASE,
+)
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+BOILERPLATE = re.compile(r"\b(cookie|privacy|sign in|log in|sign up|subscribe|copyright|©|all rights reserved)\b", re.IGNORECASE)
+
+MAX_PURPOSE_CHARS = 200
+MAX_FEATURES = 5
+MAX_FEATURE_CHARS = 100
+MAX_PRICING_CHARS = 160
+
+
+class PageText(HTMLParser):
+    """Single-pass HTML → text: title, meta description, site name, text blocks and feature candidates."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.description = ""
+        self.site_name = ""
+        self.blocks: list[str] = []
+        self.features: list[str] = []
+        self._skip_depth = 0
+        self._in_title = False
+        self._feature_tag: str | None = None
+        self._current: list[str] = []
+        self._feature_text: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+            return
+        if tag == "title":
+            self._in_title = True
+        elif tag == "meta":
+            values = dict(attrs)
+            key = (values.get("name") or values.get("property") or "").lower()
+            content = (values.get("content") or "").strip()
+            if key in ("description", "og:description") and not self.description:
+                self.description = content
+            elif key == "og:site_name" and not self.site_name:
+                self.site_name = content
+        if tag in BLOCK_TAGS:
+            self._flush()
+        if tag in FEATURE_TAGS and self._skip_depth == 0:
+            self._feature_tag = tag
+            self._feature_text = []
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if tag == "title":
+            self._in_title = False
+        if tag == self._feature_tag:
+            feature = " ".join("".join(self._feature_text).split())
+            if feature:
+                self.features.append(feature)
+            self._feature_tag = None
+        if tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self.title += data
+            return
+        if self._skip_depth:
+            return
+        self._current.append(data)
+        if self._feature_tag:
+            self._feature_text.append(data)
+
+    def _flush(self) -> None:
+        text = " ".join("".join(self._current).split())
+        if text:
+            self.blocks.append(text)
+        self._current = []
+
+    def close(self) -> None:
+        super().close()
+        self._flush()
+
+
+def html_to_text(html: str) -> PageText:
+    parser = PageText()
+    parser.feed(html)
+    parser.close()
+    return parser
+
+
+def _clip(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[: limit - 1].rsplit(" ", 1)[0] + "…"
+
+
+def _sentences(blocks: list[str]):
+    for block in blocks:
+        yield from SENTENCE_END.split(block)
+
+
+def fact_card(url: str, html: str) -> dict:
+    """Condense one page into {"name", "url", "purpose", "features", "pricing"}."""
+    page = html_to_text(html)
+    title = " ".join(page.title.split())
+    name = page.site_name or (TITLE_SEPARATORS.split(title)[0] if title else "")
+
+    purpose = page.description
+    if not purpose:
+        purpose = next(
+            (s for s in _sentences(page.blocks) if len(s.split()) >= 6 and not BOILERPLATE.search(s)),
+            "",
+        )
+
+    features = []
+    for candidate in page.features:
+        words = len(candidate.split())
+        if 2 <= words <= 20 and not BOILERPLATE.search(candidate) and candidate not in features:
+            features.append(_clip(candidate, MAX_FEATURE_CHARS))
+        if len(features) == MAX_FEATURES:
+            break
+
+    pricing = next(
+        (s for s in _sentences(page.blocks) if PRICING_PATTERN.search(s) and len(s.split()) <= 40),
+        "",
+    )
+    return {
+        "name": _clip(name or title, 80),
+        "url": url,
+        "purpose": _clip(purpose, MAX_PURPOSE_CHARS),
+        "features": features,
+        "pricing": _clip(pricing, MAX_PRICING_CHARS) or None,
+    }
+
+
+class PageExtractor:
+    """Concurrent, cached fetch → text → fact card.
+
+    Thread-safe like URLValidator: the card cache is shared across runs in
+    the same process, each call to cards() gets its own event loop and pool.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 5.0,
+        max_bytes: int = 1_000_000,
+        max_connections: int = 10,
+        cache_ttl: float = 24 * 3600,
+        negative_ttl: float = 300,
+    ):
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_connections = max_connections
+        self.cache_ttl = cache_ttl
+        self.negative_ttl = negative_ttl
+        self._cache: dict[str, tuple[float, dict | None]] = {}
+        self._lock = threading.Lock()
+        self.fetches = 0
+        self.hits = 0
+
+    def _cached(self, url: str) -> tuple[bool, dict | None]:
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry and time.time() - entry[0] < (self.cache_ttl if entry[1] else self.negative_ttl):
+                return True, entry[1]
+        return False, None
+
+    def _store(self, url: str, card: dict | None) -> None:
+        with self._lock:
+            self._cache[url] = (time.time(), card)
+
+    async def _read(self, client: httpx.AsyncClient, url: str) -> str | None:
+        """The page's HTML, at most max_bytes of it, or None if it is not an HTML page."""
+        async with client.stream("GET", url) as response:
+            if response.status_code >= 400:
+                return None
+            if "html" not in response.headers.get("content-type", "html"):
+                return None
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) >= self.max_bytes:
+                    break
+            return body[: self.max_bytes].decode(response.encoding or "utf-8", errors="replace")
+
+    async def _card(self, client: httpx.AsyncClient, url: str) -> dict | None:
+        hit, card = self._cached(url)
+        with self._lock:
+            if hit:
+                self.hits += 1
+                return card
+            self.fetches += 1
+        try:
+            html = await self._read(client, url)
+        except httpx.HTTPError:
+            html = None
+        card = fact_card(url, html) if html else None
+        self._store(url, card)
+        return card
+
+    async def fetch_all(self, urls: list[str]) -> list[dict | None]:
+        """Fact cards for every URL concurrently over one pooled client (None where the fetch failed)."""
+        limits = httpx.Limits(max_connections=self.max_connections)
+        async with httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=limits,
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+        ) as client:
+            return await asyncio.gather(*(self._card(client, url) for url in urls))
+
+    def cards(self, urls: list[str]) -> list[dict | None]:
+        """Fact cards in the order of urls. Served from the cache without a client when possible."""
+        if not urls:
+            return []
+        cached = [self._cached(url) for url in urls]
+        if all(hit for hit, _ in cached):
+            with self._lock:
+                self.hits += len(urls)
+            return [card for _, card in cached]
+        return asyncio.run(self.fetch_all(urls))
@@ -0,0 +1,387 @@
+"""Distributed job queue for Agent Two - Netanel Systems.
+
+Spreads spec generation over several worker processes, on one box or many.
+Ideas are enqueued into a SQLite job table; workers claim one job at a time
+under a lease, renew it with heartbeats while the pipeline runs, and write
+the result to the spec archive. A job whose lease expires (worker killed,
+node lost) becomes visible again and is retried by the next worker to poll,
+up to max_attempts. A stream that crashes mid-run (rate limit, network)
+fails the attempt the same way; the retry resumes the job's checkpointed
+thread, so completed stages are not paid for twice. Delivery is
+at-least-once: a worker that lost its lease mid-run still archives its
+spec, but the job's record belongs to whoever holds the lease.
+
+On one node the queue runs in WAL mode. WAL coordinates through shared
+memory on a single host, so SQLite does not support it over a network
+filesystem. For workers on several nodes, set JOBS_SHARED=1 (rollback
+journal) and put JOBS_PATH on a filesystem whose POSIX locks actually work
+across hosts; many NFS setups do not, and then claims are not exclusive.
+Checkpoints and the spec archive stay node-local (WAL): a retry that lands
+on another node starts its thread from scratch.
+
+Usage:
+    python -m src.jobs enqueue "Build a code review agent" "Build a support bot"
+    python -m src.jobs enqueue --file ideas.txt
+    python -m src.jobs worker --processes 4        # poll forever
+    python -m src.jobs worker --drain              # exit when the queue is empty
+    python -m src.jobs status
+"""
+
+import argparse
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import closing
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idea TEXT NOT NULL,
+    status TEXT NOT NULL,              -- queued, running, done, failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker TEXT,
+    lease_expires REAL,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    spec_id INTEGER,
+    spec_path TEXT,
+    thread_id TEXT,                    -- checkpointed pipeline thread, resumed on retry
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_claimable ON jobs(status, lease_expires);
+"""
+
+
+def worker_id() -> str:
+    """host:pid — unique across the nodes sharing a queue."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """Leased job table in SQLite. Every method opens its own connection, so it is process- and thread-safe."""
+
+    def __init__(self, path: str, lease_seconds: float = 120.0, max_attempts: int = 3, shared: bool = False):
+        """
+        Args:
+            path: SQLite file of the job table.
+            lease_seconds: How long a claim holds without a heartbeat.
+            max_attempts: Attempts per job before it is marked failed.
+            shared: The file is used from several hosts: rollback journal instead of WAL.
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.shared = shared
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Autocommit mode; claims open their own write transaction
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=DELETE" if self.shared else "PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "thread_id" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN thread_id TEXT")
+            self._initialized = True
+        return conn
+
+    def enqueue(self, ideas: list[str]) -> list[int]:
+        """Add one job per idea. Returns the job ids."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            ids = [
+                conn.execute(
+                    "INSERT INTO jobs (idea, status, max_attempts, enqueued_at) VALUES (?, 'queued', ?, ?)",
+                    (idea, self.max_attempts, now),
+                ).lastrowid
+                for idea in ideas
+            ]
+            conn.execute("COMMIT")
+        return ids
+
+    def claim(self, worker: str) -> dict | None:
+        """Lease the oldest claimable job: queued, or running with an expired lease.
+
+        Abandoned jobs that already used every attempt are marked failed instead.
+        Returns the job (attempts already incremented), or None if nothing is claimable.
+        """
+        now = time.time()
+        with closing(self._connect()) as conn:
+            # IMMEDIATE takes the write lock up front: two workers never claim the same row
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    """
+                    UPDATE jobs SET status = 'failed', finished_at = ?, worker = NULL,
+                        error = COALESCE(error, 'lease expired') || ' (attempts exhausted)'
+                    WHERE status = 'running' AND lease_expires < ? AND attempts >= max_attempts
+                    """,
+                    (now, now),
+                )
+                row = conn.execute(
+                    """
+                    SELECT id FROM jobs
+                    WHERE status = 'queued' OR (status = 'running' AND lease_expires < ?)
+                    ORDER BY enqueued_at, id LIMIT 1
+                    """,
+                    (now,),
+                ).fetchone()
+                job = None
+                if row is not None:
+                    conn.execute(
+                        """
+                        UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?,
+                            lease_expires = ?, started_at = ?
+                        WHERE id = ?
+                        """,
+                        (worker, now + self.lease_seconds, now, row["id"]),
+                    )
+                    job = dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return job
+
+    def _update_leased(self, job_id: int, worker: str, sql: str, params: tuple) -> bool:
+        """Run an UPDATE only while `worker` still holds the job's lease."""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET {sql} WHERE id = ? AND worker = ? AND status = 'running'",
+                (*params, job_id, worker),
+            )
+            return cursor.rowcount == 1
+
+    def heartbeat(self, job_id: int, worker: str) -> bool:
+        """Extend the lease. False if the lease was lost (expired and claimed elsewhere)."""
+        return self._update_leased(job_id, worker, "lease_expires = ?", (time.time() + self.lease_seconds,))
+
+    def set_thread(self, job_id: int, worker: str, thread_id: str) -> bool:
+        """Remember the job's pipeline thread so the next attempt can resume it."""
+        return self._update_leased(job_id, worker, "thread_id = ?", (thread_id,))
+
+    def complete(self, job_id: int, worker: str, spec_id: int, spec_path: str) -> bool:
+        return self._update_leased(
+            job_id,
+            worker,
+            "status = 'done', finished_at = ?, lease_expires = NULL, spec_id = ?, spec_path = ?, error = NULL",
+            (time.time(), spec_id, spec_path),
+        )
+
+    def fail(self, job_id: int, worker: str, error: str) -> bool:
+        """Record a failed attempt: requeued while attempts remain, else failed."""
+        return self._update_leased(
+            job_id,
+            worker,
+            """
+            status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+            finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE ? END,
+            worker = NULL, lease_expires = NULL, error = ?
+            """,
+            (time.time(), error),
+        )
+
+    def get(self, job_id: int) -> dict | None:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def jobs(self, limit: int = 50) -> list[dict]:
+        """Most recent jobs first."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def counts(self) -> dict[str, int]:
+        """Jobs per status; running jobs whose lease has expired count as "abandoned"."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                """
+                SELECT CASE WHEN status = 'running' AND lease_expires < ? THEN 'abandoned' ELSE status END AS state,
+                       COUNT(*) AS n
+                FROM jobs GROUP BY state
+                """,
+                (time.time(),),
+            ).fetchall()
+        return {row["state"]: row["n"] for row in rows}
+
+    def pending(self) -> int:
+        """Jobs that are queued or running (including abandoned ones awaiting retry)."""
+        counts = self.counts()
+        return counts.get("queued", 0) + counts.get("running", 0) + counts.get("abandoned", 0)
+
+
+class Heartbeat:
+    """Background thread renewing a job's lease every third of the lease period."""
+
+    def __init__(self, queue: JobQueue, job_id: int, worker: str):
+        self.queue = queue
+        self.job_id = job_id
+        self.worker = worker
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"heartbeat-{job_id}", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.queue.lease_seconds / 3):
+            try:
+                if not self.queue.heartbeat(self.job_id, self.worker):
+                    self.lost = True
+                    return
+            except sqlite3.OperationalError:
+                # Store briefly unavailable: the next beat retries before the lease runs out
+                continue
+
+    def __enter__(self) -> "Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def run_worker(queue: JobQueue, poll_seconds: float = 2.0, drain: bool = False, max_jobs: int = 0) -> int:
+    """Claim and run jobs until stopped. Returns jobs processed.
+
+    Args:
+        queue: The shared job queue.
+        poll_seconds: Sleep between claims when nothing is claimable.
+        drain: Exit once no job is queued or running anywhere.
+        max_jobs: Exit after this many jobs (0 = no limit).
+    """
+    from src.batch import run_idea
+
+    worker = worker_id()
+    processed = 0
+    print(f"  Worker {worker} polling {queue.path}")
+    while not max_jobs or processed < max_jobs:
+        job = queue.claim(worker)
+        if job is None:
+            if drain and not queue.pending():
+                break
+            time.sleep(poll_seconds)
+            continue
+
+        print(f"\n  [{worker}] job #{job['id']} attempt {job['attempts']}/{job['max_attempts']}: {job['idea']}")
+        with Heartbeat(queue, job["id"], worker) as heartbeat:
+            try:
+                outcome = run_idea(
+                    job["idea"],
+                    thread_id=job["thread_id"],
+                    on_thread=lambda thread_id, job_id=job["id"]: queue.set_thread(job_id, worker, thread_id),
+                    # Earlier attempts are retried from the checkpoint; only the last one archives a partial spec
+                    keep_partial=job["attempts"] >= job["max_attempts"],
+                )
+                record = outcome["record"]
+                error = outcome["error"] or (None if record else "no reports captured")
+            except Exception as e:
+                record, error = None, f"{type(e).__name__}: {e}"
+        processed += 1
+
+        if error:
+            kept = queue.fail(job["id"], worker, error)
+        else:
+            kept = queue.complete(job["id"], worker, record["id"], record["path"])
+        if not kept or heartbeat.lost:
+            print(f"  [{worker}] lease on job #{job['id']} was lost; another worker owns it now")
+        elif error:
+            print(f"  [{worker}] job #{job['id']} failed: {error}")
+        else:
+            print(f"  [{worker}] job #{job['id']} done → archive #{record['id']}")
+    return processed
+
+
+def _worker_process(
+    path: str, lease_seconds: float, max_attempts: int, shared: bool, poll_seconds: float, drain: bool, max_jobs: int
+) -> None:
+    run_worker(JobQueue(path, lease_seconds, max_attempts, shared), poll_seconds, drain, max_jobs)
+
+
+def _format_time(timestamp: float | None) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M") if timestamp else "-"
+
+
+def main() -> None:
+    """CLI for the job queue: enqueue ideas, run workers, show status."""
+    from src.config import (
+        JOB_LEASE_SECONDS,
+        JOB_MAX_ATTEMPTS,
+        JOB_POLL_SECONDS,
+        JOBS_PATH,
+        JOBS_SHARED,
+    )
+
+    parser = argparse.ArgumentParser(prog="python -m src.jobs", description="Distributed spec generation.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    enqueue = commands.add_parser("enqueue", help="Queue ideas for the workers")
+    enqueue.add_argument("ideas", nargs="*")
+    enqueue.add_argument("--file", help="ideas file, one per line (# for comments)")
+    worker = commands.add_parser("worker", help="Claim and run queued jobs")
+    worker.add_argument("--processes", type=int, default=1, help="worker processes on this node")
+    worker.add_argument("--drain", action="store_true", help="exit when no job is queued or running")
+    worker.add_argument("--max-jobs", type=int, default=0, help="jobs per process before exiting (0 = no limit)")
+    status = commands.add_parser("status", help="Job counts and the most recent jobs")
+    status.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    queue = JobQueue(JOBS_PATH, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JOBS_SHARED)
+
+    if args.command == "enqueue":
+        ideas = list(args.ideas)
+        if args.file:
+            from src.batch import read_ideas
+
+            ideas += read_ideas(args.file)
+        if not ideas:
+            parser.error("no ideas given")
+        ids = queue.enqueue(ideas)
+        print(f"  Queued {len(ids)} job(s): #{ids[0]}–#{ids[-1]}")
+
+    elif args.command == "worker":
+        if args.processes <= 1:
+            run_worker(queue, JOB_POLL_SECONDS, args.drain, args.max_jobs)
+            return
+        processes = [
+            multiprocessing.Process(
+                target=_worker_process,
+                args=(
+                    JOBS_PATH, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JOBS_SHARED, JOB_POLL_SECONDS, args.drain, args.max_jobs
+                ),
+            )
+            for _ in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+            sys.exit(130)
+
+    elif args.command == "status":
+        counts = queue.counts()
+        print("  " + "  ".join(f"{state}: {counts.get(state, 0)}" for state in ("queued", "running", "abandoned", "done", "failed")))
+        for job in queue.jobs(limit=args.limit):
+            detail = job["spec_path"] or job["error"] or job["worker"] or ""
+            print(
+                f"  #{job['id']:<5}{job['status']:<9}{job['attempts']}/{job['max_attempts']}"
+                f"  {_format_time(job['enqueued_at'])}  {job['idea'][:50]:<50}  {detail}"
+            )
+
+
+if __name__ == "__main__":
+    main()
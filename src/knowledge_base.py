@@ -0,0 +1,184 @@
+"""Local research knowledge base for Agent Two - Netanel Systems.
+
+Every search result the tools return is indexed into a SQLite FTS5 table.
+Repeat research on a familiar domain is then answered from disk with BM25
+ranking in milliseconds instead of a Tavily round-trip, and works offline.
+Results older than the index's TTL are not served, so local_search goes back
+to the web (and refreshes them) instead of citing stale pages forever.
+"""
+
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL DEFAULT '',
+    content TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL DEFAULT '',
+    query TEXT NOT NULL DEFAULT '',
+    indexed_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title, content, url,
+    content='documents', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts(rowid, title, content, url)
+    VALUES (new.id, new.title, new.content, new.url);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, title, content, url)
+    VALUES ('delete', old.id, old.title, old.content, old.url);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, title, content, url)
+    VALUES ('delete', old.id, old.title, old.content, old.url);
+    INSERT INTO documents_fts(rowid, title, content, url)
+    VALUES (new.id, new.title, new.content, new.url);
+END;
+"""
+
+# Words that match nearly every document and would drown the BM25 ranking
+STOPWORDS = {
+    "a", "an", "and", "are", "best", "by", "for", "from", "how", "in", "is",
+    "of", "on", "or", "the", "to", "top", "what", "with",
+}
+
+
+def query_terms(query: str) -> list[str]:
+    """Split a query into distinct, lowercase search terms (stopwords removed)."""
+    terms = []
+    for term in re.findall(r"\w+", query.lower()):
+        if term not in STOPWORDS and term not in terms:
+            terms.append(term)
+    return terms
+
+
+def stem(term: str) -> str:
+    """Crude suffix stripping so "reviews", "reviewer" and "review" match."""
+    for suffix in ("ers", "ing", "er", "es", "s"):
+        if term.endswith(suffix) and len(term) - len(suffix) >= 3:
+            return term[: -len(suffix)]
+    return term
+
+
+def coverage(terms: list[str], result: dict) -> float:
+    """Fraction of query terms that appear as whole words in a result's title, URL, or content.
+
+    Words are compared stemmed, so "reviews" covers "review" but "ai" does not cover "email".
+    """
+    if not terms:
+        return 0.0
+    text = f"{result.get('title', '')} {result.get('url', '')} {result.get('content', '')}".lower()
+    words = {stem(word) for word in re.findall(r"\w+", text)}
+    return sum(1 for term in terms if stem(term) in words) / len(terms)
+
+
+class KnowledgeBase:
+    """SQLite FTS5 index of every search result the research tools have seen."""
+
+    def __init__(self, path: str, ttl: float = 0):
+        """
+        Args:
+            path: SQLite file (or ":memory:").
+            ttl: Seconds an indexed result is served by search() (0 = forever).
+        """
+        self.path = path
+        self.ttl = ttl
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per call: tools run on graph worker threads,
+        # and opening a local SQLite file costs microseconds.
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._initialized = True
+        return conn
+
+    def add_results(self, response: dict, source: str, query: str = "") -> int:
+        """Index the results of a Tavily-shaped response. Returns the number indexed."""
+        rows = [
+            (
+                result["url"],
+                result.get("title") or "",
+                result.get("content") or "",
+                source,
+                query,
+                time.time(),
+            )
+            for result in response.get("results", [])
+            if result.get("url")
+        ]
+        if not rows:
+            return 0
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                """
+                INSERT INTO documents (url, title, content, source, query, indexed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    title = excluded.title,
+                    content = excluded.content,
+                    source = excluded.source,
+                    query = excluded.query,
+                    indexed_at = excluded.indexed_at
+                """,
+                rows,
+            )
+        return len(rows)
+
+    def search(self, query: str, max_results: int = 5) -> dict:
+        """BM25 search over indexed results that are still within the TTL.
+
+        Returns:
+            Tavily-shaped dictionary: {"query", "results": [{title, url, content, score}]}.
+            Scores are negated BM25 ranks, so higher is better like Tavily's.
+        """
+        terms = query_terms(query)
+        if not terms:
+            return {"query": query, "results": []}
+        match = " OR ".join(f'"{term}"' for term in terms)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                """
+                SELECT d.title, d.url, d.content, bm25(documents_fts) AS rank
+                FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid
+                WHERE documents_fts MATCH ? AND (? = 0 OR d.indexed_at >= ?)
+                ORDER BY rank
+                LIMIT ?
+                """,
+                (match, self.ttl, time.time() - self.ttl, max_results),
+            ).fetchall()
+        return {
+            "query": query,
+            "results": [
+                {
+                    "title": row["title"],
+                    "url": row["url"],
+                    "content": row["content"],
+                    "score": round(-row["rank"], 4),
+                }
+                for row in rows
+            ],
+        }
+
+    def snapshot(self, path: str) -> "KnowledgeBase":
+        """Copy the index to path (SQLite online backup) and return a KnowledgeBase over the copy."""
+        with closing(self._connect()) as source, closing(sqlite3.connect(path)) as target:
+            source.backup(target)
+        return KnowledgeBase(path, ttl=self.ttl)
+
+    def count(self) -> int:
+        """Number of documents in the index."""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
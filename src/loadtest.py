@@ -0,0 +1,456 @@
+"""Offline load test for Agent Two - Netanel Systems.
+
+Drives the real lead graph (routing, middleware, checkpointer, stream loop)
+against local stand-ins for the OpenAI and Tavily HTTP APIs, ramping
+concurrency and reporting throughput, run latency percentiles, CPU and RSS
+at each step. For capacity planning: how many concurrent specs one worker
+sustains before the stream loop, thread pool or HTTP clients saturate.
+
+The stand-ins run in a child process (so they do not count against the
+worker's CPU/RSS) and script a complete pipeline: the Lead delegates to
+each subagent in turn, the Researcher calls its search tools, and every
+report has the sections the pre-verifier expects. Latency is lognormal
+around a median; error and 429 rates are injected per request.
+
+Usage:
+    python -m src.loadtest --ramp 1,2,4,8 --runs 2
+    python -m src.loadtest --ttft 0.8 --tokens-per-second 60 --rate-limit 0.05 --out load.json
+
+Needs no network and no API keys.
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Report headings per stage, mirroring the output formats in src/prompts.py
+STAGE_HEADINGS = {
+    "researcher": ["Existing Solutions", "Relevant Frameworks", "Architecture Patterns", "Gaps and Opportunities"],
+    "workflow_designer": ["Execution Order", "Data Flow", "Retry Logic", "Human-in-the-Loop", "Termination Conditions"],
+    "infra_planner": [
+        "Agent Inventory",
+        "Memory Strategy",
+        "Evaluation Criteria",
+        "Tracing and Observability",
+        "Deployment Plan",
+        "Cost Estimate",
+    ],
+    "verifier": ["Gaps Found", "Risks Identified", "Suggestions for Improvement", "Verdict"],
+}
+
+# Opening line of each system prompt → agent
+AGENT_MARKERS = {
+    "You are the Lead Orchestrator": "lead",
+    "You are a Research Agent": "researcher",
+    "You are an Agent Designer": "agent_designer",
+    "You are a Workflow Designer": "workflow_designer",
+    "You are an Infrastructure Planner": "infra_planner",
+    "You are a Verifier": "verifier",
+    "You are a Citation Fixer": "citation_fixer",
+}
+DELEGATION_ORDER = ["researcher", "agent_designer", "workflow_designer", "infra_planner", "verifier"]
+FAKE_AGENTS = ["Intake", "Analyzer", "Reporter"]
+FILLER = (
+    "The design keeps each agent focused on one responsibility and passes structured "
+    "data between stages so failures stay contained and costs stay predictable"
+).split()
+
+
+# --- Stand-in servers ---
+
+
+class Profile:
+    """Latency and failure settings for one stand-in server."""
+
+    def __init__(self, latency: float, jitter: float, error_rate: float, rate_limit: float):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+
+    def delay(self) -> float:
+        """Lognormal sample with the configured median."""
+        return self.latency * math.exp(random.gauss(0.0, self.jitter)) if self.latency else 0.0
+
+    def failure(self) -> int | None:
+        """HTTP status to fail this request with, if any."""
+        roll = random.random()
+        if roll < self.rate_limit:
+            return 429
+        if roll < self.rate_limit + self.error_rate:
+            return 500
+        return None
+
+
+def _text(content) -> str:
+    if isinstance(content, list):
+        return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+    return content or ""
+
+
+def _words(n: int) -> list[str]:
+    return [FILLER[i % len(FILLER)] for i in range(n)]
+
+
+def canned_report(agent: str, tokens: int) -> str:
+    """A report with the sections the pre-verifier looks for, padded to ~tokens words."""
+    if agent == "agent_designer":
+        blocks = []
+        for name in FAKE_AGENTS:
+            fields = ["Role", "Tools", "System prompt draft", "Model", "Input", "Output"]
+            blocks.append(f"### Agent: {name}\n" + "\n".join(f"- **{field}**: {name} {field.lower()}" for field in fields))
+        body = "\n\n".join(blocks)
+    elif agent == "citation_fixer":
+        return "- https://example.com -> REMOVE"
+    else:
+        parts = []
+        for heading in STAGE_HEADINGS.get(agent, ["Summary"]):
+            line = ", ".join(FAKE_AGENTS) + " covered."
+            if heading == "Cost Estimate":
+                line = " ".join(f"{name} $0.01 per run." for name in FAKE_AGENTS)
+            if heading == "Verdict":
+                line = "**APPROVED**"
+            parts.append(f"### {heading}\n{line}")
+        body = "\n\n".join(parts)
+    padding = max(0, tokens - len(body.split()))
+    return body + "\n\n" + " ".join(_words(padding))
+
+
+def script(request: dict) -> tuple[str, list[dict]]:
+    """Decide the stand-in model's reply: (text, tool_calls)."""
+    messages = request.get("messages", [])
+    system = "".join(_text(m.get("content")) for m in messages if m.get("role") in ("system", "developer"))
+    agent = next((name for marker, name in AGENT_MARKERS.items() if marker in system), "unknown")
+    tools = {tool["function"]["name"]: tool["function"] for tool in request.get("tools", [])}
+    # Tool results since the task was handed over
+    last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=0)
+    tool_results = sum(1 for m in messages[last_user:] if m.get("role") == "tool")
+    task = _text(messages[last_user].get("content")) if messages else ""
+    tokens = request.get("_report_tokens", 400)
+
+    if agent == "lead" and "task" in tools:
+        description = tools["task"].get("description", "")
+        order = [name for name in DELEGATION_ORDER if name in description]
+        done = sum(1 for m in messages if m.get("role") == "tool")
+        if done < len(order):
+            arguments = {"description": f"{order[done]}: {task[:2000]}", "subagent_type": order[done]}
+            return "", [{"name": "task", "arguments": arguments}]
+        return "Specification complete.", []
+
+    if agent == "researcher" and tool_results == 0 and "local_search" in tools:
+        return "", [
+            {"name": "local_search", "arguments": {"query": "agent frameworks"}},
+            {"name": "local_search", "arguments": {"query": "agent architecture patterns"}},
+        ]
+    if agent == "researcher" and tool_results == 2 and "search_official_site" in tools:
+        return "", [{"name": "search_official_site", "arguments": {"tool_name": name}} for name in FAKE_AGENTS[:2]]
+    return canned_report(agent, tokens), []
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.0"
+    settings: dict = {}
+
+    def log_message(self, format, *args):  # noqa: A002 — quiet
+        pass
+
+    def _json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+
+class OpenAIHandler(_Handler):
+    """POST /v1/chat/completions, streamed (SSE) or not."""
+
+    def do_POST(self):
+        request = self._body()
+        profile: Profile = self.settings["openai"]
+        status = profile.failure()
+        time.sleep(profile.delay())
+        if status:
+            self._json(status, {"error": {"message": "injected failure", "type": "loadtest", "code": status}})
+            return
+        request["_report_tokens"] = self.settings["report_tokens"]
+        text, tool_calls = script(request)
+        prompt_tokens = len(json.dumps(request.get("messages", []))) // 4
+        completion_tokens = len(text.split()) + 20 * len(tool_calls)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        calls = [
+            {
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+                "type": "function",
+                "function": {"name": call["name"], "arguments": json.dumps(call["arguments"])},
+            }
+            for call in tool_calls
+        ]
+        finish = "tool_calls" if calls else "stop"
+        base = {"id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "created": int(time.time()), "model": request.get("model")}
+
+        if not request.get("stream"):
+            message = {"role": "assistant", "content": text or None}
+            if calls:
+                message["tool_calls"] = calls
+            self._json(200, {
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": message, "finish_reason": finish}],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+
+        def send(choices: list, **extra) -> None:
+            chunk = {**base, "object": "chat.completion.chunk", "choices": choices, **extra}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+
+        interval = 1.0 / self.settings["tokens_per_second"] if self.settings["tokens_per_second"] else 0.0
+        send([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        for word in text.split(" ") if text else []:
+            send([{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}])
+            if interval:
+                time.sleep(interval)
+        for i, call in enumerate(calls):
+            send([{"index": 0, "delta": {"tool_calls": [{"index": i, **call}]}, "finish_reason": None}])
+        send([{"index": 0, "delta": {}, "finish_reason": finish}])
+        if request.get("stream_options", {}).get("include_usage"):
+            send([], usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def product_page(slug: str) -> str:
+    """An official product page with the parts fact cards are built from."""
+    name = slug.replace("-", " ").title()
+    features = "".join(f"<li>{name} feature {i}: {' '.join(_words(6))}</li>" for i in range(1, 7))
+    return (
+        f"<html><head><title>{name} | The agent platform</title>"
+        f'<meta name="description" content="{name} automates {" ".join(_words(12))}.">'
+        f"<script>var tracking = 1;</script></head><body>"
+        f"<nav><ul><li>Home</li><li>Docs</li></ul></nav>"
+        f"<main><h1>{name}</h1><p>{' '.join(_words(80))}.</p><ul>{features}</ul>"
+        f"<p>Plans start at $19 per user per month, with a free tier for open source.</p></main>"
+        f"<footer>© {name}. All rights reserved.</footer></body></html>"
+    )
+
+
+class TavilyHandler(_Handler):
+    """POST /search with Tavily's response shape; GET /site/{slug} serves official pages."""
+
+    def do_GET(self):
+        profile: Profile = self.settings["tavily"]
+        time.sleep(profile.delay())
+        if not self.path.startswith("/site/"):
+            self._json(404, {"detail": "not found"})
+            return
+        body = product_page(self.path.removeprefix("/site/").strip("/")).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        request = self._body()
+        profile: Profile = self.settings["tavily"]
+        status = profile.failure()
+        delay = profile.delay()
+        time.sleep(delay)
+        if status:
+            self._json(status, {"detail": {"error": "injected failure"}})
+            return
+        query = request.get("query", "")
+        # Official-site searches point at pages this stand-in serves, so fact cards get built
+        official = query.endswith(" official site")
+        host = f"http://127.0.0.1:{self.server.server_address[1]}"
+        results = [
+            {
+                "title": f"{query.title()} — result {i}",
+                "url": (
+                    f"{host}/site/{query.removesuffix(' official site').lower().replace(' ', '-')}-{i}"
+                    if official
+                    else f"https://loadtest-{abs(hash((query, i))) % 10_000}.example.com/"
+                ),
+                "content": f"{query} " + " ".join(_words(60)),
+                "score": round(1.0 - i / 10, 2),
+            }
+            for i in range(int(request.get("max_results") or 5))
+        ]
+        self._json(200, {"query": query, "results": results, "response_time": round(delay, 3), "request_id": uuid.uuid4().hex})
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Cancelled (hedged or timed-out) attempts hang up mid-stream; that is expected
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+def serve(settings: dict, ports: multiprocessing.Queue) -> None:
+    """Child process: run both stand-ins until terminated."""
+    _Handler.settings = settings
+    servers = [_Server(("127.0.0.1", 0), OpenAIHandler), _Server(("127.0.0.1", 0), TavilyHandler)]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    ports.put([server.server_address[1] for server in servers])
+    threading.Event().wait()
+
+
+# --- Load generation ---
+
+
+def _rss_mb() -> float:
+    """Current resident set size of this process in MB (Linux), else peak."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1_048_576
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q * 100) - 1]
+
+
+def run_step(concurrency: int, runs: int, run_pipeline, progress_bus) -> dict:
+    """Run concurrency × runs pipelines, concurrency at a time. Returns the step's metrics."""
+    total = concurrency * runs
+    durations: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i: int) -> None:
+        nonlocal errors
+        result = run_pipeline(f"Build a load test agent #{i}", progress_bus([]), uuid.uuid4().hex)
+        with lock:
+            # Fewer than the four design stages means the run did not really finish
+            if result["error"] or len(result["reports"]) < len(DELEGATION_ORDER) - 1:
+                errors += 1
+            else:
+                durations.append(result["duration"])
+
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.perf_counter()
+    peak_rss = _rss_mb()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(one, i) for i in range(total)]
+        while not all(future.done() for future in futures):
+            peak_rss = max(peak_rss, _rss_mb())
+            time.sleep(0.2)
+    wall = time.perf_counter() - start
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+    cpu = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+
+    return {
+        "concurrency": concurrency,
+        "runs": total,
+        "errors": errors,
+        "wall_s": round(wall, 2),
+        "throughput_per_min": round(len(durations) / wall * 60, 2),
+        "p50_s": round(_percentile(durations, 0.5), 2),
+        "p95_s": round(_percentile(durations, 0.95), 2),
+        "p99_s": round(_percentile(durations, 0.99), 2),
+        "cpu_cores": round(cpu / wall, 2),
+        "rss_mb": round(peak_rss, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.loadtest", description="Offline load test of the lead graph.")
+    parser.add_argument("--ramp", default="1,2,4,8", help="comma-separated concurrency levels")
+    parser.add_argument("--runs", type=int, default=2, help="pipelines per concurrency slot at each level")
+    parser.add_argument("--ttft", type=float, default=0.4, help="median model time-to-first-token (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=200, help="streamed tokens per second (0 = instant)")
+    parser.add_argument("--report-tokens", type=int, default=400, help="words in each subagent report")
+    parser.add_argument("--search-latency", type=float, default=0.6, help="median search latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.5, help="lognormal sigma for all latencies")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with 500")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="share of requests failing with 429")
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args()
+
+    settings = {
+        "openai": Profile(args.ttft, args.jitter, args.error_rate, args.rate_limit),
+        "tavily": Profile(args.search_latency, args.jitter, args.error_rate, args.rate_limit),
+        "tokens_per_second": args.tokens_per_second,
+        "report_tokens": args.report_tokens,
+    }
+    ports: multiprocessing.Queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(settings, ports), daemon=True)
+    server.start()
+    openai_port, tavily_port = ports.get(timeout=10)
+
+    # Point every client at the stand-ins and keep all state in a scratch directory.
+    # Must happen before src.config is imported.
+    scratch = tempfile.mkdtemp(prefix="agent-two-load-")
+    os.environ.update({
+        "OPENAI_API_KEY": "loadtest",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{openai_port}/v1",
+        "TAVILY_API_KEY": "loadtest",
+        "TAVILY_BASE_URL": f"http://127.0.0.1:{tavily_port}",
+        "KNOWLEDGE_BASE_PATH": os.path.join(scratch, "knowledge.db"),
+        "CHECKPOINT_PATH": os.path.join(scratch, "checkpoints.db"),
+        "SPEC_ARCHIVE_PATH": os.path.join(scratch, "specs.db"),
+        "LANGSMITH_TRACING": "false",
+        "LANGCHAIN_TRACING_V2": "false",
+    })
+    from src.agent import run_pipeline
+    from src.progress import ProgressBus
+
+    print(f"  Stand-ins: openai :{openai_port}  tavily :{tavily_port}  (scratch {scratch})")
+    print(f"  {'conc':>5}{'runs':>6}{'err':>5}{'wall s':>9}{'spec/min':>10}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}{'cpu':>7}{'rss MB':>9}")
+    steps = []
+    for concurrency in (int(level) for level in args.ramp.split(",") if level):
+        step = run_step(concurrency, args.runs, run_pipeline, ProgressBus)
+        steps.append(step)
+        print(
+            f"  {step['concurrency']:>5}{step['runs']:>6}{step['errors']:>5}{step['wall_s']:>9.1f}"
+            f"{step['throughput_per_min']:>10.1f}{step['p50_s']:>8.1f}{step['p95_s']:>8.1f}"
+            f"{step['p99_s']:>8.1f}{step['cpu_cores']:>7.2f}{step['rss_mb']:>9.0f}"
+        )
+        sys.stdout.flush()
+
+    server.terminate()
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"settings": {k: v for k, v in vars(args).items() if k != "out"}, "steps": steps}, f, indent=2)
+        print(f"\n  Results: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
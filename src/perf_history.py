@@ -0,0 +1,396 @@
+"""Benchmark history and regression gate for Agent Two - Netanel Systems.
+
+Every finished spec run and every prompt-bench replay appends one row of
+metrics (tokens, cost, latency, peak RSS sampled during the run) to a
+local SQLite store, keyed by git commit (and whether the tree was dirty),
+prompt hash and model ids. Runs are grouped by commit, dirty flag, prompt
+hash and model ids, so a model swap never mixes into a prompt comparison.
+`compare` tests a candidate group of runs against a baseline group per metric with a one-sided
+Mann-Whitney U test (stdlib only, normal approximation with tie
+correction) and flags a regression when the candidate is significantly
+worse AND its median moved by more than a minimum effect size. It exits
+1 on any regression, so it can gate a prompt or code change.
+
+Usage:
+    python -m src.perf_history list
+    python -m src.perf_history compare --baseline 3f2a91c
+    python -m src.perf_history compare --baseline 3f2a91c/5d0e8c1a2b3f --candidate '9be04d1*' --kind prompt_bench --label verifier/slim
+    python -m src.perf_history compare --baseline 3f2a91c@1c9e02ab --candidate 3f2a91c@77d410fe
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from contextlib import closing
+from functools import lru_cache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at REAL NOT NULL,
+    kind TEXT NOT NULL,                -- "live" (pipeline run) or "prompt_bench" (replay)
+    label TEXT NOT NULL DEFAULT '',    -- e.g. "verifier/slim" for a replay
+    git_commit TEXT NOT NULL,
+    git_dirty INTEGER NOT NULL,
+    prompt_hash TEXT NOT NULL,
+    models TEXT NOT NULL,              -- JSON {agent: model id}
+    ok INTEGER NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    cost_usd REAL NOT NULL,
+    duration_s REAL NOT NULL,
+    peak_rss_mb REAL                   -- sampled during the run; NULL where RSS cannot be read
+);
+DROP INDEX IF EXISTS runs_key;
+CREATE INDEX IF NOT EXISTS runs_group ON runs(kind, label, git_commit, git_dirty, prompt_hash, models);
+"""
+
+# Metrics compared by default; higher is worse for all of them
+METRICS = ("tokens", "cost_usd", "duration_s", "peak_rss_mb")
+METRIC_FORMATS = {"tokens": ",.0f", "cost_usd": ".4f", "duration_s": ".1f", "peak_rss_mb": ".0f"}
+MIN_RUNS = 5
+RSS_SAMPLE_SECONDS = 0.2
+
+
+@lru_cache(maxsize=1)
+def git_state() -> tuple[str, bool]:
+    """(short commit, dirty) of the working tree, or ("unknown", False) outside a git checkout."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short=12", "HEAD"], cwd=root, capture_output=True, text=True, timeout=5, check=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=root, capture_output=True, text=True, timeout=5
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return "unknown", False
+    return commit, bool(status.strip())
+
+
+def rss_mb() -> float | None:
+    """Current resident set size of this process in MB, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1_048_576
+    except (OSError, ValueError):
+        return None
+
+
+class RSSSampler:
+    """Peak RSS over a block, sampled on a background thread.
+
+    ru_maxrss is the peak over the whole process lifetime, so in batch,
+    worker and bench processes every later run would inherit earlier peaks.
+    Runs sharing a process concurrently still see each other's memory.
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.peak: float | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _sample(self) -> None:
+        current = rss_mb()
+        if current is not None and (self.peak is None or current > self.peak):
+            self.peak = current
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "RSSSampler":
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+# Columns that make up a group of comparable runs
+GROUP_KEY = ("kind", "label", "git_commit", "git_dirty", "prompt_hash", "models")
+
+
+def models_ref(models: str) -> str:
+    """Short stable id of a group's model ids (the runs table's models JSON)."""
+    return hashlib.sha1(models.encode()).hexdigest()[:8]
+
+
+def group_ref(group: dict) -> str:
+    """"commit[*]/prompt_hash@models" — the group's name in `list` and `compare` (* = dirty tree)."""
+    return f"{group['git_commit']}{'*' if group['git_dirty'] else ''}/{group['prompt_hash']}@{models_ref(group['models'])}"
+
+
+class PerfHistory:
+    """Append-only SQLite store of per-run metrics.
+
+    Runs are compared in groups of one (commit, dirty flag, prompt hash, model
+    ids): edited prompts on an uncommitted tree never mix with the committed
+    ones, and runs on different models never mix at all.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._initialized = True
+        return conn
+
+    def record(
+        self,
+        kind: str,
+        prompt_hash: str,
+        models: dict[str, str],
+        input_tokens: int,
+        output_tokens: int,
+        cost_usd: float,
+        duration_s: float,
+        peak_rss_mb: float | None = None,
+        ok: bool = True,
+        label: str = "",
+    ) -> int:
+        """Append one run, stamped with the current git commit and dirty flag.
+
+        peak_rss_mb should come from an RSSSampler around the run.
+        """
+        commit, dirty = git_state()
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO runs (
+                    recorded_at, kind, label, git_commit, git_dirty, prompt_hash, models, ok,
+                    input_tokens, output_tokens, cost_usd, duration_s, peak_rss_mb
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    time.time(), kind, label, commit, int(dirty), prompt_hash, json.dumps(models, sort_keys=True),
+                    int(ok), input_tokens, output_tokens, cost_usd, duration_s, peak_rss_mb,
+                ),
+            )
+            return cursor.lastrowid
+
+    def groups(self, kind: str | None = None, label: str | None = None, limit: int = 20) -> list[dict]:
+        """Most recent (kind, label, commit, dirty, prompt hash, models) groups with run counts, newest first."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                """
+                SELECT kind, label, git_commit, git_dirty, prompt_hash, models, COUNT(*) AS runs, MAX(recorded_at) AS last
+                FROM runs
+                WHERE ok = 1 AND (? IS NULL OR kind = ?) AND (? IS NULL OR label = ?)
+                GROUP BY kind, label, git_commit, git_dirty, prompt_hash, models
+                ORDER BY last DESC LIMIT ?
+                """,
+                (kind, kind, label, label, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def resolve(self, ref: str, kind: str = "live", label: str = "") -> dict:
+        """The one group matching "commit[*][/prompt_hash][@models]"; the commit may be a prefix.
+
+        Without "*" only clean-tree runs match. Raises ValueError if no group
+        or several groups match.
+        """
+        ref, _, models = ref.partition("@")
+        commit, _, prompt = ref.partition("/")
+        dirty = commit.endswith("*")
+        commit = commit.rstrip("*")
+        matches = [
+            group
+            for group in self.groups(kind, label, limit=-1)
+            if group["git_commit"].startswith(commit)
+            and bool(group["git_dirty"]) == dirty
+            and (not prompt or group["prompt_hash"] == prompt)
+            and (not models or models_ref(group["models"]) == models)
+        ]
+        if len(matches) != 1:
+            found = ", ".join(group_ref(group) for group in matches) or "none"
+            raise ValueError(f"{ref!r} must match exactly one group of {kind} runs (matches: {found})")
+        return matches[0]
+
+    def runs(self, group: dict) -> list[dict]:
+        """Successful runs of one group, oldest first, with "tokens" = input + output."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                """
+                SELECT * FROM runs
+                WHERE ok = 1 AND kind = ? AND label = ? AND git_commit = ? AND git_dirty = ? AND prompt_hash = ?
+                    AND models = ?
+                ORDER BY recorded_at
+                """,
+                tuple(group[column] for column in GROUP_KEY),
+            ).fetchall()
+        return [{**dict(row), "tokens": row["input_tokens"] + row["output_tokens"]} for row in rows]
+
+    def select(self, baseline: str, candidate: str | None, kind: str = "live", label: str = "") -> tuple[dict, dict]:
+        """(baseline, candidate) groups for `compare`; the candidate defaults to the most recent group.
+
+        Raises ValueError if a reference does not resolve, there are no runs,
+        or both sides are the same group (a group never regresses against itself).
+        """
+        baseline_group = self.resolve(baseline, kind, label)
+        if candidate:
+            candidate_group = self.resolve(candidate, kind, label)
+        else:
+            latest = self.groups(kind, label, limit=1)
+            if not latest:
+                raise ValueError(f"No recorded {kind} runs.")
+            candidate_group = latest[0]
+        if all(baseline_group[column] == candidate_group[column] for column in GROUP_KEY):
+            hint = "" if candidate else "; the most recent group is the baseline, pass --candidate"
+            raise ValueError(f"baseline and candidate are the same group ({group_ref(baseline_group)}){hint}")
+        return baseline_group, candidate_group
+
+
+def mann_whitney_greater(baseline: list[float], candidate: list[float]) -> float:
+    """One-sided p-value that candidate values tend to be larger than baseline values.
+
+    Mann-Whitney U with the normal approximation, tie correction and a
+    continuity correction.
+    """
+    n1, n2 = len(baseline), len(candidate)
+    combined = sorted([(value, 0) for value in baseline] + [(value, 1) for value in candidate])
+    ranks = [0.0] * len(combined)
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        ties = j - i + 1
+        tie_term += ties**3 - ties
+        i = j + 1
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 1)
+    u = rank_sum - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 1 - statistics.NormalDist().cdf(z)
+
+
+def compare(
+    baseline: list[dict],
+    candidate: list[dict],
+    metrics: tuple[str, ...] = METRICS,
+    alpha: float = 0.05,
+    min_effect: float = 0.05,
+) -> list[dict]:
+    """Per-metric verdicts: {"metric", "baseline", "candidate", "change", "p", "regression"}.
+
+    A regression needs p < alpha AND a relative median increase above min_effect.
+    Runs without a value for a metric (no RSS sample) are left out of it; a metric
+    with fewer than MIN_RUNS values on either side is skipped.
+    """
+    verdicts = []
+    for metric in metrics:
+        a = [run[metric] for run in baseline if run[metric] is not None]
+        b = [run[metric] for run in candidate if run[metric] is not None]
+        if len(a) < MIN_RUNS or len(b) < MIN_RUNS:
+            continue
+        base, cand = statistics.median(a), statistics.median(b)
+        change = (cand - base) / base if base else 0.0
+        p = mann_whitney_greater(a, b)
+        verdicts.append({
+            "metric": metric,
+            "baseline": base,
+            "candidate": cand,
+            "change": change,
+            "p": p,
+            "regression": p < alpha and change > min_effect,
+        })
+    return verdicts
+
+
+def main() -> None:
+    """CLI: list recorded groups, compare a candidate against a baseline."""
+    from src.config import PERF_HISTORY_PATH
+
+    parser = argparse.ArgumentParser(prog="python -m src.perf_history", description="Benchmark history and regression gate.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    listing = commands.add_parser("list", help="Recent groups of runs with median metrics")
+    listing.add_argument("--limit", type=int, default=20)
+    comparison = commands.add_parser("compare", help="Flag regressions of a candidate against a baseline")
+    comparison.add_argument("--baseline", required=True, help='group "commit[*][/prompt_hash]" as shown by list')
+    comparison.add_argument("--candidate", help="group like --baseline (default: the most recent group)")
+    comparison.add_argument("--kind", default="live", choices=["live", "prompt_bench"])
+    comparison.add_argument("--label", default="", help='replay label, e.g. "verifier/slim"')
+    comparison.add_argument("--metrics", default=",".join(METRICS))
+    comparison.add_argument("--alpha", type=float, default=0.05, help="significance level")
+    comparison.add_argument("--min-effect", type=float, default=0.05, help="minimum relative median increase")
+    args = parser.parse_args()
+
+    history = PerfHistory(PERF_HISTORY_PATH)
+
+    if args.command == "list":
+        print(f"  {'kind':<13}{'label':<24}{'group':<38}{'runs':>5}{'tokens':>10}{'cost $':>9}{'sec':>7}{'rss MB':>8}")
+        for group in history.groups(limit=args.limit):
+            runs = history.runs(group)
+            medians = {}
+            for metric in METRICS:
+                values = [run[metric] for run in runs if run[metric] is not None]
+                medians[metric] = statistics.median(values) if values else float("nan")
+            print(
+                f"  {group['kind']:<13}{group['label'] or '-':<24}{group_ref(group):<38}{group['runs']:>5}"
+                f"{medians['tokens']:>10,.0f}{medians['cost_usd']:>9.4f}{medians['duration_s']:>7.1f}"
+                f"{medians['peak_rss_mb']:>8.0f}"
+            )
+        return
+
+    metrics = tuple(metric for metric in args.metrics.split(",") if metric)
+    for metric in metrics:
+        if metric not in METRICS:
+            parser.error(f"unknown metric {metric!r}")
+    try:
+        baseline_group, candidate_group = history.select(args.baseline, args.candidate, args.kind, args.label)
+    except ValueError as e:
+        print(f"  {e}")
+        sys.exit(2)
+    baseline = history.runs(baseline_group)
+    candidate = history.runs(candidate_group)
+    print(
+        f"  Baseline {group_ref(baseline_group)}: {len(baseline)} runs   "
+        f"Candidate {group_ref(candidate_group)}: {len(candidate)} runs"
+    )
+    if len(baseline) < MIN_RUNS or len(candidate) < MIN_RUNS:
+        print(f"  Need at least {MIN_RUNS} runs on each side to compare.")
+        sys.exit(2)
+    if baseline_group["models"] != candidate_group["models"]:
+        print("  Note: the groups ran on different model ids; differences may come from the models.")
+
+    verdicts = compare(baseline, candidate, metrics, alpha=args.alpha, min_effect=args.min_effect)
+    print(f"\n  {'metric':<13}{'baseline':>12}{'candidate':>12}{'change':>9}{'p':>8}")
+    for verdict in verdicts:
+        flag = "  REGRESSION" if verdict["regression"] else ""
+        spec = METRIC_FORMATS[verdict["metric"]]
+        print(
+            f"  {verdict['metric']:<13}{verdict['baseline']:>12{spec}}{verdict['candidate']:>12{spec}}"
+            f"{verdict['change']:>+9.1%}{verdict['p']:>8.3f}{flag}"
+        )
+    if any(verdict["regression"] for verdict in verdicts):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Search prefetch for Agent Two - Netanel Systems.
+
+The Researcher's PASS 1 always opens with a few broad discovery searches
+derived from the idea, but they only go out after the Lead's first turn and
+the Researcher's first model turn. Prefetch derives similar queries in
+Python as soon as the idea is known and fires them concurrently while the
+Lead starts up. Results are indexed into the knowledge base, so the
+Researcher's local_search answers from them; an identical internet_search
+still in flight is coalesced with the prefetch call.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from concurrent.futures import Future
+
+from src.knowledge_base import query_terms
+from src.tools import search_async
+
+# One query per section of the Researcher's output format
+PREFETCH_TEMPLATES = [
+    "{topic} existing tools and products",
+    "{topic} AI agent frameworks",
+    "{topic} multi-agent architecture patterns",
+]
+
+# Leading instruction words that are not part of the topic
+LEAD_IN = re.compile(r"^\s*(?:build|create|make|design|develop|write)\s+(?:an?|the)?\s*", re.IGNORECASE)
+FILLER = {"that", "which", "who", "can", "will", "should", "it", "its"}
+MAX_TOPIC_TERMS = 8
+
+# Same parameters as internet_search's defaults, so identical in-flight calls coalesce
+SEARCH_PARAMS = {"max_results": 5, "search_depth": "basic", "topic": "general"}
+
+
+def topic_of(idea: str) -> str:
+    """The idea reduced to its search terms, e.g. "code review agent reviews prs"."""
+    terms = [term for term in query_terms(LEAD_IN.sub("", idea)) if term not in FILLER]
+    return " ".join(terms[:MAX_TOPIC_TERMS])
+
+
+def candidate_queries(idea: str) -> list[str]:
+    topic = topic_of(idea)
+    return [template.format(topic=topic) for template in PREFETCH_TEMPLATES] if topic else []
+
+
+async def _fetch_all(queries: list[str]) -> dict:
+    start = time.perf_counter()
+    responses = await asyncio.gather(
+        *(search_async(query, source="prefetch", **SEARCH_PARAMS) for query in queries),
+        return_exceptions=True,
+    )
+    errors = [response for response in responses if isinstance(response, BaseException)]
+    return {
+        "queries": len(queries),
+        "results": sum(len(response.get("results", [])) for response in responses if isinstance(response, dict)),
+        "errors": len(errors),
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+def start_prefetch(idea: str) -> Future:
+    """Fire the idea's discovery queries on a background thread.
+
+    Returns a future of {"queries", "results", "errors", "seconds"}. It never
+    raises: prefetch is an optimization, and a failed query is just a miss.
+    """
+    future: Future = Future()
+    queries = candidate_queries(idea)
+
+    def run() -> None:
+        try:
+            future.set_result(asyncio.run(_fetch_all(queries)))
+        except Exception:
+            future.set_result({"queries": len(queries), "results": 0, "errors": len(queries), "seconds": 0.0})
+
+    threading.Thread(target=run, name="prefetch", daemon=True).start()
+    return future
@@ -0,0 +1,228 @@
+"""Deterministic pre-verifier for Agent Two - Netanel Systems.
+
+Most verifier findings are mechanical: a missing output section, an agent
+without a model recommendation, retry logic that skips an agent, a cost
+estimate with no numbers, a citation pointing at a blog. These checks run
+over the captured subagent reports in milliseconds, so the LLM Verifier
+only has the semantic review left — or is skipped entirely under the
+"fast" profile.
+
+Findings use the Verifier's own fields (location, issue, impact, fix) and
+severities, so both kinds of review render the same way.
+"""
+
+import re
+
+from src.url_check import classify, extract_urls
+
+# Headings each subagent's output format requires (see src/prompts.py)
+REQUIRED_HEADINGS = {
+    "researcher": ["Existing Solutions", "Relevant Frameworks", "Architecture Patterns", "Gaps and Opportunities"],
+    "workflow_designer": ["Execution Order", "Data Flow", "Retry Logic", "Human-in-the-Loop", "Termination Conditions"],
+    "infra_planner": [
+        "Agent Inventory",
+        "Memory Strategy",
+        "Evaluation Criteria",
+        "Tracing and Observability",
+        "Deployment Plan",
+        "Cost Estimate",
+    ],
+}
+
+# Fields every "### Agent: {Name}" block must fill in
+AGENT_FIELDS = ["Role", "Tools", "System prompt draft", "Model", "Input", "Output"]
+
+# Output structure per stage for completeness scoring (the Verifier's own format included)
+OUTPUT_HEADINGS = {
+    **REQUIRED_HEADINGS,
+    "verifier": ["Gaps Found", "Risks Identified", "Suggestions for Improvement", "Verdict"],
+}
+
+PLACEHOLDERS = re.compile(r"\b(TBD|to be determined|depends on testing|will need to measure)\b", re.IGNORECASE)
+
+# Severities that block approval
+BLOCKING = {"Critical", "High"}
+
+
+def _finding(severity: str, location: str, issue: str, impact: str, fix: str) -> dict:
+    return {"severity": severity, "location": location, "issue": issue, "impact": impact, "fix": fix}
+
+
+def subsection(text: str, heading: str) -> str | None:
+    """Body under a '## ' to '#### {heading}' heading, or None if absent.
+
+    Models drift between heading levels, so any of them is accepted. The body
+    runs up to the next heading at the same or a higher level.
+    """
+    match = re.search(rf"^(#{{2,4}})\s+{re.escape(heading)}\b.*$", text, re.MULTILINE | re.IGNORECASE)
+    if not match:
+        return None
+    level = len(match.group(1))
+    end = re.search(rf"^#{{2,{level}}}\s", text[match.end():], re.MULTILINE)
+    return text[match.end():match.end() + end.start()] if end else text[match.end():]
+
+
+def agent_blocks(design: str) -> dict[str, str]:
+    """Agent name → its block, from '### Agent: {Name}' headings (## to #### accepted)."""
+    matches = list(re.finditer(r"^#{2,4}\s+Agent:\s*(.+?)\s*$", design, re.MULTILINE))
+    blocks = {}
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(design)
+        blocks[match.group(1).strip("* ")] = design[match.end():end]
+    return blocks
+
+
+def _has_field(block: str, field: str) -> bool:
+    return re.search(rf"\*\*{re.escape(field)}\*\*\s*:", block, re.IGNORECASE) is not None
+
+
+def _mentions(text: str, name: str) -> bool:
+    return name.lower() in text.lower()
+
+
+def preverify(reports: dict[str, str]) -> list[dict]:
+    """Run every structural check over the captured reports (keyed like AGENT_STEPS)."""
+    findings = []
+
+    for stage in ("researcher", "agent_designer", "workflow_designer", "infra_planner"):
+        if not reports.get(stage, "").strip():
+            findings.append(_finding(
+                "Critical", stage, "Section is missing or empty",
+                "Downstream sections were designed without it", f"Re-run the {stage} stage",
+            ))
+
+    for stage, headings in REQUIRED_HEADINGS.items():
+        text = reports.get(stage, "")
+        if not text:
+            continue
+        for heading in headings:
+            if subsection(text, heading) is None:
+                findings.append(_finding(
+                    "High", stage, f'Missing required section "### {heading}"',
+                    "Developers have to guess this part of the design",
+                    f'Add "### {heading}" as specified in the {stage} output format',
+                ))
+
+    # --- Agent designs ---
+    agents = agent_blocks(reports.get("agent_designer", ""))
+    if reports.get("agent_designer") and not agents:
+        findings.append(_finding(
+            "Critical", "agent_designer", 'No "### Agent: {Name}" definitions found',
+            "Workflow and infrastructure cannot reference any defined agent",
+            "Define each agent with the required fields",
+        ))
+    for name, block in agents.items():
+        for field in AGENT_FIELDS:
+            if not _has_field(block, field):
+                findings.append(_finding(
+                    "High" if field in ("Model", "System prompt draft") else "Medium",
+                    f"agent_designer — {name}", f'No "{field}" given',
+                    "The agent cannot be implemented without guessing",
+                    f'Add "- **{field}**: ..." to the {name} definition',
+                ))
+
+    # --- Workflow covers every agent ---
+    workflow = reports.get("workflow_designer", "")
+    retry = subsection(workflow, "Retry Logic") or ""
+    if agents and retry:
+        for name in agents:
+            if not _mentions(retry, name):
+                findings.append(_finding(
+                    "High", "workflow_designer — Retry Logic", f"No failure behavior for {name}",
+                    "A failure in this agent has undefined behavior in production",
+                    f"Add retry/fallback/skip behavior for {name}",
+                ))
+    flow = subsection(workflow, "Data Flow") or ""
+    known = {name.lower() for name in agents} | {"user", "human", "system", "output", "input"}
+    for source, target in re.findall(r"\*\*(.+?)\*\*\s*(?:→|->)\s*\*\*(.+?)\*\*", flow):
+        for name in (source, target):
+            if agents and name.strip().lower() not in known:
+                findings.append(_finding(
+                    "Medium", "workflow_designer — Data Flow", f'"{name}" is not a defined agent',
+                    "The workflow references an agent nobody designed",
+                    f'Use an agent from the Agent Design or define "{name}"',
+                ))
+
+    # --- Cost estimate is concrete and complete ---
+    infra = reports.get("infra_planner", "")
+    cost = subsection(infra, "Cost Estimate")
+    if cost is not None:
+        if not re.search(r"\$\s?\d", cost):
+            findings.append(_finding(
+                "High", "infra_planner — Cost Estimate", "No dollar amounts in the cost estimate",
+                "The business cannot judge whether the system is affordable",
+                "Give per-agent and total per-run costs in dollars",
+            ))
+        for name in agents:
+            if not _mentions(cost, name):
+                findings.append(_finding(
+                    "Medium", "infra_planner — Cost Estimate", f"{name} is not costed",
+                    "The per-run total understates the real cost",
+                    f"Add a cost line for {name}",
+                ))
+    if PLACEHOLDERS.search(infra):
+        findings.append(_finding(
+            "Medium", "infra_planner", "Contains placeholder values (TBD / to be determined)",
+            "Numbers the team needs are missing", "Replace placeholders with stated-assumption estimates",
+        ))
+
+    # --- Citations ---
+    for url in extract_urls(reports.get("researcher", "")):
+        reason = classify(url)
+        if reason:
+            findings.append(_finding(
+                "Low", "researcher — citations", f"{url}: {reason}",
+                "Developers are sent to an article instead of the product",
+                "Cite the tool's official homepage",
+            ))
+
+    return findings
+
+
+def completeness(stage: str, text: str) -> float:
+    """Share (0-1) of a stage's required output structure present in its report."""
+    if stage == "agent_designer":
+        blocks = agent_blocks(text)
+        if not blocks:
+            return 0.0
+        present = sum(_has_field(block, field) for block in blocks.values() for field in AGENT_FIELDS)
+        return present / (len(blocks) * len(AGENT_FIELDS))
+    headings = OUTPUT_HEADINGS.get(stage, [])
+    if not headings:
+        return 1.0 if text.strip() else 0.0
+    return sum(subsection(text, heading) is not None for heading in headings) / len(headings)
+
+
+def is_blocking(findings: list[dict]) -> bool:
+    return any(finding["severity"] in BLOCKING for finding in findings)
+
+
+def render_findings(findings: list[dict]) -> str:
+    """Findings as a Verifier-style "Gaps Found" list."""
+    if not findings:
+        return "- No structural gaps found."
+    lines = []
+    for finding in findings:
+        lines.append(f"- **Location**: {finding['location']}")
+        lines.append(f"- **Issue**: {finding['issue']} ({finding['severity']})")
+        lines.append(f"- **Impact**: {finding['impact']}")
+        lines.append(f"- **Suggested fix**: {finding['fix']}")
+        lines.append("")
+    return "\n".join(lines).rstrip()
+
+
+def render_review(findings: list[dict]) -> str:
+    """Full Verification Review for the "fast" profile, where no LLM Verifier runs."""
+    blocking = [f for f in findings if f["severity"] in BLOCKING]
+    verdict = "NEEDS REVISION" if blocking else "APPROVED"
+    justification = (
+        f"{len(blocking)} blocking structural gap(s) found by the automated checks."
+        if blocking
+        else "All structural checks passed. No semantic review was run (fast profile)."
+    )
+    review = f"### Gaps Found\n{render_findings(findings)}\n\n### Verdict\n**{verdict}**\n\nJustification: {justification}"
+    if blocking:
+        review += "\n\nMust fix before approval:\n" + "\n".join(
+            f"- {f['location']}: {f['issue']}" for f in blocking
+        )
+    return review
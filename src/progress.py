@@ -0,0 +1,157 @@
+"""Progress events for Agent Two - Netanel Systems.
+
+The stream loop publishes a handful of typed events instead of printing per
+token. Tokens are counted in the loop and reported in batches, so per-token
+work stays a counter increment. Sinks decide how to render:
+
+- TTYSink: human progress lines, throttled redraws of the token counter
+- JSONLSink: one JSON object per event, for logs and dashboards
+- Any callable: receives each event (e.g. to feed a job heartbeat)
+"""
+
+import json
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, TextIO
+
+
+@dataclass(frozen=True)
+class StageStarted:
+    stage: str
+    elapsed: float
+    kind: str = field(default="stage_started", init=False)
+
+
+@dataclass(frozen=True)
+class StageFinished:
+    stage: str
+    duration: float
+    tokens: int
+    kind: str = field(default="stage_finished", init=False)
+
+
+@dataclass(frozen=True)
+class ToolCalled:
+    stage: str
+    tool: str
+    kind: str = field(default="tool_called", init=False)
+
+
+@dataclass(frozen=True)
+class TokenProgress:
+    stage: str
+    stage_tokens: int
+    total_tokens: int
+    kind: str = field(default="token_progress", init=False)
+
+
+Event = StageStarted | StageFinished | ToolCalled | TokenProgress
+Sink = Callable[[Event], None]
+
+
+class ProgressBus:
+    """Fans typed events out to sinks. Token counts arrive in batches via tokens()."""
+
+    def __init__(self, sinks: list[Sink] | None = None):
+        self.sinks: list[Sink] = list(sinks or [])
+        self.stage_tokens: dict[str, int] = {}
+        self.total_tokens = 0
+
+    def subscribe(self, sink: Sink) -> None:
+        self.sinks.append(sink)
+
+    def emit(self, event: Event) -> None:
+        for sink in self.sinks:
+            sink(event)
+
+    def tokens(self, stage: str, count: int) -> None:
+        """Record a batch of streamed tokens for a stage."""
+        if not count:
+            return
+        stage_tokens = self.stage_tokens.get(stage, 0) + count
+        self.stage_tokens[stage] = stage_tokens
+        self.total_tokens += count
+        self.emit(TokenProgress(stage, stage_tokens, self.total_tokens))
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            close = getattr(sink, "close", None)
+            if close:
+                close()
+
+
+def format_duration(seconds: float) -> str:
+    """Format seconds into human-readable duration."""
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    minutes = int(seconds // 60)
+    secs = int(seconds % 60)
+    return f"{minutes}m {secs}s"
+
+
+class TTYSink:
+    """Renders progress for a human. Token counters redraw at most every `interval` seconds."""
+
+    def __init__(self, steps: dict[str, tuple], total_steps: int, stream: TextIO = sys.stdout, interval: float = 0.5):
+        self.steps = steps
+        self.total_steps = total_steps
+        self.stream = stream
+        self.interval = interval
+        self.live = stream.isatty()
+        self._last_draw = 0.0
+        self._counter_shown = False
+
+    def _write(self, text: str) -> None:
+        if self._counter_shown:
+            # Finish the in-place counter line before printing a new line
+            self.stream.write("\n")
+            self._counter_shown = False
+        self.stream.write(text + "\n")
+        self.stream.flush()
+
+    def __call__(self, event: Event) -> None:
+        if isinstance(event, TokenProgress):
+            if not self.live or event.stage not in self.steps:
+                return
+            now = time.monotonic()
+            if now - self._last_draw < self.interval:
+                return
+            self._last_draw = now
+            self.stream.write(f"\r  ... {event.stage_tokens:,} tokens")
+            self.stream.flush()
+            self._counter_shown = True
+        elif isinstance(event, StageStarted):
+            if event.stage in self.steps:
+                step_num, display_name, description, _ = self.steps[event.stage]
+                self._write(
+                    f"\n  [{step_num}/{self.total_steps}] {display_name}"
+                    f"  ({format_duration(event.elapsed)} elapsed)\n  {description}..."
+                )
+            elif event.stage == "lead":
+                self._write(f"\n  [Lead] Orchestrating...  ({format_duration(event.elapsed)} elapsed)")
+        elif isinstance(event, StageFinished):
+            if event.stage in self.steps:
+                self._write(f"  Done ({format_duration(event.duration)}, {event.tokens:,} tokens)")
+        elif isinstance(event, ToolCalled):
+            if event.stage in self.steps:
+                self._write(f"    → {event.tool}")
+
+
+class JSONLSink:
+    """Appends every event as a JSON line. Writes are buffered; close() flushes."""
+
+    def __init__(self, path: str, run_id: str = ""):
+        self.run_id = run_id
+        self._file = open(path, "a", buffering=64 * 1024)
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Event) -> None:
+        line = json.dumps({"ts": time.time(), "run_id": self.run_id, **asdict(event)})
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,285 @@
+"""Offline A/B benchmark of prompt variants for Agent Two - Netanel Systems.
+
+Replays archived specs through single subagents, once per prompt variant,
+and compares input/output tokens, latency and structural completeness of
+the output (scored with the pre-verifier's checks); every call is also
+appended to the benchmark history (src/perf_history.py). The task message for
+each stage is rebuilt from the archived upstream sections exactly as the
+Lead's templates would send it, so variants see identical inputs.
+
+Stages with tools (the researcher) would otherwise share the knowledge base
+and page cache, so the first variant's searches would answer the later
+variants' local_search calls. Each such call runs against its own copy of the
+knowledge base as it stood when the bench started, with a cold page cache.
+
+Usage:
+    python -m src.prompt_bench --stages agent_designer,workflow_designer --variants full,slim
+    python -m src.prompt_bench --specs 5 --repeats 2 --out bench.json
+
+Calls real models (and, for the researcher, real searches) — it costs money.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager, nullcontext
+
+from deepagents import create_deep_agent
+from langchain_core.messages import AIMessage
+
+from src import agents, tools
+from src.agent import estimate_cost, perf_history
+from src.archive import SpecArchive
+from src.config import ARCHIVE_PATH, EXTRACT_TIMEOUT
+from src.extract import PageExtractor
+from src.knowledge_base import KnowledgeBase
+from src.perf_history import RSSSampler
+from src.preverify import completeness
+from src.prompt_profile import count_tokens
+from src.prompts import (
+    AGENT_DESIGNER_PROMPT,
+    INFRA_PLANNER_PROMPT,
+    PROMPT_VARIANTS,
+    RESEARCHER_PROMPT,
+    VERIFIER_PROMPT,
+    WORKFLOW_DESIGNER_PROMPT,
+    prompt_variant,
+)
+
+STAGE_PROMPTS = {
+    "researcher": RESEARCHER_PROMPT,
+    "agent_designer": AGENT_DESIGNER_PROMPT,
+    "workflow_designer": WORKFLOW_DESIGNER_PROMPT,
+    "infra_planner": INFRA_PLANNER_PROMPT,
+    "verifier": VERIFIER_PROMPT,
+}
+
+# Archived section titles (AGENT_STEPS section headers) by stage
+SECTION_TITLES = {
+    "researcher": "Research Report",
+    "agent_designer": "Agent Design",
+    "workflow_designer": "Workflow Design",
+    "infra_planner": "Infrastructure Plan",
+}
+
+# Upstream sections each stage's task message needs
+UPSTREAM = {
+    "researcher": [],
+    "agent_designer": ["researcher"],
+    "workflow_designer": ["agent_designer"],
+    "infra_planner": ["agent_designer", "workflow_designer"],
+    "verifier": ["researcher", "agent_designer", "workflow_designer", "infra_planner"],
+}
+
+
+def task_message(stage: str, idea: str, sections: dict[str, str]) -> str:
+    """The Lead's task message for a stage (see the process steps in LEAD_PROMPT)."""
+    if stage == "researcher":
+        return f"Research existing solutions for: {idea}"
+    if stage == "agent_designer":
+        return (
+            f"Design agents for this idea: {idea}\n\n"
+            f"Here are the research findings to inform your design:\n{sections['researcher']}"
+        )
+    if stage == "workflow_designer":
+        return f"Design a workflow for these agents:\n{sections['agent_designer']}"
+    if stage == "infra_planner":
+        return (
+            "Plan infrastructure for this system. Here are the agent designs and workflow:\n\n"
+            f"## Agent Designs\n{sections['agent_designer']}\n\n"
+            f"## Workflow\n{sections['workflow_designer']}"
+        )
+    return (
+        "Review the following specification for gaps, risks, and completeness:\n\n"
+        f"## Research Findings\n{sections['researcher']}\n\n"
+        f"## Agent Designs\n{sections['agent_designer']}\n\n"
+        f"## Workflow\n{sections['workflow_designer']}\n\n"
+        f"## Infrastructure Plan\n{sections['infra_planner']}"
+    )
+
+
+def load_fixtures(archive: SpecArchive, limit: int) -> list[dict]:
+    """Recent archived specs with every upstream section present: {"id", "idea", "sections": {stage: body}}."""
+    fixtures = []
+    for spec in archive.recent(limit=limit * 4):
+        record = archive.get(spec["id"])
+        by_title = {section["title"]: section["body"] for section in record["sections"]}
+        sections = {stage: by_title[title] for stage, title in SECTION_TITLES.items() if title in by_title}
+        if len(sections) == len(SECTION_TITLES):
+            fixtures.append({"id": spec["id"], "idea": spec["idea"], "sections": sections})
+        if len(fixtures) == limit:
+            break
+    return fixtures
+
+
+@contextmanager
+def isolated_tools(snapshot: KnowledgeBase):
+    """Point the research tools at a fresh copy of a knowledge base snapshot and a cold page cache."""
+    saved = tools.knowledge_base, tools.page_extractor
+    with tempfile.TemporaryDirectory(prefix="agent-two-bench-") as scratch:
+        tools.knowledge_base = snapshot.snapshot(os.path.join(scratch, "knowledge.db"))
+        tools.page_extractor = PageExtractor(timeout=EXTRACT_TIMEOUT)
+        try:
+            yield
+        finally:
+            tools.knowledge_base, tools.page_extractor = saved
+
+
+def run_case(stage: str, variant: str, message: str, snapshot: KnowledgeBase | None = None) -> dict:
+    """One subagent call with a prompt variant. Returns tokens, latency and completeness.
+
+    Stages with tools run inside isolated_tools(snapshot) when a snapshot is
+    given. Each call is also appended to the benchmark history as a
+    "prompt_bench" run labelled "{stage}/{variant}".
+    """
+    subagent = getattr(agents, stage)
+    system_prompt = prompt_variant(STAGE_PROMPTS[stage], variant)
+    models = {stage: subagent["model"].model_name}
+    agent = create_deep_agent(
+        model=subagent["model"],
+        system_prompt=system_prompt,
+        tools=subagent["tools"],
+    )
+    start = time.perf_counter()
+    try:
+        with RSSSampler() as rss, isolated_tools(snapshot) if snapshot and subagent["tools"] else nullcontext():
+            result = agent.invoke({"messages": [{"role": "user", "content": message}]})
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}", "latency": time.perf_counter() - start}
+    latency = time.perf_counter() - start
+
+    input_tokens = output_tokens = 0
+    for msg in result["messages"]:
+        if isinstance(msg, AIMessage) and msg.usage_metadata:
+            input_tokens += msg.usage_metadata.get("input_tokens", 0)
+            output_tokens += msg.usage_metadata.get("output_tokens", 0)
+    text = result["messages"][-1].text
+    if perf_history:
+        try:
+            perf_history.record(
+                "prompt_bench",
+                hashlib.sha256(system_prompt.encode()).hexdigest()[:12],
+                models,
+                input_tokens,
+                output_tokens,
+                estimate_cost({stage: {"input": input_tokens, "output": output_tokens}}, models),
+                latency,
+                peak_rss_mb=rss.peak,
+                label=f"{stage}/{variant}",
+            )
+        except sqlite3.Error:
+            pass
+    return {
+        "error": None,
+        "latency": latency,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "completeness": completeness(stage, text),
+    }
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q * 100) - 1]
+
+
+def summarize(runs: list[dict]) -> list[dict]:
+    """Aggregate runs per (stage, variant)."""
+    groups: dict[tuple[str, str], list[dict]] = {}
+    for run in runs:
+        groups.setdefault((run["stage"], run["variant"]), []).append(run)
+    rows = []
+    for (stage, variant), group in groups.items():
+        ok = [run for run in group if run["error"] is None]
+        latencies = [run["latency"] for run in ok]
+        rows.append({
+            "stage": stage,
+            "variant": variant,
+            "prompt_tokens": count_tokens(prompt_variant(STAGE_PROMPTS[stage], variant)),
+            "runs": len(group),
+            "errors": len(group) - len(ok),
+            "input_tokens": statistics.mean(run["input_tokens"] for run in ok) if ok else 0,
+            "output_tokens": statistics.mean(run["output_tokens"] for run in ok) if ok else 0,
+            "latency_p50": _percentile(latencies, 0.5),
+            "latency_p95": _percentile(latencies, 0.95),
+            "completeness": statistics.mean(run["completeness"] for run in ok) if ok else 0.0,
+        })
+    return rows
+
+
+def print_table(rows: list[dict]) -> None:
+    baseline = {row["stage"]: row for row in rows if row["variant"] == "full"}
+    print(
+        f"  {'stage':<18}{'variant':<9}{'prompt':>8}{'in':>9}{'out':>7}"
+        f"{'p50 s':>8}{'p95 s':>8}{'complete':>10}{'Δ in':>8}{'err':>5}"
+    )
+    for row in sorted(rows, key=lambda r: (r["stage"], list(PROMPT_VARIANTS).index(r["variant"]))):
+        base = baseline.get(row["stage"])
+        delta = (
+            f"{row['input_tokens'] / base['input_tokens'] - 1:+.0%}"
+            if base and base["input_tokens"] and row is not base
+            else "-"
+        )
+        print(
+            f"  {row['stage']:<18}{row['variant']:<9}{row['prompt_tokens']:>8,}{row['input_tokens']:>9,.0f}"
+            f"{row['output_tokens']:>7,.0f}{row['latency_p50']:>8.1f}{row['latency_p95']:>8.1f}"
+            f"{row['completeness']:>10.0%}{delta:>8}{row['errors']:>5}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.prompt_bench", description="A/B prompt variants on archived specs.")
+    parser.add_argument("--stages", default="agent_designer,workflow_designer,infra_planner,verifier")
+    parser.add_argument("--variants", default=",".join(PROMPT_VARIANTS))
+    parser.add_argument("--specs", type=int, default=3, help="archived specs to replay")
+    parser.add_argument("--repeats", type=int, default=1, help="runs per spec, stage and variant")
+    parser.add_argument("--out", help="write raw runs and the summary as JSON")
+    args = parser.parse_args()
+
+    stages = [stage for stage in args.stages.split(",") if stage]
+    variants = [variant for variant in args.variants.split(",") if variant]
+    for stage in stages:
+        if stage not in STAGE_PROMPTS:
+            parser.error(f"unknown stage {stage!r}")
+    for variant in variants:
+        if variant not in PROMPT_VARIANTS:
+            parser.error(f"unknown variant {variant!r}")
+
+    fixtures = load_fixtures(SpecArchive(ARCHIVE_PATH), args.specs)
+    if not fixtures:
+        print("  No complete archived specs to replay. Generate a few specs first.")
+        raise SystemExit(1)
+    print(f"  Replaying {len(fixtures)} spec(s) × {len(stages)} stage(s) × {len(variants)} variant(s) × {args.repeats}")
+
+    runs = []
+    with tempfile.TemporaryDirectory(prefix="agent-two-bench-") as scratch:
+        # Every researcher call starts from the knowledge base as it is now
+        snapshot = tools.knowledge_base.snapshot(os.path.join(scratch, "knowledge.db")) if "researcher" in stages else None
+        for fixture in fixtures:
+            for stage in stages:
+                message = task_message(stage, fixture["idea"], fixture["sections"])
+                for _ in range(args.repeats):
+                    # Variants interleaved, so provider latency drift hits them all alike
+                    for variant in variants:
+                        run = run_case(stage, variant, message, snapshot)
+                        runs.append({"spec_id": fixture["id"], "stage": stage, "variant": variant, **run})
+                        status = run["error"] or f"{run['latency']:.1f}s  {run['completeness']:.0%}"
+                        print(f"    #{fixture['id']} {stage:<18}{variant:<9}{status}")
+
+    rows = summarize(runs)
+    print()
+    print_table(rows)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"runs": runs, "summary": rows}, f, indent=2)
+        print(f"\n  Raw results: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Prompt footprint profiler for Agent Two - Netanel Systems.
+
+Every system prompt is re-sent on every model turn, so its size is paid
+many times per run. This reports the token count of each prompt, of each
+top-level XML section inside it, and of each slim variant.
+
+Usage:
+    python -m src.prompt_profile              # totals per prompt and variant
+    python -m src.prompt_profile --sections   # plus per-section breakdown
+"""
+
+import argparse
+import re
+from functools import lru_cache
+
+import tiktoken
+
+from src import prompts
+from src.prompts import PROMPT_VARIANTS, prompt_variant
+
+# gpt-4o / gpt-4o-mini tokenizer; close enough for relative sizes on other models
+ENCODING = "o200k_base"
+
+SECTION_PATTERN = re.compile(r"<(\w+)>(.*?)</\1>", re.DOTALL)
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> tiktoken.Encoding:
+    return tiktoken.get_encoding(ENCODING)
+
+
+def count_tokens(text: str) -> int:
+    return len(_encoding().encode(text))
+
+
+def split_prompt(prompt: str) -> list[tuple[str, str]]:
+    """Prompt as (section, text) pairs: top-level XML sections, plain text between them as "(text)"."""
+    parts = []
+    position = 0
+    for match in SECTION_PATTERN.finditer(prompt):
+        if prompt[position:match.start()].strip():
+            parts.append(("(text)", prompt[position:match.start()]))
+        parts.append((match.group(1), match.group(0)))
+        position = match.end()
+    if prompt[position:].strip():
+        parts.append(("(text)", prompt[position:]))
+    return parts
+
+
+def all_prompts() -> dict[str, str]:
+    """Every *_PROMPT constant in src.prompts, by name."""
+    return {
+        name.removesuffix("_PROMPT").lower(): value
+        for name, value in vars(prompts).items()
+        if name.endswith("_PROMPT") and isinstance(value, str)
+    }
+
+
+def profile(prompt: str) -> dict:
+    """Token counts for one prompt: total, per section, and per variant."""
+    sections: dict[str, int] = {}
+    for name, text in split_prompt(prompt):
+        sections[name] = sections.get(name, 0) + count_tokens(text)
+    return {
+        "total": count_tokens(prompt),
+        "sections": sections,
+        "variants": {variant: count_tokens(prompt_variant(prompt, variant)) for variant in PROMPT_VARIANTS},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.prompt_profile", description="Token footprint of every prompt.")
+    parser.add_argument("--sections", action="store_true", help="show per-section token counts")
+    args = parser.parse_args()
+
+    variants = list(PROMPT_VARIANTS)
+    print(f"  {'prompt':<20}" + "".join(f"{variant:>10}" for variant in variants))
+    totals = dict.fromkeys(variants, 0)
+    for name, prompt in all_prompts().items():
+        report = profile(prompt)
+        print(f"  {name:<20}" + "".join(f"{report['variants'][variant]:>10,}" for variant in variants))
+        for variant in variants:
+            totals[variant] += report["variants"][variant]
+        if args.sections:
+            for section, tokens in sorted(report["sections"].items(), key=lambda item: -item[1]):
+                print(f"      {section:<18}{tokens:>8,}  {tokens / report['total']:>5.0%}")
+    print(f"  {'total':<20}" + "".join(f"{totals[variant]:>10,}" for variant in variants))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Bounded report accumulation for Agent Two - Netanel Systems.
+
+A subagent report arrives as thousands of small streamed tokens, and a
+researcher stuck in a loop can stream megabytes. ReportBuffer collects a
+stage's tokens in a list (the cheapest per-token append) and stops at a
+per-stage hard cap with a visible truncation marker, so the text held per
+run has a ceiling no matter what the models do.
+
+The caps are the only bound. Nothing spills to disk, and assembly does not
+stream from these buffers: a finished stage is joined into one string,
+because the citation check, the pre-verifier, checkpoints and the archive's
+search index all need whole reports. finish_spec then holds each report plus
+its cleaned section copy, so a run peaks at roughly twice the sum of its
+stage caps (REPORT_CAPS).
+"""
+
+TRUNCATION_MARKER = "\n\n[... {stage} report truncated at {cap:,} characters ...]\n"
+
+
+class ReportBuffer:
+    """Append-only text buffer with a hard character cap."""
+
+    def __init__(self, stage: str, cap: int):
+        """
+        Args:
+            stage: Stage name, used in the truncation marker.
+            cap: Maximum characters kept (0 = unlimited). The rest is dropped and counted.
+        """
+        self.stage = stage
+        self.cap = cap
+        self.size = 0
+        self.dropped = 0
+        self._chunks: list[str] = []
+
+    @property
+    def truncated(self) -> bool:
+        return self.dropped > 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, text: str) -> None:
+        size = self.size + len(text)
+        if not self.cap or size <= self.cap:
+            self._chunks.append(text)
+            self.size = size
+            return
+        if self.dropped:
+            self.dropped += len(text)
+            return
+        keep = self.cap - self.size
+        self._chunks.append(text[:keep])
+        self._chunks.append(TRUNCATION_MARKER.format(stage=self.stage, cap=self.cap))
+        self.size = self.cap
+        self.dropped = len(text) - keep
+
+    def getvalue(self) -> str:
+        return "".join(self._chunks)
@@ -0,0 +1,271 @@
+"""Latency-aware model routing for Agent Two - Netanel Systems.
+
+p99 spec latency is dominated by the occasional stalled provider response.
+RoutedChatModel wraps an ordered fallback list of chat models:
+
+- Each attempt has a time-to-first-token (TTFT) deadline. A silent attempt is
+  abandoned and the next model in the list takes over.
+- Hedging: if the first token is slower than the model's recent TTFT
+  percentile, a duplicate request goes to the next model while the first is
+  still running. Whichever streams first wins; the other is cancelled.
+  Off by default (MODEL_HEDGE_QUANTILE=0): the cancelled request is still
+  billed, and its tokens never reach the run budget or cost estimate.
+- Live TTFT stats per candidate slot order the list: slots that recently
+  failed or timed out are tried last until their cooldown expires. Stats are
+  keyed by position as well as model id, so a fallback that reuses the
+  primary's model keeps its own record and can still be promoted over it.
+- Abandoned attempts have their stream closed, which closes the provider
+  response. A stream blocked waiting on the network is closed as soon as it
+  next yields, since a running generator cannot be closed from another thread.
+
+Once a model has streamed its first token it owns the response — there is
+no mid-stream failover, because tokens are already on the wire.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Iterator
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.chat_models import generate_from_stream
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+# TTFT samples kept per model, and how many are needed before hedging kicks in
+STATS_WINDOW = 200
+MIN_HEDGE_SAMPLES = 20
+# Seconds a model is demoted after a failure or TTFT timeout
+COOLDOWN = 60.0
+
+
+def model_id(model: Any) -> str:
+    """Bare model name of a chat model (or a tool-bound one)."""
+    model = getattr(model, "bound", model)
+    return getattr(model, "model_name", None) or getattr(model, "model", None) or type(model).__name__
+
+
+def slot_key(index: int, model: Any) -> str:
+    """Stats key for a candidate: its position in the fallback list plus its model id."""
+    return f"{index}:{model_id(model)}"
+
+
+class LatencyStats:
+    """Thread-safe rolling TTFT samples and failure times per candidate slot key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ttft: dict[str, deque] = {}
+        self._failed_at: dict[str, float] = {}
+        self.counts: dict[str, dict[str, int]] = {}
+
+    def _count(self, name: str, outcome: str) -> None:
+        counts = self.counts.setdefault(name, {"wins": 0, "failures": 0, "timeouts": 0, "hedges": 0})
+        counts[outcome] += 1
+
+    def record_ttft(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._ttft.setdefault(name, deque(maxlen=STATS_WINDOW)).append(seconds)
+            self._count(name, "wins")
+
+    def record_failure(self, name: str, timeout: bool = False) -> None:
+        with self._lock:
+            self._failed_at[name] = time.monotonic()
+            self._count(name, "timeouts" if timeout else "failures")
+
+    def record_hedge(self, name: str) -> None:
+        with self._lock:
+            self._count(name, "hedges")
+
+    def percentile(self, name: str, q: float) -> float | None:
+        """TTFT at quantile q, or None until there are enough samples."""
+        with self._lock:
+            samples = sorted(self._ttft.get(name, ()))
+        if len(samples) < MIN_HEDGE_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def order(self, names: list[str]) -> list[int]:
+        """Candidate indices: healthy slots in priority order, cooling-down ones last."""
+        now = time.monotonic()
+        with self._lock:
+            cooling = {name for name, at in self._failed_at.items() if now - at < COOLDOWN}
+        return sorted(range(len(names)), key=lambda i: (names[i] in cooling, i))
+
+    def snapshot(self) -> dict[str, dict]:
+        """Per-slot counters and TTFT p50/p95, for run reports."""
+        report = {}
+        for name in list(self.counts):
+            p50, p95 = self.percentile(name, 0.5), self.percentile(name, 0.95)
+            report[name] = {
+                **self.counts[name],
+                "ttft_p50": round(p50, 3) if p50 is not None else None,
+                "ttft_p95": round(p95, 3) if p95 is not None else None,
+            }
+        return report
+
+
+class _Attempt:
+    """One streaming call on a worker thread, pushing events into a shared queue."""
+
+    def __init__(self, index: int, name: str, model: Any, messages, kwargs, events: queue.Queue):
+        self.index = index
+        self.name = name
+        self.started = time.monotonic()
+        self.cancelled = threading.Event()
+        self.stream: Iterator | None = None
+        self.thread = threading.Thread(
+            target=self._run, args=(model, messages, kwargs, events), daemon=True
+        )
+        self.thread.start()
+
+    def cancel(self) -> None:
+        """Abandon the attempt and close its stream (and the provider response behind it)."""
+        self.cancelled.set()
+        self._close()
+
+    def _close(self) -> None:
+        stream = self.stream
+        if stream is None or not hasattr(stream, "close"):
+            return
+        try:
+            stream.close()
+        except ValueError:
+            pass  # Blocked in next() on the worker thread, which closes it once it wakes
+
+    def _run(self, model, messages, kwargs, events: queue.Queue) -> None:
+        try:
+            self.stream = model.stream(messages, **kwargs)
+            if self.cancelled.is_set():
+                return
+            for chunk in self.stream:
+                if self.cancelled.is_set():
+                    return
+                events.put(("chunk", self.index, chunk))
+            events.put(("done", self.index, None))
+        except BaseException as e:
+            events.put(("error", self.index, e))
+        finally:
+            self._close()
+
+
+class RoutedChatModel(BaseChatModel):
+    """Chat model that routes each call across an ordered fallback list."""
+
+    candidates: list[Any]
+    stats: Any
+    ttft_deadline: float = 20.0
+    hedge_quantile: float = 0.95
+
+    @property
+    def _llm_type(self) -> str:
+        return "routed"
+
+    @property
+    def model_name(self) -> str:
+        """The primary model's name (used for pricing and run metadata)."""
+        return model_id(self.candidates[0])
+
+    def bind_tools(self, tools, **kwargs):
+        return self.model_copy(
+            update={"candidates": [model.bind_tools(tools, **kwargs) for model in self.candidates]}
+        )
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        names = [slot_key(i, model) for i, model in enumerate(self.candidates)]
+        order = self.stats.order(names)
+        call_kwargs = {**kwargs, **({"stop": stop} if stop else {})}
+        events: queue.Queue = queue.Queue()
+        attempts: dict[int, _Attempt] = {}
+        last_error: BaseException | None = None
+
+        def launch() -> bool:
+            if not order:
+                return False
+            index = order.pop(0)
+            attempts[index] = _Attempt(index, names[index], self.candidates[index], messages, call_kwargs, events)
+            return True
+
+        def hedge_at(attempt: _Attempt) -> float | None:
+            if not self.hedge_quantile or not order:
+                return None
+            p = self.stats.percentile(attempt.name, self.hedge_quantile)
+            return attempt.started + p if p is not None else None
+
+        try:
+            launch()
+            winner: _Attempt | None = None
+            hedged = False
+            while winner is None:
+                live = [a for a in attempts.values() if not a.cancelled.is_set()]
+                if not live and not launch():
+                    raise last_error or TimeoutError("All model attempts failed")
+                live = [a for a in attempts.values() if not a.cancelled.is_set()]
+                wake = min(a.started + self.ttft_deadline for a in live)
+                hedge = None if hedged else hedge_at(live[0])
+                if hedge is not None:
+                    wake = min(wake, hedge)
+                try:
+                    kind, index, payload = events.get(timeout=max(0.0, wake - time.monotonic()))
+                except queue.Empty:
+                    now = time.monotonic()
+                    for attempt in live:
+                        if now - attempt.started >= self.ttft_deadline:
+                            attempt.cancel()
+                            self.stats.record_failure(attempt.name, timeout=True)
+                            last_error = TimeoutError(f"{attempt.name}: no first token within {self.ttft_deadline}s")
+                    if hedge is not None and now >= hedge:
+                        hedged = True
+                        self.stats.record_hedge(live[0].name)
+                        launch()
+                    continue
+
+                attempt = attempts[index]
+                if attempt.cancelled.is_set():
+                    continue
+                if kind == "error":
+                    attempt.cancel()
+                    self.stats.record_failure(attempt.name)
+                    last_error = payload
+                    continue
+                # First chunk (or an empty but finished response) wins the race
+                winner = attempt
+                self.stats.record_ttft(attempt.name, time.monotonic() - attempt.started)
+                for other in attempts.values():
+                    if other is not winner:
+                        other.cancel()
+                if kind == "done":
+                    return
+                yield ChatGenerationChunk(message=payload)
+
+            while True:
+                kind, index, payload = events.get()
+                if index != winner.index:
+                    continue
+                if kind == "chunk":
+                    yield ChatGenerationChunk(message=payload)
+                elif kind == "done":
+                    return
+                else:
+                    raise payload
+        finally:
+            # Also reached when the caller stops reading: release every stream still open
+            for attempt in attempts.values():
+                attempt.cancel()
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return generate_from_stream(self._stream(messages, stop=stop, run_manager=run_manager, **kwargs))
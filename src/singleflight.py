@@ -0,0 +1,61 @@
+"""Single-flight call coalescing for Agent Two - Netanel Systems.
+
+When several runs in one process fire the same search at the same time,
+only the first caller (the leader) goes upstream. Everyone else — other
+threads or asyncio tasks — waits on the leader's future and gets the same
+result (or the same exception). Nothing is cached after the call returns.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one upstream call."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: dict[Hashable, Future] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def _join_or_lead(self, key: Hashable) -> tuple[Future, bool]:
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            return future, True
+
+    def _lead(self, key: Hashable, future: Future, fn: Callable[[], Any]) -> Any:
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn() unless an identical call is in flight; then wait for its result."""
+        future, leader = self._join_or_lead(key)
+        if not leader:
+            return future.result()
+        return self._lead(key, future, fn)
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Async variant: the leader runs blocking fn() in a worker thread,
+        followers await the shared future without holding a thread."""
+        future, leader = self._join_or_lead(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        return await asyncio.to_thread(self._lead, key, future, fn)
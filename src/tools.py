@@ -2,18 +2,64 @@
 
 Only the Researcher agent uses tools. All other agents work from text input.
 
-Two search tools:
+Three search tools:
+- local_search: Search previously collected results first (falls back to the web)
 - internet_search: Broad discovery search (find tool names, patterns, frameworks)
 - search_official_site: Targeted search for a specific tool's official homepage
+
+Every web result is indexed into the local knowledge base, so each run
+makes the next one cheaper. All Tavily calls go through search(), which
+normalizes the query and coalesces identical in-flight requests across
+threads, asyncio tasks, and concurrent runs in this process. A run's
+prefetched searches (src/prefetch.py) land in the same index; local_search
+waits briefly for them so the Researcher's first queries can hit them.
+search_official_site also attaches a fact card per official page
+(src/extract.py), so the Researcher learns what a tool does without
+another search.
+
+Searches are adaptive: each starts at basic depth with a small result
+count, and is repeated deeper (and, for internet_search, wider) only when
+the results look weak — no official-domain match for the tool name,
+blog/aggregator domains, low Tavily scores. Budget degradation caps the
+escalation like any other search. Each run counts its own escalations in
+an EscalationStats made active with count_searches().
 """
 
-from typing import Literal, Sequence
+import re
+import sqlite3
+import threading
+from concurrent.futures import Future
+from concurrent.futures import wait as wait_futures
+from contextvars import ContextVar
+from typing import Callable, Literal, Sequence
+from urllib.parse import urlparse
 
 from tavily import TavilyClient
 
-from src.config import TAVILY_API_KEY
+from src.budget import TOOL_CUTOFF, search_limits
+from src.config import (
+    EXTRACT_PAGES,
+    EXTRACT_TIMEOUT,
+    KNOWLEDGE_BASE_PATH,
+    KNOWLEDGE_BASE_TTL_HOURS,
+    LOCAL_SEARCH_MIN_COVERAGE,
+    LOCAL_SEARCH_MIN_RESULTS,
+    PREFETCH_WAIT,
+    SEARCH_MIN_CONFIDENCE,
+    TAVILY_API_KEY,
+    TAVILY_BASE_URL,
+)
+from src.extract import PageExtractor
+from src.knowledge_base import KnowledgeBase, coverage, query_terms
+from src.singleflight import SingleFlight
+
+tavily_client = TavilyClient(api_key=TAVILY_API_KEY, api_base_url=TAVILY_BASE_URL or None)
+knowledge_base = KnowledgeBase(KNOWLEDGE_BASE_PATH, ttl=KNOWLEDGE_BASE_TTL_HOURS * 3600)
+in_flight = SingleFlight()
+page_extractor = PageExtractor(timeout=EXTRACT_TIMEOUT)
 
-tavily_client = TavilyClient(api_key=TAVILY_API_KEY)
+# This run's prefetch, if one is still landing (set by expect_prefetch)
+_prefetch: ContextVar[Future | None] = ContextVar("prefetch", default=None)
 
 # Domains that are aggregators/listicles, not official product pages
 BLOG_DOMAINS = [
@@ -26,6 +72,182 @@ BLOG_DOMAINS = [
     "reddit.com",
 ]
 
+# First-pass result count; an escalated search goes advanced with the caller's max_results
+BASIC_MAX_RESULTS = 5
+
+
+class EscalationStats:
+    """Thread-safe per-tool counts of searches and how many were escalated."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: dict[str, dict[str, int]] = {}
+
+    def record(self, tool: str, escalated: bool) -> None:
+        with self._lock:
+            counts = self.counts.setdefault(tool, {"searches": 0, "escalated": 0})
+            counts["searches"] += 1
+            counts["escalated"] += int(escalated)
+
+    def snapshot(self) -> dict[str, dict]:
+        """{tool: {"searches", "escalated", "rate"}}"""
+        with self._lock:
+            return {
+                tool: {**counts, "rate": round(counts["escalated"] / counts["searches"], 3)}
+                for tool, counts in self.counts.items()
+            }
+
+
+# This run's escalation counts (set by count_searches)
+_search_stats: ContextVar[EscalationStats | None] = ContextVar("search_stats", default=None)
+
+
+def count_searches(stats: EscalationStats | None):
+    """Count adaptive searches in this run's context into stats. Returns a reset token."""
+    return _search_stats.set(stats)
+
+
+def stop_counting(token) -> None:
+    _search_stats.reset(token)
+
+
+def _remember(response: dict, source: str, query: str) -> None:
+    """Index a successful web response. The index is a cache — never fail a search over it."""
+    try:
+        knowledge_base.add_results(response, source=source, query=query)
+    except sqlite3.Error:
+        pass
+
+
+def normalize_query(query: str) -> str:
+    """Canonical query text: lowercase, single spaces, no edge whitespace."""
+    return " ".join(query.lower().split())
+
+
+def search_key(query: str, params: dict) -> tuple:
+    """Identity of a search: normalized query plus order-independent parameters."""
+    canonical = []
+    for name, value in sorted(params.items()):
+        if isinstance(value, (list, tuple, set)):
+            value = tuple(sorted(v.lower() for v in value))
+        canonical.append((name, value))
+    return normalize_query(query), tuple(canonical)
+
+
+def _upstream(query: str, source: str, params: dict) -> tuple[tuple, Callable[[], dict]]:
+    """Coalescing key and the upstream call for one search."""
+    key = search_key(query, params)
+    canonical_query, canonical_params = key
+
+    def call() -> dict:
+        response = tavily_client.search(
+            canonical_query,
+            **{name: list(value) if isinstance(value, tuple) else value for name, value in canonical_params},
+        )
+        _remember(response, source=source, query=canonical_query)
+        return response
+
+    return key, call
+
+
+def search(query: str, source: str, **params) -> dict:
+    """Run one Tavily search, sharing the upstream call with identical in-flight searches.
+
+    Raises whatever the Tavily client raises; the tools turn that into an error dict.
+    """
+    return in_flight.do(*_upstream(query, source, params))
+
+
+async def search_async(query: str, source: str, **params) -> dict:
+    """Asyncio variant of search(). Coalesces with threaded callers too."""
+    return await in_flight.do_async(*_upstream(query, source, params))
+
+
+def domain_of(url: str) -> str:
+    """Lowercase host without a leading 'www.' ("" for URLs that do not parse)."""
+    try:
+        host = (urlparse(url).hostname or "").lower()
+    except ValueError:
+        return ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def is_blog(domain: str) -> bool:
+    return any(domain == blocked or domain.endswith("." + blocked) for blocked in BLOG_DOMAINS)
+
+
+def _compact(text: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def name_match(tool_name: str, domain: str) -> float:
+    """1.0 if the domain spells the tool name ("CodeRabbit" → coderabbit.ai), else the share of its words in it."""
+    name = _compact(tool_name)
+    host = _compact(domain)
+    if name and name in host:
+        return 1.0
+    words = [_compact(word) for word in tool_name.split() if len(_compact(word)) >= 3]
+    return sum(word in host for word in words) / len(words) * 0.75 if words else 0.0
+
+
+def result_confidence(response: dict, tool_name: str | None = None, wanted: int = 3) -> float:
+    """0-1 confidence that a response already answers the search.
+
+    With a tool name (official-site lookups): the best result's official-domain
+    match and Tavily score. Without one: the top non-blog scores, discounted
+    when fewer than `wanted` non-blog results came back.
+    """
+    results = [r for r in response.get("results", []) if r.get("url") and not is_blog(domain_of(r["url"]))]
+    if not results:
+        return 0.0
+    if tool_name:
+        return max(0.6 * name_match(tool_name, domain_of(r["url"])) + 0.4 * float(r.get("score") or 0) for r in results)
+    top = sorted((float(r.get("score") or 0) for r in results), reverse=True)[:wanted]
+    return sum(top) / len(top) * min(1.0, len(results) / wanted)
+
+
+def adaptive_search(
+    query: str,
+    source: str,
+    first: tuple[str, int],
+    escalated: tuple[str, int],
+    tool_name: str | None = None,
+    **params,
+) -> dict:
+    """Search with the cheap (depth, max_results) first; repeat with the escalated pair if confidence is low.
+
+    Both pairs must already be budget-limited. If they are equal (the budget
+    degraded the escalation away), there is no second search.
+    """
+    depth, max_results = first
+    response = search(query, source=source, search_depth=depth, max_results=max_results, **params)
+    escalate = (
+        escalated != first
+        and result_confidence(response, tool_name, wanted=min(3, max_results)) < SEARCH_MIN_CONFIDENCE
+    )
+    if escalate:
+        depth, max_results = escalated
+        response = search(query, source=source, search_depth=depth, max_results=max_results, **params)
+    stats = _search_stats.get()
+    if stats is not None:
+        stats.record(source, escalate)
+    return response
+
+
+def expect_prefetch(future: Future | None):
+    """Make local_search in this run's context wait for a prefetch. Returns a reset token."""
+    return _prefetch.set(future)
+
+
+def clear_prefetch(token) -> None:
+    _prefetch.reset(token)
+
+
+def _await_prefetch() -> None:
+    future = _prefetch.get()
+    if future is not None and not future.done():
+        wait_futures([future], timeout=PREFETCH_WAIT)
+
 
 def internet_search(
     query: str,
@@ -40,17 +262,21 @@ def internet_search(
         max_results: Maximum number of results to return.
         topic: Category of search - general, news, or finance.
         search_depth: "basic" for fast results, "advanced" for deeper crawling.
+            A basic search goes deeper automatically when the first results
+            look weak; "advanced" skips the basic pass.
 
     Returns:
         Dictionary containing search results with titles, URLs, and snippets.
     """
+    if search_depth == "advanced":
+        first = escalated = search_limits("researcher", "advanced", max_results)
+    else:
+        first = search_limits("researcher", "basic", min(max_results, BASIC_MAX_RESULTS))
+        escalated = search_limits("researcher", "advanced", max_results)
+    if first is None:
+        return {"error": TOOL_CUTOFF}
     try:
-        return tavily_client.search(
-            query,
-            max_results=max_results,
-            search_depth=search_depth,
-            topic=topic,
-        )
+        return adaptive_search(query, "internet_search", first, escalated or first, topic=topic)
     except Exception as e:
         return {"error": f"Search failed: {e}"}
 
@@ -69,14 +295,85 @@ def search_official_site(
         max_results: Maximum number of results to return.
 
     Returns:
-        Dictionary containing search results filtered to official sites.
+        Dictionary containing search results filtered to official sites. The top
+        results carry a "card" instead of a snippet: the page's name, purpose,
+        key features and pricing hint, read from the page itself.
     """
+    first = search_limits("researcher", "basic", max_results)
+    if first is None:
+        return {"error": TOOL_CUTOFF}
+    escalated = search_limits("researcher", "advanced", max_results)
     try:
-        return tavily_client.search(
+        response = adaptive_search(
             f"{tool_name} official site",
-            max_results=max_results,
-            search_depth="advanced",
+            "search_official_site",
+            first,
+            escalated or first,
+            tool_name=tool_name,
             exclude_domains=BLOG_DOMAINS,
         )
     except Exception as e:
         return {"error": f"Search failed: {e}"}
+    return with_fact_cards(response) if EXTRACT_PAGES else response
+
+
+def with_fact_cards(response: dict, pages: int = EXTRACT_PAGES) -> dict:
+    """Replace the snippets of the top result pages with fact cards built from the pages themselves.
+
+    Results whose page could not be fetched keep their snippet.
+    """
+    results = response.get("results", [])
+    urls = [result["url"] for result in results[:pages] if result.get("url")]
+    if not urls:
+        return response
+    try:
+        cards = dict(zip(urls, page_extractor.cards(urls)))
+    except Exception:
+        return response
+    condensed = []
+    for result in results:
+        card = cards.get(result.get("url"))
+        if card:
+            result = {"title": result.get("title", ""), "url": result["url"], "score": result.get("score"), "card": card}
+        condensed.append(result)
+    return {**response, "results": condensed}
+
+
+def local_search(
+    query: str,
+    max_results: int = 5,
+) -> dict:
+    """Search previously collected research. Use this FIRST for every discovery query.
+
+    Answers from a local index of every earlier search result in milliseconds.
+    If the index does not cover the query well, it falls back to internet_search
+    automatically, so you never need to repeat the query yourself.
+
+    Args:
+        query: The search query string.
+        max_results: Maximum number of results to return.
+
+    Returns:
+        Dictionary containing search results with titles, URLs, and snippets.
+        "source" is "local" when answered from the index, "web" otherwise.
+    """
+    _await_prefetch()
+    try:
+        response = knowledge_base.search(query, max_results=max_results)
+    except sqlite3.Error:
+        response = {"results": []}
+
+    terms = query_terms(query)
+    relevant = [
+        result
+        for result in response["results"]
+        if coverage(terms, result) >= LOCAL_SEARCH_MIN_COVERAGE
+    ]
+    if len(relevant) >= min(LOCAL_SEARCH_MIN_RESULTS, max_results):
+        return {"query": query, "source": "local", "results": relevant}
+
+    # Low recall — go to the web (which also grows the index for next time)
+    response = internet_search(query, max_results=max_results)
+    if "error" not in response:
+        response = {**response, "source": "web"}
+    return response
@@ -0,0 +1,187 @@
+"""Citation URL validation for Agent Two - Netanel Systems.
+
+Runs in Python after the Researcher finishes, instead of making the model
+self-check every URL inside its own loop (extra turns, extra searches).
+
+Each URL in the report is:
+1. Classified against BLOG_DOMAINS and listicle path heuristics (no network)
+2. Checked for reachability over one pooled async HTTP client, concurrently
+
+Verdicts are cached per URL, and connection failures per domain, so repeat
+citations across runs cost nothing. Network failures are only cached for a few
+minutes, so one blip does not flag a whole domain for a day. Only flagged URLs
+go back to the model.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+import httpx
+
+from src.tools import BLOG_DOMAINS, domain_of
+
+# Words that mark roundup articles rather than product pages. They must be a
+# whole subdomain label or a whole word of a path segment ("/blog/", "a-vs-b");
+# generic words like "guide" or "best" also name official docs ("/guides/",
+# "/best-practices") and are left out.
+LISTICLE_MARKERS = ("blog", "blogs", "comparison", "vs", "versus", "alternatives")
+
+# "top-10-...": a ranking, only when followed by a number
+RANKING_PATTERN = re.compile(r"^top-\d+(?:-|$)")
+
+# Status codes that prove the page is gone. Bot walls (401/403/429) still mean the site exists.
+BROKEN_STATUSES = {404, 410}
+
+URL_PATTERN = re.compile(r"https?://[^\s<>()\[\]\"'`]+")
+
+USER_AGENT = "Mozilla/5.0 (compatible; agent-two-link-check/0.1)"
+
+
+def extract_urls(text: str) -> list[str]:
+    """Return the distinct URLs in a report, in order of first appearance."""
+    urls = []
+    for match in URL_PATTERN.findall(text):
+        url = match.rstrip(".,;:!?*_")
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+
+def classify(url: str) -> str | None:
+    """Offline classification. Returns a flag reason, or None if the URL looks official."""
+    domain = domain_of(url)
+    if not domain:
+        return "malformed URL"
+    for blocked in BLOG_DOMAINS:
+        if domain == blocked or domain.endswith("." + blocked):
+            return f"blog/aggregator domain ({blocked})"
+
+    subdomains = domain.split(".")[:-2]
+    segments = [segment for segment in urlparse(url).path.lower().split("/") if segment]
+    words = {word for segment in segments for word in re.split(r"[-_.]", segment)}
+    for marker in LISTICLE_MARKERS:
+        if marker in subdomains or marker in words:
+            return f"looks like an article, not a product page ('{marker}')"
+    if any(RANKING_PATTERN.match(segment) for segment in segments):
+        return "looks like an article, not a product page ('top')"
+    return None
+
+
+class URLValidator:
+    """Concurrent, cached URL checker.
+
+    Thread-safe: the caches are shared across runs in the same process,
+    each call to validate() gets its own event loop and client pool.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 5.0,
+        max_connections: int = 20,
+        cache_ttl: float = 24 * 3600,
+        negative_ttl: float = 300,
+    ):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.cache_ttl = cache_ttl
+        self.negative_ttl = negative_ttl
+        self._url_cache: dict[str, tuple[float, float, dict]] = {}
+        self._domain_cache: dict[str, tuple[float, float, dict]] = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, cache: dict, key: str) -> dict | None:
+        with self._lock:
+            entry = cache.get(key)
+        if entry and time.time() - entry[0] < entry[1]:
+            return entry[2]
+        return None
+
+    def _store(self, cache: dict, key: str, verdict: dict, transient: bool = False) -> None:
+        """Cache a verdict; transient (network) failures expire after negative_ttl."""
+        with self._lock:
+            cache[key] = (time.time(), self.negative_ttl if transient else self.cache_ttl, verdict)
+
+    async def _check(self, client: httpx.AsyncClient, url: str) -> dict:
+        reason = classify(url)
+        if reason:
+            return {"url": url, "ok": False, "reason": reason}
+
+        cached = self._cached(self._url_cache, url) or self._cached(self._domain_cache, domain_of(url))
+        if cached:
+            return {**cached, "url": url}
+
+        try:
+            response = await client.head(url)
+            if response.status_code in (405, 501):
+                # Some servers refuse HEAD; a streamed GET only reads the headers
+                async with client.stream("GET", url) as response:
+                    pass
+        except (httpx.InvalidURL, ValueError) as e:
+            # Not an HTTPError: bad ports, hosts or characters fail while building the request
+            verdict = {"url": url, "ok": False, "reason": f"malformed URL ({type(e).__name__})"}
+            self._store(self._url_cache, url, verdict)
+            return verdict
+        except httpx.HTTPError as e:
+            verdict = {"url": url, "ok": False, "reason": f"unreachable ({type(e).__name__})"}
+            if isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)):
+                self._store(self._domain_cache, domain_of(url), verdict, transient=True)
+            self._store(self._url_cache, url, verdict, transient=True)
+            return verdict
+
+        if response.status_code in BROKEN_STATUSES:
+            verdict = {"url": url, "ok": False, "reason": f"broken link (HTTP {response.status_code})"}
+        else:
+            verdict = {"url": url, "ok": True, "reason": None}
+        self._store(self._url_cache, url, verdict)
+        return verdict
+
+    async def check_all(self, urls: list[str]) -> list[dict]:
+        """Check every URL concurrently over one pooled client."""
+        limits = httpx.Limits(max_connections=self.max_connections)
+        async with httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=limits,
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+        ) as client:
+            return await asyncio.gather(*(self._check(client, url) for url in urls))
+
+    def validate(self, text: str) -> list[dict]:
+        """Check every URL in a report. Returns one verdict dict per distinct URL."""
+        urls = extract_urls(text)
+        if not urls:
+            return []
+        return asyncio.run(self.check_all(urls))
+
+
+def parse_replacements(text: str) -> dict[str, str | None]:
+    """Parse citation fixer output lines: '- {old_url} -> {new_url}' or '-> REMOVE'."""
+    replacements: dict[str, str | None] = {}
+    for line in text.splitlines():
+        match = re.match(r"\s*[-*]?\s*(https?://\S+)\s*->\s*(\S+)", line)
+        if not match:
+            continue
+        old, new = match.group(1).rstrip(".,;"), match.group(2).rstrip(".,;")
+        replacements[old] = None if new.upper() == "REMOVE" else new
+    return replacements
+
+
+def apply_replacements(report: str, replacements: dict[str, str | None]) -> str:
+    """Swap flagged URLs for their official replacements, or mark them unverified.
+
+    Idempotent: a URL already marked "(unverified)" is left alone.
+    """
+    for old, new in replacements.items():
+        # Lookaheads stop "https://a.com" from also rewriting "https://a.com/docs"
+        # (trailing punctuation, as stripped by extract_urls, still ends the URL),
+        # and skip occurrences that were already marked
+        pattern = (
+            re.escape(old)
+            + r"(?![^\s<>()\[\]\"'`.,;:!?*_]|[.,;:!?*_]+[^\s<>()\[\]\"'`.,;:!?*_])(?! \(unverified\))"
+        )
+        replacement = new if new else f"{old} (unverified)"
+        report = re.sub(pattern, lambda _, replacement=replacement: replacement, report)
+    return report
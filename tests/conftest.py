@@ -0,0 +1,19 @@
+"""Test setup for Agent Two - Netanel Systems.
+
+src.config refuses to import without API keys, and importing src.tools opens
+the knowledge base. Point both at throwaway values before any test imports them.
+"""
+
+import os
+import tempfile
+
+_scratch = tempfile.mkdtemp(prefix="agent-two-tests-")
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("TAVILY_API_KEY", "test")
+os.environ["KNOWLEDGE_BASE_PATH"] = os.path.join(_scratch, "knowledge.db")
+os.environ["SPEC_ARCHIVE_PATH"] = os.path.join(_scratch, "specs.db")
+os.environ["CHECKPOINT_PATH"] = os.path.join(_scratch, "checkpoints.db")
+os.environ["JOBS_PATH"] = os.path.join(_scratch, "jobs.db")
+os.environ["PERF_HISTORY_PATH"] = os.path.join(_scratch, "perf_history.db")
+os.environ["OUTPUT_DIR"] = os.path.join(_scratch, "output")
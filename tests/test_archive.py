@@ -0,0 +1,132 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.archive import SpecArchive, fts_query, parse_verdict, write_spec_file
+
+SPEC = """# Specification: Build a support bot with memory
+
+## 1. Research Findings
+
+Zendesk and Intercom bots. The agent's memory is long-term, kept per customer.
+
+---
+
+## 2. Agent Design
+
+### Agent: Responder
+Answers tickets. Mentions APPROVED in passing.
+
+---
+
+## 5. Verification Review
+
+### Gaps Found
+- None
+
+### Verdict
+**NEEDS REVISION**
+"""
+
+
+def test_write_spec_file_adds_suffixes_on_collision(tmp_path):
+    first = write_spec_file(str(tmp_path), "idea", "one")
+    second = write_spec_file(str(tmp_path), "idea", "two")
+    third = write_spec_file(str(tmp_path), "idea", ["th", "ree"])
+    assert [os.path.basename(p) for p in (first, second, third)] == ["idea.md", "idea-2.md", "idea-3.md"]
+    assert [open(p).read() for p in (first, second, third)] == ["one", "two", "three"]
+
+
+def test_write_spec_file_concurrent_writers_never_share_a_name(tmp_path):
+    with ThreadPoolExecutor(8) as pool:
+        paths = list(pool.map(lambda i: write_spec_file(str(tmp_path), "idea", f"spec {i}"), range(16)))
+    assert len(set(paths)) == 16
+    assert sorted(open(p).read() for p in paths) == sorted(f"spec {i}" for i in range(16))
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".tmp-")]
+
+
+def test_write_spec_file_cleans_up_after_a_failed_write(tmp_path):
+    def pieces():
+        yield "partial"
+        raise RuntimeError("stream died")
+
+    with pytest.raises(RuntimeError, match="stream died"):
+        write_spec_file(str(tmp_path), "idea", pieces())
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return SpecArchive(str(tmp_path / "specs.db"))
+
+
+def test_save_and_get_round_trip(archive, tmp_path):
+    record = archive.save(
+        str(tmp_path / "out"),
+        "2026-01-01-support-bot",
+        "Build a support bot with memory",
+        SPEC,
+        metadata={"models": {"lead": "gpt-4o-mini"}, "cost_usd": 0.012, "verdict": "NEEDS REVISION"},
+    )
+    assert open(record["path"]).read() == SPEC
+    spec = archive.get(record["id"])
+    assert spec["idea"] == "Build a support bot with memory"
+    assert spec["models"] == {"lead": "gpt-4o-mini"}
+    assert spec["cost_usd"] == 0.012
+    assert [s["title"] for s in spec["sections"]] == ["Research Findings", "Agent Design", "Verification Review"]
+    assert archive.get(record["id"] + 1) is None
+    assert [r["id"] for r in archive.recent()] == [record["id"]]
+
+
+def test_save_needs_sections_for_streamed_text(archive, tmp_path):
+    with pytest.raises(ValueError):
+        archive.save(str(tmp_path), "stem", "idea", iter(["# x"]))
+
+
+@pytest.mark.parametrize(
+    "query, hits",
+    [
+        ("long-term memory", 1),
+        ("agent's memory", 1),
+        ('Intercom "bots', 1),
+        ("zendesk AND OR NOT", 0),
+        ("memory salesforce", 0),
+        ("c++ (", 0),
+        ("   ", 0),
+    ],
+)
+def test_search_treats_queries_as_plain_words(archive, tmp_path, query, hits):
+    archive.save(str(tmp_path), "stem", "Build a support bot with memory", SPEC)
+    assert len(archive.search(query)) == hits
+
+
+def test_search_returns_the_matching_section(archive, tmp_path):
+    archive.save(str(tmp_path), "stem", "Build a support bot with memory", SPEC)
+    (hit,) = archive.search("Responder")
+    assert hit["section"] == "Agent Design"
+    assert "[Responder]" in hit["snippet"]
+
+
+def test_fts_query_quotes_every_word():
+    assert fts_query('long-term "memory" OR c++') == '"long-term" """memory""" "OR" "c++"'
+    assert fts_query("-- ()") == ""
+
+
+def test_index_file_reads_the_verdict_from_the_verification_section(archive, tmp_path):
+    path = tmp_path / "2026-01-01-support-bot.md"
+    path.write_text(SPEC)
+    spec_id = archive.index_file(str(path))
+    spec = archive.get(spec_id)
+    assert spec["idea"] == "Build a support bot with memory"
+    assert spec["verdict"] == "NEEDS REVISION"
+    assert archive.index_file(str(path)) is None
+
+    approved = tmp_path / "approved.md"
+    approved.write_text(SPEC.replace("**NEEDS REVISION**", "**APPROVED**").replace("APPROVED in passing", "NEEDS REVISION in passing"))
+    assert archive.get(archive.index_file(str(approved)))["verdict"] == "APPROVED"
+
+
+def test_parse_verdict_reads_only_the_verdict():
+    assert parse_verdict("NEEDS REVISION was considered.\n### Verdict\n**APPROVED**") == "APPROVED"
+    assert parse_verdict("### Verdict\nunclear") is None
@@ -0,0 +1,44 @@
+import math
+
+import pytest
+
+from src.batch import cluster, cosine, idea_terms, split_usage, vectorize
+
+IDEAS = [
+    "Build a code review agent for pull requests",
+    "Code reviewer bot that reviews PRs",
+    "Customer support agent with memory",
+    "Support chatbot that remembers customers",
+    "Build a recipe planner",
+]
+
+
+def test_idea_terms_drop_generic_words_and_stem():
+    assert idea_terms("Build an AI agent that reviews code") == ["review", "code"]
+    assert idea_terms("Code reviewer") == idea_terms("code reviews")
+
+
+def test_vectors_are_unit_length_and_weigh_rare_terms_higher():
+    vectors = vectorize(IDEAS)
+    for vector in vectors:
+        assert math.sqrt(sum(w * w for w in vector.values())) == pytest.approx(1.0)
+    # "code" appears in two ideas, "pull" in one
+    assert vectors[0]["pull"] > vectors[0]["code"]
+    assert cosine(vectors[0], vectors[1]) > cosine(vectors[0], vectors[2])
+    assert cosine(vectors[0], vectors[4]) == 0.0
+
+
+def test_cluster_groups_similar_ideas_in_input_order():
+    assert cluster(IDEAS, threshold=0.3, max_size=8) == [[0, 1], [2, 3], [4]]
+
+
+def test_cluster_respects_threshold_and_max_size():
+    assert cluster(IDEAS, threshold=1.01, max_size=8) == [[0], [1], [2], [3], [4]]
+    same = ["code review agent"] * 5
+    assert cluster(same, threshold=0.3, max_size=2) == [[0, 1], [2, 3], [4]]
+
+
+def test_split_usage_adds_back_up_exactly():
+    shares = split_usage({"input": 1000, "output": 301}, 3)
+    assert shares == [{"input": 334, "output": 101}, {"input": 333, "output": 100}, {"input": 333, "output": 100}]
+    assert sum(share["output"] for share in shares) == 301
@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+
+from src.budget import (
+    DEGRADED_MAX_RESULTS,
+    BudgetTracker,
+    activate,
+    deactivate,
+    search_limits,
+)
+
+
+def tracker(run_tokens: int = 0, stage_tokens: int = 0) -> BudgetTracker:
+    return BudgetTracker(
+        {"tokens": run_tokens},
+        {"researcher": {"tokens": stage_tokens}} if stage_tokens else {},
+        prices={"researcher": (1.0, 2.0)},
+    )
+
+
+@pytest.mark.parametrize(
+    "used, level",
+    [(0, 0), (599, 0), (600, 1), (799, 1), (800, 2), (999, 2), (1000, 3), (5000, 3)],
+)
+def test_levels_follow_the_degrade_thresholds(used, level):
+    budget = tracker(run_tokens=1000)
+    budget.add_usage("researcher", used, 0)
+    assert budget.level("researcher") == level
+
+
+def test_hard_stop_only_past_the_limit():
+    budget = tracker(run_tokens=1000)
+    budget.add_usage("researcher", 1200, 0)
+    assert budget.level() == 3 and not budget.hard_stop()
+    budget.add_usage("researcher", 50, 0)
+    assert budget.hard_stop()
+
+
+def test_stage_limit_applies_only_to_its_stage():
+    budget = tracker(stage_tokens=100)
+    budget.add_usage("researcher", 90, 0)
+    assert budget.level("researcher") == 2
+    assert budget.level("agent_designer") == 0
+    assert budget.level() == 0
+
+
+def test_zero_limit_is_unlimited():
+    budget = tracker()
+    budget.add_usage("researcher", 10**9, 10**9)
+    assert budget.level("researcher") == 0 and not budget.hard_stop("researcher")
+
+
+def test_dollars_are_priced_per_stage():
+    budget = BudgetTracker({"dollars": 1.0}, {}, prices={"researcher": (1.0, 2.0)})
+    budget.add_usage("researcher", 300_000, 150_000)  # $0.30 + $0.30
+    assert budget.level() == 1
+    budget.add_usage("lead", 10**9, 0)  # unpriced stage
+    assert budget.level() == 1
+
+
+def test_events_fire_once_per_threshold():
+    budget = tracker(run_tokens=1000)
+    budget.add_usage("researcher", 850, 0)
+    budget.level()
+    budget.level()
+    assert [(e["scope"], e["metric"], e["level"]) for e in budget.events] == [
+        ("run", "tokens", 1),
+        ("run", "tokens", 2),
+    ]
+    assert budget.summary() == "run tokens (level 2)"
+
+
+def test_search_limits_degrade_with_the_active_budget():
+    assert search_limits("researcher", "advanced", 10) == ("advanced", 10)
+    budget = tracker(run_tokens=1000)
+    token = activate(budget)
+    try:
+        assert search_limits("researcher", "advanced", 10) == ("advanced", 10)
+        budget.add_usage("researcher", 600, 0)
+        assert search_limits("researcher", "advanced", 10) == ("basic", 10)
+        budget.add_usage("researcher", 200, 0)
+        assert search_limits("researcher", "advanced", 10) == ("basic", DEGRADED_MAX_RESULTS)
+        budget.add_usage("researcher", 200, 0)
+        assert search_limits("researcher", "advanced", 10) is None
+    finally:
+        deactivate(token)
+
+
+def test_stage_seconds_count_only_time_inside_the_stage(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    budget = BudgetTracker({}, {"verifier": {"seconds": 100}}, prices={})
+
+    budget.start_stage("verifier")
+    clock[0] += 40
+    budget.end_stage("verifier")
+    budget.start_stage("researcher")
+    clock[0] += 500  # other stages, not the verifier's
+    budget.end_stage("researcher")
+    assert budget.level("verifier") == 0
+
+    budget.start_stage("verifier")
+    clock[0] += 30
+    assert budget.level("verifier") == 1  # 70s of 100s
+    assert not budget.hard_stop("verifier")
+    budget.end_stage("verifier")
+    clock[0] += 1000
+    assert budget.ratio("verifier") == pytest.approx(0.7)
+
+
+def test_levels_are_safe_to_read_while_usage_is_fed():
+    budget = tracker(run_tokens=10**6)
+    stop = threading.Event()
+
+    def feed():
+        for i in range(20_000):
+            budget.add_usage(f"stage{i % 50}", 50, 0)
+        stop.set()
+
+    feeder = threading.Thread(target=feed)
+    feeder.start()
+    while not stop.is_set():
+        budget.level("stage1")
+    feeder.join()
+    assert budget.level() == 3
+    assert [e["level"] for e in budget.events] == [1, 2, 3]
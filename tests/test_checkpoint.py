@@ -0,0 +1,91 @@
+import time
+from contextlib import closing
+from typing import TypedDict
+
+import pytest
+from langgraph.graph import END, START, StateGraph
+
+from src.checkpoint import CheckpointStore
+
+
+class State(TypedDict):
+    steps: list[str]
+
+
+def graph(store: CheckpointStore):
+    """Two root steps and a subgraph step, so the thread has history in several namespaces."""
+    child = StateGraph(State)
+    child.add_node("inner", lambda state: {"steps": state["steps"] + ["inner"]})
+    child.add_edge(START, "inner")
+    child.add_edge("inner", END)
+
+    parent = StateGraph(State)
+    parent.add_node("first", lambda state: {"steps": state["steps"] + ["first"]})
+    parent.add_node("child", child.compile())
+    parent.add_node("last", lambda state: {"steps": state["steps"] + ["last"]})
+    parent.add_edge(START, "first")
+    parent.add_edge("first", "child")
+    parent.add_edge("child", "last")
+    parent.add_edge("last", END)
+    return parent.compile(checkpointer=store.saver)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"), ttl_seconds=3600, stale_seconds=600)
+    yield store
+    store.close()
+
+
+def rows(store: CheckpointStore, thread_id: str) -> list[tuple[str, str]]:
+    with closing(store.conn.execute("SELECT checkpoint_ns, checkpoint_id FROM checkpoints WHERE thread_id = ?", (thread_id,))) as cursor:
+        return cursor.fetchall()
+
+
+def run(store: CheckpointStore, idea: str = "idea") -> tuple[str, dict]:
+    thread_id = store.start_run(idea)
+    config = {"configurable": {"thread_id": thread_id}}
+    app = graph(store)
+    app.invoke({"steps": []}, config)
+    return thread_id, app.get_state(config).values
+
+
+def test_finished_run_is_compacted_to_its_final_root_checkpoint(store):
+    thread_id, final = run(store)
+    assert final == {"steps": ["first", "inner", "last"]}
+    assert {ns.split(":")[0] for ns, _ in rows(store, thread_id)} == {"", "child"}
+    assert len(rows(store, thread_id)) > 3
+    assert store.has_checkpoint(thread_id)
+
+    store.finish_run(thread_id, "done")
+    (kept,) = rows(store, thread_id)
+    assert kept[0] == ""
+    config = {"configurable": {"thread_id": thread_id}}
+    assert graph(store).get_state(config).values == final
+    assert store.get_run(thread_id)["status"] == "done"
+
+
+def test_failed_run_keeps_its_history_for_resume(store):
+    thread_id, _ = run(store)
+    before = rows(store, thread_id)
+    store.finish_run(thread_id, "failed")
+    assert rows(store, thread_id) == before
+
+
+def test_prune_drops_expired_and_stale_threads_only(store, monkeypatch):
+    clock = [time.time()]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    finished, _ = run(store, "finished")
+    store.finish_run(finished, "done")
+    orphaned, _ = run(store, "orphaned")  # its process died: never finished
+
+    clock[0] += 601  # orphaned is now stale; finished is within its TTL
+    fresh, _ = run(store, "fresh")
+    assert store.prune() == 1
+    assert store.get_run(orphaned) is None and rows(store, orphaned) == []
+    assert store.get_run(finished) is not None and store.get_run(fresh) is not None
+
+    clock[0] += 3600
+    store.finish_run(fresh, "done")  # finishing prunes as well
+    assert store.get_run(finished) is None and rows(store, finished) == []
+    assert store.get_run(fresh) is not None
@@ -0,0 +1,140 @@
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src import tools
+from src.extract import PageExtractor, fact_card
+
+TOOL_PAGE = """<!doctype html>
+<html><head>
+<title>CodeRabbit | AI code reviews</title>
+<meta name="description" content="CodeRabbit reviews every pull request line by line with AI.">
+<script>var tracking = "ignore me";</script>
+</head><body>
+<nav><a href="/login">Sign in</a></nav>
+<main>
+<h1>Cut code review time in half</h1>
+<h2>Line-by-line pull request reviews</h2>
+<ul><li>Works with GitHub and GitLab</li><li>Chat with the reviewer</li><li>Privacy policy</li></ul>
+<p>Plans start at $12 per user per month, with a free tier for open source.</p>
+</main>
+<footer>Copyright 2026 CodeRabbit. All rights reserved.</footer>
+</body></html>"""
+
+PAGES = {
+    "/tool": (200, "text/html; charset=utf-8", TOOL_PAGE),
+    "/other": (200, "text/html", "<title>Other Tool</title><p>Other Tool schedules your team's builds for you.</p>"),
+    "/missing": (404, "text/html", "<title>Not found</title>"),
+    "/data.json": (200, "application/json", '{"not": "html"}'),
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    requests: Counter = Counter()
+
+    def do_GET(self):
+        Handler.requests[self.path] += 1
+        status, content_type, body = PAGES.get(self.path, (404, "text/html", ""))
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    Handler.requests = Counter()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_fact_card_condenses_a_page():
+    card = fact_card("https://coderabbit.ai", TOOL_PAGE)
+    assert card == {
+        "name": "CodeRabbit",
+        "url": "https://coderabbit.ai",
+        "purpose": "CodeRabbit reviews every pull request line by line with AI.",
+        "features": [
+            "Line-by-line pull request reviews",
+            "Works with GitHub and GitLab",
+            "Chat with the reviewer",
+        ],
+        "pricing": "Plans start at $12 per user per month, with a free tier for open source.",
+    }
+
+
+def test_fact_card_falls_back_to_body_text():
+    card = fact_card("https://x.dev", PAGES["/other"][2])
+    assert card["name"] == "Other Tool"
+    assert card["purpose"] == "Other Tool schedules your team's builds for you."
+    assert card["pricing"] is None
+
+
+def test_cards_fetch_concurrently_and_keep_order(site):
+    extractor = PageExtractor(timeout=5)
+    urls = [f"{site}/other", f"{site}/missing", f"{site}/tool", f"{site}/data.json"]
+    cards = extractor.cards(urls)
+    assert [card and card["name"] for card in cards] == ["Other Tool", None, "CodeRabbit", None]
+    assert extractor.fetches == 4
+
+
+def test_cards_are_served_from_the_cache(site):
+    extractor = PageExtractor(timeout=5)
+    urls = [f"{site}/tool", f"{site}/other"]
+    first = extractor.cards(urls)
+    assert extractor.cards(urls) == first
+    assert Handler.requests == {"/tool": 1, "/other": 1}
+    assert (extractor.fetches, extractor.hits) == (2, 2)
+
+
+def test_failures_are_cached_only_for_the_negative_ttl(site):
+    extractor = PageExtractor(timeout=5)
+    extractor.cards([f"{site}/missing"])
+    extractor.cards([f"{site}/missing"])
+    assert Handler.requests["/missing"] == 1
+
+    extractor = PageExtractor(timeout=5, negative_ttl=0)
+    extractor.cards([f"{site}/missing"])
+    extractor.cards([f"{site}/missing"])
+    assert Handler.requests["/missing"] == 3
+
+
+def test_unreachable_page_gives_no_card():
+    assert PageExtractor(timeout=1).cards(["http://127.0.0.1:9/unreachable"]) == [None]
+
+
+def test_with_fact_cards_replaces_snippets_of_top_pages(site, monkeypatch):
+    monkeypatch.setattr(tools, "page_extractor", PageExtractor(timeout=5))
+    response = {
+        "query": "coderabbit",
+        "results": [
+            {"title": "CodeRabbit", "url": f"{site}/tool", "content": "long snippet", "score": 0.9},
+            {"title": "Gone", "url": f"{site}/missing", "content": "kept snippet", "score": 0.5},
+            {"title": "Other", "url": f"{site}/other", "content": "past the page limit", "score": 0.4},
+        ],
+    }
+    condensed = tools.with_fact_cards(response, pages=2)
+
+    assert condensed["query"] == "coderabbit"
+    top, gone, other = condensed["results"]
+    assert "content" not in top and top["card"]["name"] == "CodeRabbit"
+    assert top["score"] == 0.9
+    assert gone == response["results"][1]
+    assert other == response["results"][2]
+    assert "/other" not in Handler.requests
+
+
+def test_with_fact_cards_without_urls_returns_the_response():
+    response = {"results": [{"title": "no url"}]}
+    assert tools.with_fact_cards(response) is response
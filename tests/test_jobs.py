@@ -0,0 +1,106 @@
+import multiprocessing
+import time
+from contextlib import closing
+
+from src.jobs import JobQueue
+
+
+def _claim_all(path: str, worker: str, results) -> None:
+    queue = JobQueue(path, lease_seconds=60)
+    while (job := queue.claim(worker)) is not None:
+        results.put((worker, job["id"]))
+
+
+def test_each_job_is_claimed_by_exactly_one_process(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    ids = JobQueue(path).enqueue([f"idea {i}" for i in range(40)])
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_claim_all, args=(path, f"w{i}", results)) for i in range(4)]
+    for worker in workers:
+        worker.start()
+    claims = [results.get(timeout=30) for _ in ids]
+    for worker in workers:
+        worker.join(timeout=30)
+
+    claimed = [job_id for _, job_id in claims]
+    assert sorted(claimed) == sorted(ids)
+    assert JobQueue(path).counts() == {"running": 40}
+
+
+def test_claim_takes_the_oldest_job_and_leases_it(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), lease_seconds=60)
+    first, second = queue.enqueue(["a", "b"])
+    job = queue.claim("w1")
+    assert (job["id"], job["status"], job["attempts"], job["worker"]) == (first, "running", 1, "w1")
+    assert job["lease_expires"] > time.time() + 50
+    assert queue.claim("w2")["id"] == second
+    assert queue.claim("w3") is None
+
+
+def test_expired_lease_is_reclaimed_and_the_old_worker_loses_it(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), lease_seconds=0.2)
+    (job_id,) = queue.enqueue(["a"])
+    queue.claim("w1")
+    assert queue.claim("w2") is None
+    assert queue.heartbeat(job_id, "w1")
+
+    time.sleep(0.3)
+    assert queue.counts() == {"abandoned": 1}
+    job = queue.claim("w2")
+    assert (job["id"], job["worker"], job["attempts"]) == (job_id, "w2", 2)
+    assert not queue.heartbeat(job_id, "w1")
+    assert not queue.complete(job_id, "w1", 1, "spec.md")
+    assert queue.complete(job_id, "w2", 7, "spec.md")
+    assert queue.get(job_id)["status"] == "done"
+    assert queue.get(job_id)["spec_id"] == 7
+
+
+def test_failures_retry_until_max_attempts(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), lease_seconds=60, max_attempts=2)
+    (job_id,) = queue.enqueue(["a"])
+
+    queue.claim("w1")
+    assert queue.fail(job_id, "w1", "boom")
+    assert queue.get(job_id)["status"] == "queued"
+
+    assert queue.claim("w2")["attempts"] == 2
+    assert queue.fail(job_id, "w2", "boom again")
+    job = queue.get(job_id)
+    assert (job["status"], job["error"]) == ("failed", "boom again")
+    assert job["finished_at"] is not None
+    assert queue.claim("w3") is None
+    assert queue.pending() == 0
+
+
+def test_abandoned_job_fails_once_attempts_are_exhausted(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), lease_seconds=0.1, max_attempts=1)
+    (job_id,) = queue.enqueue(["a"])
+    queue.claim("w1")
+    time.sleep(0.2)
+    assert queue.claim("w2") is None
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "lease expired (attempts exhausted)"
+
+
+def test_thread_id_survives_a_failed_attempt(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), lease_seconds=60)
+    (job_id,) = queue.enqueue(["a"])
+    queue.claim("w1")
+    assert queue.set_thread(job_id, "w1", "thread-1")
+    assert not queue.set_thread(job_id, "w2", "thread-2")
+    queue.fail(job_id, "w1", "RateLimitError")
+    assert queue.claim("w2")["thread_id"] == "thread-1"
+
+
+def test_shared_queue_uses_a_rollback_journal(tmp_path):
+    shared = JobQueue(str(tmp_path / "shared.db"), shared=True)
+    local = JobQueue(str(tmp_path / "local.db"))
+    shared.enqueue(["a"])
+    local.enqueue(["a"])
+    with closing(shared._connect()) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    with closing(local._connect()) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from src import tools
+from src.knowledge_base import KnowledgeBase, coverage, query_terms, stem
+
+
+def response(*pages: tuple[str, str, str]) -> dict:
+    return {"results": [{"url": url, "title": title, "content": content} for url, title, content in pages]}
+
+
+PAGES = response(
+    ("https://coderabbit.ai", "CodeRabbit", "AI code reviews for every pull request"),
+    ("https://sonarsource.com", "SonarQube", "Static analysis and code quality for pull requests"),
+    ("https://mailchimp.com", "Mailchimp", "Email marketing campaigns"),
+)
+
+
+def test_query_terms_drop_stopwords_and_duplicates():
+    assert query_terms("The best AI code review tools for code") == ["ai", "code", "review", "tools"]
+
+
+def test_coverage_matches_whole_words_not_substrings():
+    email = {"title": "Email marketing", "url": "https://mailchimp.com", "content": "Campaigns"}
+    assert coverage(["ai"], email) == 0.0
+    assert coverage(["review", "code"], {"title": "Code reviews", "content": ""}) == 1.0
+    assert coverage(["coderabbit", "code"], {"url": "https://coderabbit.ai"}) == 0.5
+    assert coverage([], email) == 0.0
+
+
+def test_stem_strips_short_suffixes_only():
+    assert stem("reviews") == stem("reviewer") == stem("review") == "review"
+    assert stem("bus") == "bus"
+
+
+@pytest.fixture
+def kb(tmp_path):
+    return KnowledgeBase(str(tmp_path / "knowledge.db"))
+
+
+def test_search_ranks_indexed_results(kb):
+    assert kb.add_results(PAGES, source="internet_search", query="code review") == 3
+    urls = [r["url"] for r in kb.search("pull request code review")["results"]]
+    assert urls[:2] == ["https://coderabbit.ai", "https://sonarsource.com"]
+    assert "https://mailchimp.com" not in urls
+    assert kb.search('"c++" OR (')["results"] == []
+
+
+def test_add_results_updates_a_known_url(kb):
+    kb.add_results(PAGES, source="internet_search")
+    kb.add_results(response(("https://coderabbit.ai", "CodeRabbit", "Now with merge queues")), source="search_official_site")
+    assert kb.count() == 3
+    assert [r["content"] for r in kb.search("merge queues")["results"]] == ["Now with merge queues"]
+
+
+def test_results_past_the_ttl_are_not_served(tmp_path, monkeypatch):
+    kb = KnowledgeBase(str(tmp_path / "knowledge.db"), ttl=3600)
+    kb.add_results(PAGES, source="internet_search")
+    assert kb.search("pull request")["results"]
+    later = time.time() + 7200
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert kb.search("pull request")["results"] == []
+    kb.add_results(PAGES, source="internet_search")  # a web search refreshes them
+    assert kb.search("pull request")["results"]
+
+
+@pytest.fixture
+def local(kb, monkeypatch):
+    """local_search over a scratch index; web fallbacks are recorded instead of sent."""
+    web = []
+    monkeypatch.setattr(tools, "knowledge_base", kb)
+    monkeypatch.setattr(tools, "internet_search", lambda query, max_results=5: web.append(query) or {"results": []})
+    return web
+
+
+def test_local_search_answers_from_the_index(kb, local):
+    kb.add_results(PAGES, source="internet_search")
+    result = tools.local_search("code review pull request", max_results=2)
+    assert result["source"] == "local"
+    assert [r["url"] for r in result["results"]] == ["https://coderabbit.ai", "https://sonarsource.com"]
+    assert local == []
+
+
+def test_local_search_falls_back_to_the_web_when_coverage_is_low(kb, local):
+    kb.add_results(PAGES, source="internet_search")
+    result = tools.local_search("ai email assistant", max_results=2)
+    assert result["source"] == "web"
+    assert local == ["ai email assistant"]
@@ -0,0 +1,140 @@
+import multiprocessing
+import random
+
+import httpx
+import openai
+import pytest
+
+from src.extract import fact_card
+from src.loadtest import (
+    DELEGATION_ORDER,
+    FAKE_AGENTS,
+    Profile,
+    canned_report,
+    script,
+    serve,
+)
+from src.preverify import completeness, preverify
+
+SYSTEM = {
+    "lead": "You are the Lead Orchestrator.",
+    "researcher": "You are a Research Agent.",
+}
+
+
+def request(agent: str, messages: list[dict], tools: list[str] = ()) -> dict:
+    return {
+        "messages": [{"role": "system", "content": SYSTEM[agent]}, *messages],
+        "tools": [{"function": {"name": name, "description": " ".join(DELEGATION_ORDER)}} for name in tools],
+    }
+
+
+def test_lead_delegates_to_each_subagent_in_order():
+    messages = [{"role": "user", "content": "Build a bot"}]
+    delegated = []
+    while True:
+        text, calls = script(request("lead", messages, ["task"]))
+        if not calls:
+            break
+        delegated.append(calls[0]["arguments"]["subagent_type"])
+        messages.append({"role": "tool", "content": "report"})
+    assert delegated == DELEGATION_ORDER
+    assert text == "Specification complete."
+
+
+def test_researcher_searches_before_reporting():
+    tools = ["local_search", "search_official_site"]
+    task = [{"role": "user", "content": "Research"}]
+    _, first = script(request("researcher", task, tools))
+    _, second = script(request("researcher", task + [{"role": "tool", "content": "{}"}] * 2, tools))
+    text, third = script(request("researcher", task + [{"role": "tool", "content": "{}"}] * 4, tools))
+    assert [call["name"] for call in first] == ["local_search", "local_search"]
+    assert [call["arguments"]["tool_name"] for call in second] == FAKE_AGENTS[:2]
+    assert third == [] and "### Existing Solutions" in text
+
+
+def test_canned_reports_pass_the_pre_verifier():
+    reports = {stage: canned_report(stage, 300) for stage in DELEGATION_ORDER}
+    assert preverify({stage: text for stage, text in reports.items() if stage != "verifier"}) == []
+    assert all(completeness(stage, text) == 1.0 for stage, text in reports.items())
+    assert len(reports["researcher"].split()) >= 300
+
+
+def test_profile_injects_failures_at_the_configured_rates():
+    random.seed(7)
+    assert Profile(0, 0, 0, 0).delay() == 0.0
+    assert {Profile(0, 0, 0, 0).failure() for _ in range(50)} == {None}
+    assert {Profile(0, 0, 1.0, 0).failure() for _ in range(50)} == {500}
+    assert {Profile(0, 0, 0, 1.0).failure() for _ in range(50)} == {429}
+    mixed = [Profile(0, 0, 0.2, 0.2).failure() for _ in range(2000)]
+    assert 0.15 < mixed.count(429) / len(mixed) < 0.25
+    assert 0.15 < mixed.count(500) / len(mixed) < 0.25
+
+
+def start(settings: dict):
+    ctx = multiprocessing.get_context("spawn")
+    ports = ctx.Queue()
+    process = ctx.Process(target=serve, args=(settings, ports), daemon=True)
+    process.start()
+    return process, ports.get(timeout=30)
+
+
+@pytest.fixture(scope="module")
+def standins():
+    fast = Profile(0.0, 0.0, 0.0, 0.0)
+    process, (openai_port, tavily_port) = start(
+        {"openai": fast, "tavily": fast, "tokens_per_second": 0, "report_tokens": 50}
+    )
+    yield f"http://127.0.0.1:{openai_port}/v1", f"http://127.0.0.1:{tavily_port}"
+    process.terminate()
+    process.join()
+
+
+def test_openai_standin_streams_a_scripted_reply_with_usage(standins):
+    client = openai.OpenAI(base_url=standins[0], api_key="test", max_retries=0)
+    stream = client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[{"role": "system", "content": SYSTEM["researcher"]}, {"role": "user", "content": "Research"}],
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    chunks = list(stream)
+    text = "".join(chunk.choices[0].delta.content or "" for chunk in chunks if chunk.choices)
+    assert text.startswith("### Existing Solutions")
+    assert chunks[-1].usage.completion_tokens == len(text.split())
+
+    reply = client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[{"role": "system", "content": SYSTEM["lead"]}, {"role": "user", "content": "Build a bot"}],
+        tools=[{"type": "function", "function": {"name": "task", "description": "researcher agent_designer"}}],
+    )
+    (call,) = reply.choices[0].message.tool_calls
+    assert call.function.name == "task"
+
+
+def test_tavily_standin_points_official_searches_at_pages_it_serves(standins):
+    tavily = standins[1]
+    response = httpx.post(f"{tavily}/search", json={"query": "Intake official site", "max_results": 2}).json()
+    urls = [result["url"] for result in response["results"]]
+    assert urls == [f"{tavily}/site/intake-0", f"{tavily}/site/intake-1"]
+    page = httpx.get(urls[0])
+    card = fact_card(urls[0], page.text)
+    assert card["name"] == "Intake 0"
+    assert "$19 per user per month" in card["pricing"]
+
+    broad = httpx.post(f"{tavily}/search", json={"query": "agent frameworks"}).json()
+    assert len(broad["results"]) == 5 and all(".example.com" in r["url"] for r in broad["results"])
+
+
+def test_standins_inject_failures():
+    broken = Profile(0.0, 0.0, 1.0, 0.0)
+    process, (openai_port, tavily_port) = start(
+        {"openai": broken, "tavily": Profile(0.0, 0.0, 0.0, 1.0), "tokens_per_second": 0, "report_tokens": 50}
+    )
+    try:
+        assert httpx.post(f"http://127.0.0.1:{openai_port}/v1/chat/completions", json={}).status_code == 500
+        limited = httpx.post(f"http://127.0.0.1:{tavily_port}/search", json={"query": "x"})
+        assert (limited.status_code, limited.headers["Retry-After"]) == (429, "1")
+    finally:
+        process.terminate()
+        process.join()
@@ -0,0 +1,118 @@
+import json
+import time
+
+import pytest
+
+from src import perf_history
+from src.perf_history import (
+    PerfHistory,
+    RSSSampler,
+    compare,
+    group_ref,
+    mann_whitney_greater,
+    models_ref,
+)
+
+
+def test_mann_whitney_separated_samples():
+    # Matches scipy.stats.mannwhitneyu(..., alternative="greater", method="asymptotic")
+    assert mann_whitney_greater([1, 2, 3, 4, 5], [6, 7, 8, 9, 10]) == pytest.approx(0.006093, abs=1e-6)
+    assert mann_whitney_greater([6, 7, 8, 9, 10], [1, 2, 3, 4, 5]) > 0.99
+
+
+def test_mann_whitney_identical_samples_are_not_significant():
+    assert mann_whitney_greater([3, 3, 3, 3, 3], [3, 3, 3, 3, 3]) == 1.0
+    assert mann_whitney_greater([1, 2, 3, 4, 5], [1, 2, 3, 4, 5]) > 0.5
+
+
+def test_mann_whitney_handles_ties():
+    p = mann_whitney_greater([1, 1, 2, 2, 3], [2, 3, 3, 4, 4])
+    assert 0.01 < p < 0.1
+
+
+def runs(values: list[float], rss: list[float | None] | None = None) -> list[dict]:
+    rss = rss or [100.0] * len(values)
+    return [
+        {"tokens": v, "cost_usd": v / 1000, "duration_s": 10.0, "peak_rss_mb": r}
+        for v, r in zip(values, rss)
+    ]
+
+
+def test_compare_needs_significance_and_effect_size():
+    baseline = runs([1000, 1010, 990, 1005, 995])
+    verdicts = {v["metric"]: v for v in compare(baseline, runs([1200, 1210, 1190, 1205, 1195]))}
+    assert verdicts["tokens"]["regression"]
+    assert verdicts["tokens"]["change"] == pytest.approx(0.2)
+    assert not verdicts["duration_s"]["regression"]
+
+    # Significant, but under the 5% minimum effect
+    verdicts = {v["metric"]: v for v in compare(baseline, runs([1020, 1030, 1025, 1021, 1022]))}
+    assert verdicts["tokens"]["p"] < 0.05
+    assert not verdicts["tokens"]["regression"]
+
+
+def test_compare_skips_metrics_without_enough_samples():
+    baseline = runs([1, 2, 3, 4, 5], rss=[100.0, None, None, 100.0, 100.0])
+    metrics = [v["metric"] for v in compare(baseline, runs([1, 2, 3, 4, 5]))]
+    assert metrics == ["tokens", "cost_usd", "duration_s"]
+
+
+MINI = {"lead": "gpt-4o-mini"}
+FULL = {"lead": "gpt-4o"}
+
+
+def record(history, monkeypatch, commit="abc123", dirty=False, prompt="p1", models=MINI, count=3):
+    monkeypatch.setattr(perf_history, "git_state", lambda: (commit, dirty))
+    for tokens in range(count):
+        history.record("live", prompt, models, tokens, 0, 0.01, 1.0, peak_rss_mb=50.0)
+
+
+def test_groups_are_keyed_on_commit_dirty_flag_prompt_and_models(tmp_path, monkeypatch):
+    history = PerfHistory(str(tmp_path / "history.db"))
+    for commit, dirty, prompt, models in [
+        ("abc123", False, "p1", MINI),
+        ("abc123", True, "p1", MINI),
+        ("abc123", False, "p2", MINI),
+        ("abc123", False, "p2", FULL),
+    ]:
+        record(history, monkeypatch, commit, dirty, prompt, models)
+    history.record("live", "p1", {}, 0, 0, 0.0, 1.0, ok=False)
+
+    mini, full = models_ref(json.dumps(MINI)), models_ref(json.dumps(FULL))
+    assert sorted(group_ref(g) for g in history.groups()) == sorted(
+        [f"abc123*/p1@{mini}", f"abc123/p1@{mini}", f"abc123/p2@{mini}", f"abc123/p2@{full}"]
+    )
+    assert [run["tokens"] for run in history.runs(history.resolve("abc*"))] == [0, 1, 2]
+    assert history.resolve(f"abc/p2@{full}")["models"] == json.dumps(FULL)
+    with pytest.raises(ValueError, match=f"abc123/p2@{full}, abc123/p2@{mini}"):
+        history.resolve("abc/p2")
+    with pytest.raises(ValueError, match="none"):
+        history.resolve("def")
+
+
+def test_select_rejects_comparing_a_group_with_itself(tmp_path, monkeypatch):
+    history = PerfHistory(str(tmp_path / "history.db"))
+    with pytest.raises(ValueError, match="none"):
+        history.select("abc", None)
+    record(history, monkeypatch, commit="abc123")
+    with pytest.raises(ValueError, match="pass --candidate"):
+        history.select("abc", None)
+    with pytest.raises(ValueError, match="same group"):
+        history.select("abc", "abc123")
+
+    record(history, monkeypatch, commit="def456", models=FULL)
+    baseline, candidate = history.select("abc", None)
+    assert (baseline["git_commit"], candidate["git_commit"]) == ("abc123", "def456")
+
+
+def test_rss_sampler_sees_memory_allocated_during_the_block():
+    with RSSSampler(interval=0.01) as before:
+        pass
+    if before.peak is None:
+        pytest.skip("/proc/self/statm is not available")
+    with RSSSampler(interval=0.01) as rss:
+        block = bytearray(64 * 1024 * 1024)
+        block[::4096] = b"x" * len(block[::4096])
+        time.sleep(0.05)
+        del block
+    assert rss.peak >= before.peak + 50
@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+from src import prefetch, tools
+from src.knowledge_base import KnowledgeBase
+from src.prefetch import PREFETCH_TEMPLATES, candidate_queries, start_prefetch, topic_of
+
+
+@pytest.mark.parametrize(
+    "idea, topic",
+    [
+        ("Build a code review agent that reviews PRs", "code review agent reviews prs"),
+        ("Create an AI customer support bot which can remember the customer", "ai customer support bot remember"),
+        ("design the best onboarding assistant for new hires", "onboarding assistant new hires"),
+    ],
+)
+def test_topic_of_keeps_only_the_search_terms(idea, topic):
+    assert topic_of(idea) == topic
+
+
+def test_candidate_queries_fill_every_template():
+    queries = candidate_queries("Build a code review agent")
+    assert queries == [template.format(topic="code review agent") for template in PREFETCH_TEMPLATES]
+    assert candidate_queries("Build the") == []
+
+
+class FakeTavily:
+    """Slow canned Tavily: one result per query, a failure for queries containing "frameworks"."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.queries: list[str] = []
+        self._lock = threading.Lock()
+
+    def search(self, query: str, **params) -> dict:
+        with self._lock:
+            self.queries.append(query)
+        time.sleep(self.delay)
+        if "frameworks" in query:
+            raise RuntimeError("502")
+        return {"results": [{"url": f"https://example.com/{len(query)}", "title": query, "content": query, "score": 0.9}]}
+
+
+@pytest.fixture
+def tavily(tmp_path, monkeypatch):
+    fake = FakeTavily(delay=0.3)
+    monkeypatch.setattr(tools, "tavily_client", fake)
+    monkeypatch.setattr(tools, "knowledge_base", KnowledgeBase(str(tmp_path / "knowledge.db")))
+    return fake
+
+
+def test_prefetch_indexes_results_and_counts_failures(tavily):
+    summary = start_prefetch("Build a code review agent").result(timeout=5)
+    assert (summary["queries"], summary["results"], summary["errors"]) == (3, 2, 1)
+    assert sorted(tavily.queries) == sorted(tools.normalize_query(q) for q in candidate_queries("Build a code review agent"))
+    assert tools.knowledge_base.count() == 2
+
+
+def test_local_search_waits_for_the_prefetch(tavily, monkeypatch):
+    web = []
+    monkeypatch.setattr(tools, "internet_search", lambda query, max_results=5: web.append(query) or {"results": []})
+    monkeypatch.setattr(tools, "LOCAL_SEARCH_MIN_RESULTS", 1)
+
+    token = tools.expect_prefetch(start_prefetch("Build a code review agent"))
+    try:
+        # Issued before the prefetch lands: local_search holds on until it has
+        result = tools.local_search("code review agent existing tools and products", max_results=3)
+    finally:
+        tools.clear_prefetch(token)
+    assert result["source"] == "local"
+    assert web == []
+
+
+def test_prefetch_never_raises(monkeypatch):
+    async def broken(*args, **kwargs):
+        raise RuntimeError("no network")
+
+    monkeypatch.setattr(prefetch, "search_async", broken)
+    assert start_prefetch("Build a code review agent").result(timeout=5)["errors"] == 3
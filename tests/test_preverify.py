@@ -0,0 +1,145 @@
+from src.preverify import (
+    completeness,
+    is_blocking,
+    preverify,
+    render_review,
+    subsection,
+)
+
+RESEARCH = """### Existing Solutions
+- CodeRabbit (https://coderabbit.ai)
+### Relevant Frameworks
+- LangGraph
+### Architecture Patterns
+- Supervisor
+### Gaps and Opportunities
+- Cheap reviews
+"""
+
+DESIGN = """### Agent: Reviewer
+- **Role**: Reviews diffs
+- **Tools**: git
+- **System prompt draft**: You review code.
+- **Model**: gpt-4o-mini
+- **Input**: A diff
+- **Output**: Comments
+
+### Agent: Summarizer
+- **Role**: Summarizes
+- **Tools**: none
+- **System prompt draft**: You summarize.
+- **Model**: gpt-4o-mini
+- **Input**: Comments
+- **Output**: A summary
+"""
+
+WORKFLOW = """### Execution Order
+1. Reviewer, then Summarizer
+### Data Flow
+- **User** → **Reviewer**
+- **Reviewer** → **Summarizer**
+### Retry Logic
+- Reviewer: retry twice. Summarizer: skip on failure.
+### Human-in-the-Loop
+- None
+### Termination Conditions
+- Summary written
+"""
+
+INFRA = """### Agent Inventory
+- Reviewer, Summarizer
+### Memory Strategy
+- None
+### Evaluation Criteria
+- Precision
+### Tracing and Observability
+- LangSmith
+### Deployment Plan
+- Docker
+### Cost Estimate
+- Reviewer: $0.002 per run
+- Summarizer: $0.001 per run
+"""
+
+
+def reports(**overrides) -> dict[str, str]:
+    return {
+        "researcher": RESEARCH,
+        "agent_designer": DESIGN,
+        "workflow_designer": WORKFLOW,
+        "infra_planner": INFRA,
+        **overrides,
+    }
+
+
+def issues(findings: list[dict]) -> list[tuple[str, str]]:
+    return [(f["severity"], f["issue"]) for f in findings]
+
+
+def test_complete_spec_has_no_findings():
+    findings = preverify(reports())
+    assert findings == []
+    assert "**APPROVED**" in render_review(findings)
+
+
+def test_missing_stage_is_critical():
+    findings = preverify(reports(infra_planner=""))
+    assert ("Critical", "Section is missing or empty") in issues(findings)
+    assert is_blocking(findings)
+
+
+def test_missing_heading_is_high():
+    findings = preverify(reports(workflow_designer=WORKFLOW.replace("### Human-in-the-Loop", "### Humans")))
+    assert issues(findings) == [("High", 'Missing required section "### Human-in-the-Loop"')]
+
+
+def test_agent_without_model_is_high():
+    findings = preverify(reports(agent_designer=DESIGN.replace("- **Model**: gpt-4o-mini\n", "", 1)))
+    assert [(f["location"], f["issue"]) for f in findings] == [("agent_designer — Reviewer", 'No "Model" given')]
+    assert is_blocking(findings)
+
+
+def test_retry_logic_must_cover_every_agent():
+    workflow = WORKFLOW.replace(" Summarizer: skip on failure.", "")
+    assert ("High", "No failure behavior for Summarizer") in issues(preverify(reports(workflow_designer=workflow)))
+
+
+def test_data_flow_must_reference_defined_agents():
+    workflow = WORKFLOW.replace("**Reviewer** → **Summarizer**", "**Reviewer** → **Formatter**")
+    assert ("Medium", '"Formatter" is not a defined agent') in issues(preverify(reports(workflow_designer=workflow)))
+
+
+def test_cost_estimate_needs_dollars_and_every_agent():
+    infra = INFRA.replace("- Summarizer: $0.001 per run\n", "").replace("$0.002", "cheap")
+    found = issues(preverify(reports(infra_planner=infra)))
+    assert ("High", "No dollar amounts in the cost estimate") in found
+    assert ("Medium", "Summarizer is not costed") in found
+
+
+def test_placeholders_and_blog_citations_are_flagged_without_blocking():
+    findings = preverify(reports(
+        infra_planner=INFRA + "Latency: TBD\n",
+        researcher=RESEARCH + "- Roundup: https://medium.com/@x/best-review-bots\n",
+    ))
+    assert [f["severity"] for f in findings] == ["Medium", "Low"]
+    assert not is_blocking(findings)
+
+
+def test_completeness_scores_structure():
+    assert completeness("researcher", RESEARCH) == 1.0
+    assert completeness("researcher", RESEARCH.split("### Architecture")[0]) == 0.5
+    assert completeness("agent_designer", DESIGN) == 1.0
+    assert completeness("agent_designer", "no agents here") == 0.0
+
+
+def test_headings_at_any_level_from_two_to_four_count():
+    design = DESIGN.replace("### Agent: Reviewer", "## Agent: Reviewer").replace("### Agent: Summarizer", "#### Agent: Summarizer")
+    workflow = WORKFLOW.replace("### Retry Logic", "## Retry Logic").replace("### Data Flow", "#### Data Flow")
+    assert preverify(reports(agent_designer=design, workflow_designer=workflow)) == []
+
+
+def test_subsection_runs_to_the_next_heading_at_its_level():
+    text = "## Retry Logic\n### Reviewer\nretry twice\n### Summarizer\nskip\n## Human-in-the-Loop\nnone\n"
+    assert subsection(text, "Retry Logic") == "\n### Reviewer\nretry twice\n### Summarizer\nskip\n"
+    assert subsection(text, "Reviewer") == "\nretry twice\n"
+    assert subsection("# Retry Logic\nx", "Retry Logic") is None
@@ -0,0 +1,114 @@
+import io
+import json
+
+from langchain_core.messages import AIMessageChunk, ToolMessage
+
+from src import progress
+from src.agent import TOKEN_BATCH, run_pipeline
+from src.progress import (
+    JSONLSink,
+    ProgressBus,
+    StageFinished,
+    StageStarted,
+    TokenProgress,
+    ToolCalled,
+    TTYSink,
+)
+
+STEPS = {"researcher": (1, "Researcher", "Researching", "Research Findings")}
+
+
+class FakeGraph:
+    """Stands in for the lead graph: streams (namespace, mode, (token, metadata)) like agent.stream."""
+
+    def __init__(self, tokens: list[tuple[str, object]]):
+        self.tokens = tokens
+
+    def stream(self, *args, **kwargs):
+        for agent_name, token in self.tokens:
+            yield (), "messages", (token, {"lc_agent_name": agent_name})
+
+
+def test_pipeline_reports_tokens_in_batches():
+    events = []
+    stream = (
+        [("lead", AIMessageChunk(content="x"))] * 5
+        + [("researcher", AIMessageChunk(content="r"))] * (2 * TOKEN_BATCH + 6)
+        + [("researcher", ToolMessage(content="{}", tool_call_id="1"))] * 10
+        + [("agent_designer", AIMessageChunk(content="d"))] * 3
+    )
+    result = run_pipeline("idea", ProgressBus([events.append]), "thread", agent=FakeGraph(stream))
+
+    progress_events = [(e.stage, e.stage_tokens, e.total_tokens) for e in events if isinstance(e, TokenProgress)]
+    assert progress_events == [
+        ("lead", 5, 5),
+        ("researcher", TOKEN_BATCH, 5 + TOKEN_BATCH),
+        ("researcher", 2 * TOKEN_BATCH, 5 + 2 * TOKEN_BATCH),
+        ("researcher", 2 * TOKEN_BATCH + 6, 11 + 2 * TOKEN_BATCH),
+        ("agent_designer", 3, 14 + 2 * TOKEN_BATCH),
+    ]
+    finished = {e.stage: e.tokens for e in events if isinstance(e, StageFinished)}
+    assert finished == {"lead": 5, "researcher": 2 * TOKEN_BATCH + 6, "agent_designer": 3}
+    assert result["reports"]["researcher"] == "r" * (2 * TOKEN_BATCH + 6)
+
+
+def test_bus_ignores_empty_batches_and_closes_sinks():
+    events, closed = [], []
+
+    class Sink:
+        def __call__(self, event):
+            events.append(event)
+
+        def close(self):
+            closed.append(True)
+
+    bus = ProgressBus([Sink()])
+    bus.tokens("researcher", 0)
+    bus.tokens("researcher", 10)
+    bus.close()
+    assert events == [TokenProgress("researcher", 10, 10)]
+    assert closed == [True]
+
+
+class TTY(io.StringIO):
+    def isatty(self):
+        return True
+
+
+def test_tty_sink_throttles_counter_redraws(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(progress.time, "monotonic", lambda: clock[0])
+    out = TTY()
+    sink = TTYSink(STEPS, 5, stream=out, interval=0.5)
+
+    for tokens in (32, 64, 96):  # within one interval: drawn once
+        sink(TokenProgress("researcher", tokens, tokens))
+        clock[0] += 0.1
+    clock[0] += 0.5
+    sink(TokenProgress("researcher", 128, 128))
+    sink(TokenProgress("lead", 160, 160))  # not a step: never drawn
+    sink(ToolCalled("researcher", "internet_search"))
+    assert out.getvalue() == "\r  ... 32 tokens\r  ... 128 tokens\n    → internet_search\n"
+
+
+def test_tty_sink_skips_counters_when_not_a_terminal():
+    out = io.StringIO()
+    sink = TTYSink(STEPS, 5, stream=out)
+    sink(StageStarted("researcher", 3.0))
+    sink(TokenProgress("researcher", 32, 32))
+    sink(StageFinished("researcher", 61.0, 32))
+    assert out.getvalue() == "\n  [1/5] Researcher  (3s elapsed)\n  Researching...\n  Done (1m 1s, 32 tokens)\n"
+
+
+def test_jsonl_sink_writes_one_line_per_event(tmp_path):
+    path = tmp_path / "progress.jsonl"
+    sink = JSONLSink(str(path), run_id="run-1")
+    sink(StageStarted("researcher", 0.5))
+    sink(TokenProgress("researcher", 32, 40))
+    sink.close()
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(line["run_id"], line["kind"], line["stage"]) for line in lines] == [
+        ("run-1", "stage_started", "researcher"),
+        ("run-1", "token_progress", "researcher"),
+    ]
+    assert lines[1]["total_tokens"] == 40
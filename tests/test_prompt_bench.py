@@ -0,0 +1,27 @@
+from src import tools
+from src.knowledge_base import KnowledgeBase
+from src.prompt_bench import isolated_tools
+
+
+def page(url: str, title: str) -> dict:
+    return {"results": [{"url": url, "title": title, "content": f"{title} reviews pull requests"}]}
+
+
+def test_each_variant_sees_the_same_knowledge_base(tmp_path):
+    live = tools.knowledge_base
+    snapshot = KnowledgeBase(str(tmp_path / "snapshot.db"))
+    snapshot.add_results(page("https://coderabbit.ai", "CodeRabbit"), source="internet_search")
+    before = live.count()
+
+    seen = []
+    for _ in ("full", "slim"):
+        with isolated_tools(snapshot):
+            assert tools.knowledge_base is not live
+            seen.append([r["url"] for r in tools.knowledge_base.search("pull requests")["results"]])
+            # What this variant's searches index stays with this variant
+            tools.knowledge_base.add_results(page("https://sonarsource.com", "SonarQube"), source="internet_search")
+
+    assert seen == [["https://coderabbit.ai"], ["https://coderabbit.ai"]]
+    assert tools.knowledge_base is live
+    assert live.count() == before
+    assert snapshot.count() == 1
@@ -0,0 +1,35 @@
+from src.report_buffer import TRUNCATION_MARKER, ReportBuffer
+
+
+def test_under_the_cap_keeps_everything():
+    buffer = ReportBuffer("researcher", cap=100)
+    for token in ("Hello", ", ", "world"):
+        buffer.append(token)
+    assert buffer.getvalue() == "Hello, world"
+    assert len(buffer) == 12
+    assert not buffer.truncated
+
+
+def test_cap_truncates_once_and_counts_the_rest():
+    buffer = ReportBuffer("researcher", cap=10)
+    for token in ("12345", "67890", "abc", "defg"):
+        buffer.append(token)
+    assert buffer.getvalue() == "1234567890" + TRUNCATION_MARKER.format(stage="researcher", cap=10)
+    assert buffer.truncated
+    assert buffer.dropped == 7
+    assert len(buffer) == 10
+
+
+def test_cap_splits_the_token_that_crosses_it():
+    buffer = ReportBuffer("verifier", cap=4)
+    buffer.append("abcdef")
+    assert buffer.getvalue().startswith("abcd\n\n[... verifier report truncated at 4 characters")
+    assert buffer.dropped == 2
+
+
+def test_zero_cap_is_unlimited():
+    buffer = ReportBuffer("researcher", cap=0)
+    for _ in range(1000):
+        buffer.append("x" * 100)
+    assert len(buffer.getvalue()) == 100_000
+    assert not buffer.truncated
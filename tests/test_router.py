@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+from src.router import MIN_HEDGE_SAMPLES, LatencyStats, RoutedChatModel
+
+
+class FakeModel:
+    """Stands in for a chat model: streams canned chunks after a delay and records when it is closed."""
+
+    def __init__(self, name: str, chunks=("hello",), delay: float = 0.0, error: Exception | None = None):
+        self.model_name = name
+        self.chunks = chunks
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.yielded = 0
+        self.closed = threading.Event()
+
+    def stream(self, messages, **kwargs):
+        self.calls += 1
+        return self._chunks()
+
+    def _chunks(self):
+        try:
+            time.sleep(self.delay)
+            if self.error:
+                raise self.error
+            for text in self.chunks:
+                self.yielded += 1
+                yield AIMessageChunk(content=text)
+                time.sleep(self.delay)
+        finally:
+            self.closed.set()
+
+
+def routed(*candidates, stats=None, **kwargs) -> RoutedChatModel:
+    return RoutedChatModel(candidates=list(candidates), stats=stats or LatencyStats(), **kwargs)
+
+
+def test_fallback_with_the_same_model_keeps_its_own_stats():
+    primary = FakeModel("gpt-4o-mini", error=RuntimeError("500"))
+    fallback = FakeModel("gpt-4o-mini", chunks=("ok",))
+    model = routed(primary, fallback, hedge_quantile=0)
+
+    assert model.invoke("hi").content == "ok"
+    assert model.stats.counts["0:gpt-4o-mini"]["failures"] == 1
+    assert model.stats.counts["1:gpt-4o-mini"]["wins"] == 1
+
+    # The failed primary is cooling down, so the fallback goes first
+    assert model.invoke("hi").content == "ok"
+    assert (primary.calls, fallback.calls) == (1, 2)
+
+
+def test_silent_attempt_times_out_and_its_stream_is_closed():
+    slow = FakeModel("slow", chunks=("a", "b", "c"), delay=0.3)
+    fast = FakeModel("fast", chunks=("ok",))
+    model = routed(slow, fast, ttft_deadline=0.1, hedge_quantile=0)
+
+    assert model.invoke("hi").content == "ok"
+    assert model.stats.counts["0:slow"]["timeouts"] == 1
+    assert slow.closed.wait(2)
+    assert slow.yielded == 1
+
+
+def test_hedge_races_the_next_model_and_closes_the_loser():
+    stats = LatencyStats()
+    for _ in range(MIN_HEDGE_SAMPLES):
+        stats.record_ttft("0:slow", 0.05)
+    slow = FakeModel("slow", chunks=("a", "b"), delay=0.4)
+    fast = FakeModel("fast", chunks=("ok",))
+    model = routed(slow, fast, stats=stats, ttft_deadline=5, hedge_quantile=0.95)
+
+    assert model.invoke("hi").content == "ok"
+    assert stats.counts["0:slow"]["hedges"] == 1
+    assert stats.counts["1:fast"]["wins"] == 1
+    assert slow.closed.wait(2)
+    assert slow.yielded == 1
+
+
+def test_stopping_early_closes_the_winning_stream():
+    model = FakeModel("m", chunks=[str(i) for i in range(100)], delay=0.01)
+    stream = routed(model, hedge_quantile=0).stream("hi")
+    assert next(stream).content == "0"
+    stream.close()
+    assert model.closed.wait(2)
+    assert model.yielded < 100
+
+
+def test_all_failures_raise_the_last_error():
+    model = routed(FakeModel("a", error=RuntimeError("a down")), FakeModel("b", error=RuntimeError("b down")))
+    with pytest.raises(RuntimeError, match="b down"):
+        model.invoke("hi")
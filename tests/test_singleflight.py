@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_upstream_call():
+    flight = SingleFlight()
+    upstream = []
+    release = threading.Event()
+
+    def call():
+        upstream.append(1)
+        release.wait(5)
+        return {"results": [1]}
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(flight.do, "key", call) for _ in range(8)]
+        while flight.calls < 8:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(upstream) == 1
+    assert all(result is results[0] for result in results)
+    assert (flight.calls, flight.shared) == (8, 7)
+
+
+def test_followers_get_the_leaders_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def call():
+        release.wait(5)
+        raise RuntimeError("upstream down")
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(flight.do, "key", call) for _ in range(4)]
+        while flight.calls < 4:
+            time.sleep(0.01)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError, match="upstream down"):
+                future.result()
+    assert flight.shared == 3
+
+
+def test_nothing_is_cached_after_the_call():
+    flight = SingleFlight()
+    counter = iter(range(10))
+    assert flight.do("key", lambda: next(counter)) == 0
+    assert flight.do("key", lambda: next(counter)) == 1
+    assert flight.shared == 0
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+    assert [flight.do(key, lambda key=key: key) for key in ("a", "b")] == ["a", "b"]
+    assert flight.shared == 0
+
+
+def test_async_callers_coalesce():
+    flight = SingleFlight()
+    upstream = []
+
+    def call():
+        upstream.append(1)
+        time.sleep(0.2)
+        return "done"
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("key", call) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["done"] * 5
+    assert len(upstream) == 1
+    assert flight.shared == 4
@@ -0,0 +1,133 @@
+import contextvars
+
+import pytest
+
+from src import tools
+from src.budget import TOOL_CUTOFF, BudgetTracker, activate, deactivate
+from src.tools import BASIC_MAX_RESULTS, normalize_query, result_confidence, search_key
+
+
+def test_normalize_query_folds_case_and_whitespace():
+    assert normalize_query("  AI   Code\tReview  Tools\n") == "ai code review tools"
+
+
+def test_search_key_ignores_case_spacing_and_parameter_order():
+    a = search_key("AI code review", {"max_results": 5, "topic": "general", "exclude_domains": ["Medium.com", "dev.to"]})
+    b = search_key("ai  code review ", {"exclude_domains": ["dev.to", "medium.com"], "topic": "general", "max_results": 5})
+    assert a == b
+    assert hash(a) == hash(b)
+
+
+def test_search_key_separates_different_parameters():
+    base = search_key("ai code review", {"max_results": 5})
+    assert base != search_key("ai code review", {"max_results": 10})
+    assert base != search_key("ai code review", {"max_results": 5, "search_depth": "advanced"})
+    assert base != search_key("ai code reviews", {"max_results": 5})
+
+
+def results(*scored: tuple[str, float]) -> dict:
+    return {"results": [{"url": url, "score": score} for url, score in scored]}
+
+
+def test_result_confidence_averages_top_non_blog_scores():
+    response = results(("https://a.com", 0.9), ("https://medium.com/x", 1.0), ("https://b.com", 0.7), ("https://c.com", 0.5))
+    assert result_confidence(response) == pytest.approx(0.7)
+
+
+def test_result_confidence_discounts_too_few_results():
+    assert result_confidence(results(("https://a.com", 0.9)), wanted=3) == pytest.approx(0.3)
+    assert result_confidence(results(("https://dev.to/post", 0.9))) == 0.0
+    assert result_confidence({"results": []}) == 0.0
+
+
+def test_result_confidence_for_a_tool_weighs_the_official_domain():
+    official = results(("https://coderabbit.ai", 0.5))
+    listicle = results(("https://example.com/reviews", 0.9))
+    assert result_confidence(official, "CodeRabbit") == pytest.approx(0.8)
+    assert result_confidence(listicle, "CodeRabbit") == pytest.approx(0.36)
+
+
+class FakeSearch:
+    """Stands in for tools.search: records (depth, max_results) and replays canned responses."""
+
+    def __init__(self):
+        self.calls: list[tuple[str, int]] = []
+        self.responses: list[dict] = []
+
+    def __call__(self, query: str, source: str, **params) -> dict:
+        self.calls.append((params["search_depth"], params["max_results"]))
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def searches(monkeypatch):
+    fake = FakeSearch()
+    monkeypatch.setattr(tools, "search", fake)
+    return fake
+
+
+def test_internet_search_stays_basic_when_confident(searches):
+    strong = results(("https://a.com", 0.9), ("https://b.com", 0.8), ("https://c.com", 0.8))
+    searches.responses = [strong]
+    assert tools.internet_search("code review bots", max_results=8) == strong
+    assert searches.calls == [("basic", BASIC_MAX_RESULTS)]
+
+
+def test_internet_search_escalates_to_the_callers_max_results(searches):
+    weak, deep = results(("https://a.com", 0.1)), results(("https://a.com", 0.9))
+    searches.responses = [weak, deep]
+    assert tools.internet_search("code review bots", max_results=3) == deep
+    assert searches.calls == [("basic", 3), ("advanced", 3)]
+
+
+def test_internet_search_advanced_skips_the_basic_pass(searches):
+    searches.responses = [results(("https://a.com", 0.1))]
+    tools.internet_search("code review bots", max_results=4, search_depth="advanced")
+    assert searches.calls == [("advanced", 4)]
+
+
+def test_internet_search_respects_the_budget(searches):
+    budget = BudgetTracker({"tokens": 100}, {}, prices={})
+    budget.add_usage("researcher", 100, 0)
+    token = activate(budget)
+    try:
+        assert tools.internet_search("code review bots") == {"error": TOOL_CUTOFF}
+    finally:
+        deactivate(token)
+    assert searches.calls == []
+
+
+@pytest.fixture
+def run_stats(monkeypatch):
+    monkeypatch.setattr(tools, "EXTRACT_PAGES", 0)
+    stats = tools.EscalationStats()
+    token = tools.count_searches(stats)
+    yield stats
+    tools.stop_counting(token)
+
+
+def test_search_official_site_escalates_without_an_official_match(searches, run_stats):
+    weak, official = results(("https://example.com/coderabbit", 0.9)), results(("https://coderabbit.ai", 0.9))
+    searches.responses = [weak, official]
+    assert tools.search_official_site("CodeRabbit") == official
+    assert searches.calls == [("basic", 3), ("advanced", 3)]
+
+    searches.responses = [official]
+    tools.search_official_site("CodeRabbit")
+    assert run_stats.snapshot() == {"search_official_site": {"searches": 2, "escalated": 1, "rate": 0.5}}
+
+
+def test_escalation_counts_belong_to_the_run(searches, run_stats):
+    weak, strong = results(("https://a.com", 0.1)), results(("https://a.com", 0.9))
+    searches.responses = [weak, strong, weak, strong]
+    tools.internet_search("first run", max_results=3)
+
+    other = tools.EscalationStats()
+
+    def other_run():
+        tools.count_searches(other)
+        tools.internet_search("second run", max_results=3)
+
+    contextvars.copy_context().run(other_run)
+    assert run_stats.snapshot()["internet_search"]["searches"] == 1
+    assert other.snapshot()["internet_search"]["searches"] == 1
@@ -0,0 +1,109 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.url_check import URLValidator, apply_replacements, classify, extract_urls
+
+
+def test_classify_flags_blogs_and_articles():
+    assert classify("https://medium.com/@someone/best-tools") == "blog/aggregator domain (medium.com)"
+    assert classify("https://team.medium.com/post") == "blog/aggregator domain (medium.com)"
+    assert "'blog'" in classify("https://blog.example.com/launch")
+    assert "'blog'" in classify("https://example.com/blog/2026/launch")
+    assert "'top'" in classify("https://example.com/top-10-code-review-tools")
+    assert "'vs'" in classify("https://example.com/coderabbit-vs-sonarqube")
+    assert "'alternatives'" in classify("https://example.com/compare/coderabbit_alternatives.html")
+
+
+def test_classify_accepts_official_pages():
+    assert classify("https://coderabbit.ai") is None
+    assert classify("https://docs.sonarsource.com/sonarqube/latest/") is None
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://docs.github.com/en/get-started/guides/",
+        "https://learn.microsoft.com/en-us/azure/best-practices",
+        "https://www.g2.example/products/reviews-api",
+        "https://example.com/topology",
+        "https://example.com/blogger-integration",
+        "https://example.com/desktop",
+    ],
+)
+def test_classify_matches_whole_words_only(url):
+    assert classify(url) is None
+
+
+def test_classify_flags_malformed_urls():
+    assert classify("https://") == "malformed URL"
+    assert classify("http://[::1") == "malformed URL"
+
+
+def test_extract_urls_dedupes_and_strips_punctuation():
+    text = "See https://a.com/docs. Also (https://b.com) and https://a.com/docs, again."
+    assert extract_urls(text) == ["https://a.com/docs", "https://b.com"]
+
+
+def test_validator_flags_malformed_url_without_network():
+    verdicts = URLValidator(timeout=1).validate("Broken: https://example.com:abc/x")
+    assert len(verdicts) == 1
+    assert verdicts[0]["ok"] is False
+    assert verdicts[0]["reason"].startswith("malformed URL")
+
+
+def test_apply_replacements_swaps_and_marks():
+    report = "Tools: https://old.com and https://gone.com/page"
+    fixed = apply_replacements(report, {"https://old.com": "https://new.com", "https://gone.com/page": None})
+    assert fixed == "Tools: https://new.com and https://gone.com/page (unverified)"
+
+
+def test_apply_replacements_leaves_longer_urls_alone():
+    report = "https://a.com and https://a.com/docs and https://a.com.evil.io"
+    fixed = apply_replacements(report, {"https://a.com": "https://b.com"})
+    assert fixed == "https://b.com and https://a.com/docs and https://a.com.evil.io"
+
+
+def test_apply_replacements_matches_before_trailing_punctuation():
+    report = "See https://a.com, https://a.com. and **https://a.com**"
+    fixed = apply_replacements(report, {"https://a.com": "https://b.com"})
+    assert fixed == "See https://b.com, https://b.com. and **https://b.com**"
+
+
+def test_apply_replacements_is_idempotent():
+    replacements = {"https://gone.com": None}
+    once = apply_replacements("https://gone.com, https://gone.com", replacements)
+    assert apply_replacements(apply_replacements(once, replacements), replacements) == once
+    assert once.count("(unverified)") == 2
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    def do_HEAD(self):
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def test_connection_failures_are_only_cached_briefly():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    validator = URLValidator(timeout=1, negative_ttl=0.2)
+    (down,) = validator.validate(f"http://127.0.0.1:{port}/a")
+    assert down["reason"] == "unreachable (ConnectError)"
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), OkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        # Still within the negative TTL: the domain verdict is reused
+        assert validator.validate(f"http://127.0.0.1:{port}/b")[0]["ok"] is False
+        time.sleep(0.3)
+        assert validator.validate(f"http://127.0.0.1:{port}/a")[0]["ok"] is True
+    finally:
+        server.shutdown()
+        server.server_close()